@@ -10,8 +10,10 @@ from flask_caching import Cache
 from config import Config, DevelopmentConfig, TestingConfig, ProductionConfig, config
 from sqlalchemy import text
 
+from app.utils.db_routing import RoutingSession
+
 # --- Instantiate Extensions ---
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 mail = Mail()
@@ -48,6 +50,9 @@ def create_app(config_name=None):
         config_class = config_name
     app.config.from_object(config_class)
 
+    # orjson-backed JSON (ISO 8601 dates) for jsonify, get_json and tojson
+    from app.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
 
     import logging
     if app.config.get('TESTING'):
@@ -142,9 +147,78 @@ def create_app(config_name=None):
         app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     # Otherwise, config class fallback is used
 
+    # Pool sizing and pre-ping (replaces a per-request SELECT 1); explicit options win
+    from app.utils.db_pool import engine_options, register_db_breaker
+    from app.utils.db_routing import configure_replica, register_replica_routing
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config, app.config['SQLALCHEMY_DATABASE_URI']),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    if 'pool_size' in app.config['SQLALCHEMY_ENGINE_OPTIONS'] and os.environ.get('GUNICORN_WORKERS'):
+        options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        app.logger.info(
+            f"DB pool: {options['pool_size']}+{options.get('max_overflow', 0)} connections per worker, "
+            f"up to {int(os.environ['GUNICORN_WORKERS']) * (options['pool_size'] + options.get('max_overflow', 0))} in total"
+        )
+
     # --- Initialize Extensions ---
     db.init_app(app)
     login_manager.init_app(app)
+
+    # SQLite connection profile (WAL, busy_timeout, ...), the optional read replica and the single-writer queue
+    from app.utils.db import register_sqlite_pragmas
+    from app.utils.write_queue import init_write_queue
+    with app.app_context():
+        register_sqlite_pragmas(app, db.engine)
+        register_db_breaker(app, db.engine)
+    replica = configure_replica(app, engine_options)
+    if replica is not None:
+        register_sqlite_pragmas(app, replica)
+    init_write_queue(app)
+    register_replica_routing(app)
+
+    # Full-text search tables are created with projects on SQLite
+    from app.services.search_service import register_search_ddl
+    register_search_ddl()
+
+    # Cascade deletes set-based; registered first so the listeners below see them
+    from app.utils.cascades import register_cascade_listeners
+    register_cascade_listeners()
+
+    # Keep the dashboard aggregate and analytics rollup tables in step with ORM writes
+    from app.services.dashboard_stats_service import register_stats_listeners
+    from app.services.analytics_rollup_service import register_rollup_listeners
+    register_stats_listeners()
+    register_rollup_listeners()
+
+    # Denormalized counters on projects and users, updated in the writing transaction
+    from app.services.counter_service import register_counter_listeners
+    register_counter_listeners()
+
+    # Precomputed assessment summaries, refreshed when scores are written
+    from app.services.summary_service import register_summary_listeners
+    register_summary_listeners()
+
+    # brotli/gzip responses and precompressed static files when no proxy compresses for us
+    from app.utils.compression import init_compression
+    init_compression(app)
+
+    # Content-hashed static JS/CSS and the static_url() template helper
+    from app.utils.assets import init_assets
+    init_assets(app)
+
+    # Shared Jinja bytecode cache and render timing; templates are precompiled once the app is assembled
+    from app.utils.template_cache import init_template_cache, warm_templates
+    init_template_cache(app)
+
+    # Token buckets per API user and route class
+    from app.utils.rate_limit import init_rate_limiter
+    init_rate_limiter(app)
+
+    # Per-user server-sent events (scoring done, draft saved elsewhere, export ready)
+    from app.utils.events import init_events
+    init_events(app)
+
     migrate.init_app(app, db)
 
     # Initialize mail only if MAIL_USERNAME is configured
@@ -178,16 +252,6 @@ def create_app(config_name=None):
     cache.init_app(app)
     app.logger.info(f"Cache initialized: {app.config['CACHE_TYPE']}")
 
-    @app.before_request
-    def check_db_connection():
-        """Verify database connection before each request."""
-        try:
-            db.session.execute(text('SELECT 1'))
-        except Exception as e:
-            app.logger.error(f"Database connection error: {str(e)}")
-            db.session.rollback()
-            db.session.remove()
-
     # Register filters (if filters.py exists)
     try:
         from . import filters
@@ -237,6 +301,10 @@ def create_app(config_name=None):
     app.register_blueprint(questionnaire_bp, url_prefix='/questionnaire')
     app.register_blueprint(api_bp, url_prefix='/api')
 
+    # Per-request assessment ownership resolver (also a template global)
+    from app.services.ownership_service import register_ownership_resolver
+    register_ownership_resolver(app)
+
     # Register error handlers
     from app.utils.errors import register_error_handlers
     register_error_handlers(app)
@@ -245,4 +313,7 @@ def create_app(config_name=None):
     from app.cli import register_cli_commands
     register_cli_commands(app)
 
+    # Compile every template now (filters and globals are all registered), before workers fork
+    warm_templates(app)
+
     return app
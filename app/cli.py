@@ -109,6 +109,190 @@ def clear_and_populate_questions_command():
         click.echo(f"ERROR: {str(e)}")
         raise
 
+@click.command('rebuild-dashboard-stats')
+@with_appcontext
+def rebuild_dashboard_stats_command():
+    """Recompute the dashboard_stats aggregate table from the base tables."""
+    from app.services.dashboard_stats_service import rebuild_dashboard_stats
+    try:
+        rows = rebuild_dashboard_stats()
+        click.echo(f"Rebuilt dashboard stats ({rows} rows).")
+    except Exception as e:
+        click.echo(f"ERROR rebuilding dashboard stats: {str(e)}")
+        raise
+
+@click.command('reconcile-counters')
+@with_appcontext
+def reconcile_counters_command():
+    """Recompute the project and user counter columns, fixing any drift."""
+    from app.services.counter_service import reconcile_counters
+    fixed = reconcile_counters()
+    click.echo(f"Reconciled counters ({fixed['projects']} projects, {fixed['users']} users corrected).")
+
+
+@click.command('rebuild-summaries')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Assessments per transaction.')
+@with_appcontext
+def rebuild_summaries_command(batch_size):
+    """Recompute the stored assessment summaries from the scores."""
+    from app.services.summary_service import rebuild_summaries
+    written = rebuild_summaries(batch_size=batch_size)
+    click.echo(f"Rebuilt {written} assessment summaries.")
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Repopulate the project full-text index from the projects table."""
+    from app.services.search_service import rebuild_search_index
+    with db.engine.begin() as connection:
+        rebuild_search_index(connection)
+    click.echo("Rebuilt the project search index.")
+
+
+@click.command('purge-project')
+@click.argument('project_id', type=int)
+@click.option('--batch-size', type=int, default=None, help='Assessments deleted per transaction.')
+@with_appcontext
+def purge_project_command(project_id, batch_size):
+    """Delete a (large) project and its assessments in batches."""
+    from app.services.deletion_service import purge_project
+    deleted = purge_project(project_id, batch_size=batch_size)
+    click.echo(f"Purged project {project_id} ({deleted} assessments).")
+
+
+@click.command('backfill-rollups')
+@click.option('--start', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='First day to rebuild (default: oldest record).')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Day after the last day to rebuild (default: tomorrow).')
+@click.option('--chunk-days', type=int, default=31, show_default=True,
+              help='Days recomputed per transaction.')
+@with_appcontext
+def backfill_rollups_command(start, end, chunk_days):
+    """Rebuild the analytics rollups and SDG score histograms from the base tables."""
+    from app.services.analytics_rollup_service import backfill_rollups
+    try:
+        chunks = backfill_rollups(
+            start=start.date() if start else None,
+            end=end.date() if end else None,
+            chunk_days=chunk_days,
+            progress=lambda first, last: click.echo(f"Rolled up {first} to {last}"),
+        )
+        click.echo(f"Backfilled analytics rollups ({chunks} chunks).")
+    except Exception as e:
+        click.echo(f"ERROR backfilling analytics rollups: {str(e)}")
+        raise
+
+@click.command('refresh-rollups')
+@click.option('--hours', type=int, default=1, show_default=True,
+              help='Recompute buckets touched by rows updated in this window.')
+@with_appcontext
+def refresh_rollups_command(hours):
+    """Refresh recently touched analytics rollup buckets (for ANALYTICS_ROLLUPS_ON_WRITE=false)."""
+    from datetime import datetime, timedelta
+    from app.services.analytics_rollup_service import refresh_rollups
+    try:
+        days = refresh_rollups(datetime.utcnow() - timedelta(hours=hours))
+        click.echo(f"Refreshed analytics rollups ({days} days).")
+    except Exception as e:
+        click.echo(f"ERROR refreshing analytics rollups: {str(e)}")
+        raise
+
+@click.command('export-data')
+@click.argument('dataset', type=click.Choice(['projects', 'assessments', 'responses']))
+@click.option('--format', 'export_format', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+@click.option('--since', type=click.DateTime(), default=None,
+              help='Only rows updated at or after this moment, for incremental pulls.')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='Output file (default: stdout).')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Rows per server-side fetch.')
+@with_appcontext
+def export_data_command(dataset, export_format, since, output, batch_size):
+    """Stream projects, assessments (SDG scores pivoted) or responses as CSV/NDJSON."""
+    from app.services.export_service import stream_export
+    try:
+        for chunk in stream_export(dataset, export_format, since, batch_size):
+            output.write(chunk)
+    except Exception as e:
+        click.echo(f"ERROR exporting {dataset}: {str(e)}", err=True)
+        raise
+
+@click.command('export-snapshot')
+@click.option('--format', 'file_format', type=click.Choice(['arrow', 'parquet']), default='arrow', show_default=True)
+@click.option('--full', is_flag=True, help='Write every row instead of rows changed since the last partition.')
+@click.option('--dir', 'directory', type=click.Path(file_okay=False), default=None,
+              help='Snapshot root (default: SNAPSHOT_DIR or instance/snapshots).')
+@with_appcontext
+def export_snapshot_command(file_format, full, directory):
+    """Write a columnar snapshot partition of projects, assessments and SDG scores."""
+    from app.services.snapshot_service import write_snapshot
+    try:
+        entry = write_snapshot(directory, file_format, full)
+        if entry is None:
+            click.echo("No changes since the last snapshot.")
+        else:
+            rows = ', '.join(f"{table}={count}" for table, count in entry['rows'].items())
+            click.echo(f"Wrote snapshot {entry['path']} ({'full' if entry['full'] else 'incremental'}: {rows}).")
+    except Exception as e:
+        click.echo(f"ERROR writing snapshot: {str(e)}")
+        raise
+
+@click.command('explain-queries')
+@click.option('--verbose', is_flag=True, help='Print every plan, not only the flagged ones.')
+@with_appcontext
+def explain_queries_command(verbose):
+    """Explain the hot queries, flag full scans and temp sorts, and suggest indexes."""
+    from app.utils.query_plans import check_plans, advise
+    with db.engine.connect() as connection:
+        report = check_plans(connection)
+    flagged = 0
+    for name, result in report.items():
+        if result['issues']:
+            flagged += 1
+            click.echo(f"FLAG {name}: {', '.join(result['issues'])}")
+        elif verbose:
+            click.echo(f"ok   {name}")
+        if result['issues'] or verbose:
+            for line in result['plan']:
+                click.echo(f"       {line}")
+    for suggestion in advise(report):
+        click.echo(f"Suggested: {suggestion};")
+    click.echo(f"{len(report)} queries explained, {flagged} flagged.")
+
+@click.command('compress-static')
+@click.option('--min-size', type=int, default=1024, show_default=True, help='Skip files smaller than this.')
+@with_appcontext
+def compress_static_command(min_size):
+    """Write .br/.gz siblings of the static JS, CSS and SVG files for the compression middleware."""
+    from flask import current_app
+    from app.utils.compression import precompress_static
+    written = precompress_static(current_app.static_folder, min_size=min_size)
+    click.echo(f"Wrote {len(written)} precompressed static files.")
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minify, bundle and fingerprint the static JS and CSS into static/dist (run before compress-static)."""
+    from flask import current_app
+    from app.utils.assets import build_assets
+    manifest = build_assets(current_app.static_folder)
+    click.echo(f"Built {len(manifest)} fingerprinted static assets.")
+
+@click.command('precompile-templates')
+@with_appcontext
+def precompile_templates_command():
+    """Compile every template into the bytecode cache; fails if any template does not compile."""
+    from flask import current_app
+    from app.utils.template_cache import precompile_templates
+    compiled, errors = precompile_templates(current_app)
+    for name, error in errors:
+        click.echo(f"ERROR compiling {name}: {error}")
+    cache = current_app.extensions['templates'].bytecode_cache
+    click.echo(f"Compiled {compiled} templates{f' into {cache}' if cache else ' (no bytecode cache configured)'}.")
+    if errors:
+        raise click.ClickException(f"{len(errors)} templates failed to compile")
+
 def register_cli_commands(app):
     """Register CLI commands with the Flask app."""
     app.cli.add_command(init_db_command)
@@ -116,3 +300,16 @@ def register_cli_commands(app):
     app.cli.add_command(populate_goals_command)
     app.cli.add_command(populate_questions_command)
     app.cli.add_command(clear_and_populate_questions_command)
+    app.cli.add_command(rebuild_dashboard_stats_command)
+    app.cli.add_command(backfill_rollups_command)
+    app.cli.add_command(refresh_rollups_command)
+    app.cli.add_command(export_data_command)
+    app.cli.add_command(export_snapshot_command)
+    app.cli.add_command(explain_queries_command)
+    app.cli.add_command(purge_project_command)
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_summaries_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(compress_static_command)
+    app.cli.add_command(precompile_templates_command)
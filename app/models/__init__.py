@@ -9,3 +9,6 @@ from .assessment import Assessment, SdgScore
 from .sdg import SdgGoal, SdgQuestion
 from .sdg_relationship import SdgRelationship
 from .response import QuestionResponse
+from .dashboard_stat import DashboardStat
+from .analytics_rollup import AnalyticsRollup, SdgScoreHistogram
+from .assessment_summary import AssessmentSummary
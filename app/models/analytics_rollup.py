@@ -0,0 +1,44 @@
+"""
+Analytics rollup models.
+Time-bucketed counts and per-SDG score histograms for the analytics dashboard.
+"""
+
+from app import db
+from datetime import datetime
+
+class AnalyticsRollup(db.Model):
+    __tablename__ = 'analytics_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('grain', 'bucket', 'entity', 'dimension', 'value',
+                            name='uq_analytics_rollups_key'),
+        db.Index('ix_analytics_rollups_lookup', 'entity', 'dimension', 'grain', 'bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    grain = db.Column(db.String(8), nullable=False)        # 'day' or 'month'
+    bucket = db.Column(db.Date, nullable=False)            # First day of the bucket
+    entity = db.Column(db.String(16), nullable=False)      # 'project' or 'assessment'
+    dimension = db.Column(db.String(32), nullable=False)   # 'all', 'project_type', 'sector', 'status', 'score_band'
+    value = db.Column(db.String(100), nullable=False, default='')  # '' when the dimension value is unset
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)  # Assessments with an overall_score
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AnalyticsRollup {self.grain} {self.bucket} {self.entity}.{self.dimension}={self.value!r}: {self.item_count}>'
+
+class SdgScoreHistogram(db.Model):
+    __tablename__ = 'sdg_score_histograms'
+    __table_args__ = (
+        db.UniqueConstraint('sdg_id', 'band', name='uq_sdg_score_histograms_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    sdg_id = db.Column(db.Integer, nullable=False)
+    band = db.Column(db.String(8), nullable=False)  # Same bands as the overall score distribution
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SdgScoreHistogram sdg={self.sdg_id} band={self.band}: {self.count}>'
@@ -11,7 +11,7 @@ class Assessment(db.Model):
     __tablename__ = 'assessments'
 
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(32), default='draft')
     overall_score = db.Column(db.Float)
@@ -33,7 +33,8 @@ class Assessment(db.Model):
     share_expires = db.Column(db.DateTime, nullable=True)
 
     project = db.relationship('Project', back_populates='assessments')
-    sdg_scores = db.relationship('SdgScore', back_populates='assessment', cascade='all, delete-orphan')
+    sdg_scores = db.relationship('SdgScore', back_populates='assessment', cascade='all, delete-orphan',
+                                 passive_deletes=True)
 
     def __repr__(self):
         return f'<Assessment {self.id} for Project {self.project_id}>'
@@ -201,7 +202,7 @@ class SdgScore(db.Model):
     __tablename__ = 'sdg_scores'
 
     id = db.Column(db.Integer, primary_key=True)
-    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id'), nullable=False)
+    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id', ondelete='CASCADE'), nullable=False)
     sdg_id = db.Column(db.Integer, db.ForeignKey('sdg_goals.id'), nullable=False)
     direct_score = db.Column(db.Float)  # Score from direct assessment
     bonus_score = db.Column(db.Float)   # Score from related SDGs
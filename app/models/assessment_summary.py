@@ -0,0 +1,20 @@
+"""
+Assessment summary model.
+Holds the precomputed results summary (category averages, top and bottom
+SDGs, chart data) of one assessment, refreshed whenever its scores change.
+"""
+
+from app import db
+from datetime import datetime
+
+class AssessmentSummary(db.Model):
+    __tablename__ = 'assessment_summaries'
+
+    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id', ondelete='CASCADE'), primary_key=True)
+    overall_score = db.Column(db.Float)
+    # {'category_scores', 'categories', 'top_sdgs', 'bottom_sdgs', 'chart_data'}, see summary_service
+    payload = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AssessmentSummary assessment={self.assessment_id} overall={self.overall_score}>'
@@ -0,0 +1,51 @@
+"""
+Dashboard statistics model.
+Holds incrementally maintained aggregates for the admin dashboard.
+"""
+
+import math
+from app import db
+from datetime import datetime
+
+# sdg_id value of the row holding the global (all-SDG) aggregates
+GLOBAL_STATS_KEY = 0
+
+class DashboardStat(db.Model):
+    __tablename__ = 'dashboard_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # 0 for the global row, otherwise the sdg_goals.id the score aggregates belong to
+    sdg_id = db.Column(db.Integer, nullable=False, unique=True)
+
+    # Row counts (only maintained on the global row)
+    user_count = db.Column(db.Integer, nullable=False, default=0)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    assessment_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Score moments: assessments.overall_score on the global row,
+    # sdg_scores.total_score on the per-SDG rows
+    score_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    score_sum_sq = db.Column(db.Float, nullable=False, default=0.0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def avg_score(self):
+        """Mean of the tracked score, or None when nothing has been scored."""
+        if not self.score_count:
+            return None
+        return self.score_sum / self.score_count
+
+    @property
+    def score_stddev(self):
+        """Population standard deviation of the tracked score."""
+        if not self.score_count:
+            return None
+        mean = self.score_sum / self.score_count
+        # Clamp tiny negative values caused by floating point drift
+        return math.sqrt(max(self.score_sum_sq / self.score_count - mean * mean, 0.0))
+
+    def __repr__(self):
+        return f'<DashboardStat sdg={self.sdg_id} scores={self.score_count}>'
@@ -24,14 +24,18 @@ class Project(db.Model):
     budget = db.Column(db.Float)
     sector = db.Column(db.String(100))
     status = db.Column(db.String(50), nullable=True, default='planning')
+    # Set while app.services.deletion_service purges the project; it is hidden from then on
+    deleted_at = db.Column(db.DateTime)
 
-    user = db.relationship('User', back_populates='projects')
-    assessments = db.relationship('Assessment', back_populates='project', cascade='all, delete-orphan')
+    # Maintained by app.services.counter_service; `flask reconcile-counters` repairs drift
+    assessment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    latest_overall_score = db.Column(db.Float)
+    last_assessed_at = db.Column(db.DateTime)
 
-    @property
-    def assessment_count(self):
-        """Return the number of assessments for this project."""
-        return len(self.assessments)
+    user = db.relationship('User', back_populates='projects')
+    assessments = db.relationship('Assessment', back_populates='project', cascade='all, delete-orphan',
+                                  passive_deletes=True)
 
     @validates('size_sqm')
     def validate_size_sqm(self, key, value):
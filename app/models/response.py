@@ -5,7 +5,7 @@ class QuestionResponse(db.Model):
     __tablename__ = 'question_responses'
 
     id = db.Column(db.Integer, primary_key=True)
-    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id'), nullable=False)
+    assessment_id = db.Column(db.Integer, db.ForeignKey('assessments.id', ondelete='CASCADE'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('sdg_questions.id'), nullable=False)
     response_score = db.Column(db.Float)
     response_text = db.Column(db.Text)
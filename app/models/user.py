@@ -19,6 +19,10 @@ class User(db.Model, UserMixin):
     organization  = db.Column(db.String(256), nullable=True)
     uia_role      = db.Column(db.String(64), nullable=True)
 
+    # Maintained by app.services.counter_service; assessments on the user's projects
+    project_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    assessment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     projects = db.relationship('Project', back_populates='user', cascade='all, delete-orphan')
 
     def check_password(self, password_hash, password):
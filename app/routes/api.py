@@ -15,13 +15,32 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.assessment import Assessment, SdgScore
 from app.models.sdg import SdgGoal, SdgQuestion
-from app.models.response import QuestionResponse
 from app.services.scoring_service import get_assessment_summary
+from app.services.summary_service import assessment_summary
+from app.services.comparison_service import ComparisonError, compare_assessments, parse_assessment_ids
+from app.services.benchmark_service import get_assessment_benchmark
+from app.services.ownership_service import owned_assessment, forget_assessment
+from app.services.deletion_service import delete_project
+from app.services.admin_listing_service import ListingError
+from app.services.api_listing_service import (
+    project_page, project_resource, parse_fields, parse_includes, SCORE_COLUMNS
+)
+from app.utils.serializers import serialize, serialize_all
+from app.services.assessment_service import save_draft_data, upsert_responses
+from app.services.batch_service import (
+    BatchValidationError, save_projects, create_assessments, save_responses
+)
+from app.utils.write_queue import run_write
+from app.utils.rate_limit import call_rate_limited, rate_class
+from app.utils.events import TooManyStreams, event_stream, get_broker
+from flask_login import current_user
 import json
 from sqlalchemy import text, func, select
 
 api_bp = Blueprint('api', __name__)
 
+ASSESSMENT_DETAIL_COLUMNS = ('id', 'project_id', 'user_id', 'status', 'draft_data', 'created_at', 'updated_at')
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -39,10 +58,52 @@ def token_required(f):
             g.user_id = data['user_id']
         except:
             return jsonify({'error': 'Token is invalid'}), 401
-            
-        return f(*args, **kwargs)
+
+        # Per-user token buckets for the route's class (read, write or expensive)
+        return call_rate_limited(f, g.user_id, *args, **kwargs)
     return decorated
 
+def _bearer_user_id():
+    """User id of a valid Bearer token, or None."""
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return None
+    try:
+        return pyjwt.decode(auth_header.split(' ')[1], current_app.config['SECRET_KEY'],
+                            algorithms=['HS256'])['user_id']
+    except Exception:
+        return None
+
+@api_bp.route('/events', methods=['GET'])
+def events_stream():
+    """Server-sent events for the user: scoring completion, saved drafts, ready exports."""
+    # EventSource cannot send headers, so browsers authenticate with their login session
+    user_id = _bearer_user_id()
+    if user_id is None and current_user.is_authenticated:
+        user_id = current_user.id
+    if user_id is None:
+        return jsonify({'error': 'Authentication required'}), 401
+
+    broker = get_broker()
+    if broker is None:
+        return jsonify({'error': 'Events are disabled'}), 404
+    try:
+        subscription = broker.subscribe(user_id, request.headers.get('Last-Event-ID'))
+    except TooManyStreams:
+        response = jsonify({'error': 'Too many open event streams'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    # The generator reads nothing from the request or database, so none is held open
+    stream = event_stream(broker, subscription,
+                          heartbeat=current_app.config.get('EVENTS_HEARTBEAT_SECONDS', 15),
+                          max_seconds=current_app.config.get('EVENTS_STREAM_SECONDS', 300))
+    response = current_app.response_class(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
 @api_bp.route('/auth/login', methods=['POST'])
 def api_login():
     data = request.get_json()
@@ -95,35 +156,67 @@ def projects_handler():
         )
         orm_db.session.add(new_project)
         orm_db.session.commit()
-        project_dict = {c.name: getattr(new_project, c.name) for c in new_project.__table__.columns}
-        return jsonify(project_dict), 201
-
-    # GET
-    projects_orm = orm_db.session.query(
-        Project, func.count(Assessment.id).label('assessment_count')
-    ).outerjoin(Assessment, Project.id == Assessment.project_id)\
-     .filter(Project.user_id == user_id)\
-     .group_by(Project.id)\
-     .order_by(Project.updated_at.desc())\
-     .all()
-
-    projects_list = []
-    for project_obj, count in projects_orm:
-        project_dict = {c.name: getattr(project_obj, c.name) for c in project_obj.__table__.columns}
-        project_dict['assessment_count'] = count
-        projects_list.append(project_dict)
-    return jsonify(projects_list)
+        return jsonify(serialize(new_project)), 201
+
+    # GET: one keyset page; the next page's cursor is in the X-Next-Cursor header.
+    # assessment_count and the other counters are columns on the row
+    try:
+        page = project_page(orm_db.session, user_id, cursor=request.args.get('cursor'),
+                            limit=request.args.get('limit', type=int),
+                            fields=parse_fields(request.args.get('fields')))
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+    response = jsonify(page['items'])
+    if page['next_cursor']:
+        response.headers['X-Next-Cursor'] = page['next_cursor']
+    return response
+
+def _run_batch(key, writer):
+    """Validate the request's `key` array and write it in one transaction with `writer`."""
+    data = request.get_json(silent=True) or {}
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': f'{key} must be a non-empty list'}), 400
+    max_items = current_app.config.get('API_BATCH_MAX_ITEMS', 2000)
+    if len(items) > max_items:
+        return jsonify({'error': f'Batches are limited to {max_items} items'}), 413
+
+    try:
+        results = run_write(writer, g.user_id, items)
+    except BatchValidationError as e:
+        return jsonify({'error': 'Batch rejected; nothing was saved', 'errors': e.errors}), 400
+    return jsonify({'results': results}), 200
+
+@api_bp.route('/projects/batch', methods=['POST'])
+@token_required
+@rate_class('expensive')
+def batch_projects():
+    """Create projects, or update the user's projects for items with an `id`."""
+    return _run_batch('projects', save_projects)
 
 @api_bp.route('/projects/<int:project_id>', methods=['GET', 'PUT', 'DELETE'])
 @token_required
 def project_detail_handler(project_id):
     """GET: Get project. PUT: Update project. DELETE: Delete project."""
     user_id = g.user_id
+    if request.method == 'GET':
+        # Only the requested columns are selected; heavy assessment columns only when named
+        try:
+            resource = project_resource(orm_db.session, project_id, user_id,
+                                        fields=parse_fields(request.args.get('fields')),
+                                        includes=parse_includes(request.args.get('include')))
+        except ListingError as e:
+            return jsonify({'error': str(e)}), 400
+        if resource is None:
+            return jsonify({'error': 'Project not found or access denied'}), 404
+        return jsonify(resource)
+
     project = orm_db.session.execute(
         select(Project).filter_by(id=project_id, user_id=user_id)
     ).scalar_one_or_none()
 
-    if not project:
+    # A project being purged can only be deleted again, which restarts its purge
+    if not project or (project.deleted_at is not None and request.method != 'DELETE'):
         return jsonify({'error': 'Project not found or access denied'}), 404
 
     if request.method == 'PUT':
@@ -139,29 +232,40 @@ def project_detail_handler(project_id):
         project.sector = data.get('sector', project.sector)
         project.updated_at = datetime.datetime.utcnow()
         orm_db.session.commit()
-        project_dict = {c.name: getattr(project, c.name) for c in project.__table__.columns}
-        return jsonify(project_dict), 200
+        return jsonify(serialize(project)), 200
 
     elif request.method == 'DELETE':
-        orm_db.session.delete(project)
-        orm_db.session.commit()
+        if not delete_project(project):
+            return jsonify({'status': 'deleting'}), 202
         return '', 204
 
-    # GET
-    project_dict = {c.name: getattr(project, c.name) for c in project.__table__.columns}
-    assessments_list = []
-    for assess_obj in project.assessments:
-        assess_dict = {c.name: getattr(assess_obj, c.name) for c in assess_obj.__table__.columns}
-        assessments_list.append(assess_dict)
-    project_dict['assessments'] = assessments_list
-    return jsonify(project_dict)
+@api_bp.route('/projects/<int:project_id>/compare', methods=['GET'])
+@token_required
+def compare_project_assessments(project_id):
+    """Compare assessments of a project SDG by SDG (?assessments=1,2,3; default: the most recent)."""
+    user_id = g.user_id
+    project = orm_db.session.execute(
+        select(Project).filter_by(id=project_id, user_id=user_id, deleted_at=None)
+    ).scalar_one_or_none()
+
+    if not project:
+        return jsonify({'error': 'Project not found or access denied'}), 404
+
+    try:
+        comparison = compare_assessments(orm_db.session, project,
+                                         parse_assessment_ids(request.args.get('assessments')))
+    except ComparisonError as e:
+        return jsonify({'error': str(e)}), 400
+    if comparison is None:
+        return jsonify({'error': 'Assessment not found'}), 404
+    return jsonify(comparison)
 
 @api_bp.route('/projects/<int:project_id>/assessments', methods=['POST'])
 @token_required
 def create_project_assessment(project_id):
     user_id = g.user_id
     project = orm_db.session.execute(
-        select(Project).filter_by(id=project_id, user_id=user_id)
+        select(Project).filter_by(id=project_id, user_id=user_id, deleted_at=None)
     ).scalar_one_or_none()
     
     if not project:
@@ -174,19 +278,27 @@ def create_project_assessment(project_id):
     )
     orm_db.session.add(new_assessment)
     orm_db.session.commit()
-    assessment_dict = {c.name: getattr(new_assessment, c.name) for c in new_assessment.__table__.columns}
-    return jsonify(assessment_dict), 201
+    return jsonify(serialize(new_assessment)), 201
+
+@api_bp.route('/assessments/batch', methods=['POST'])
+@token_required
+@rate_class('expensive')
+def batch_assessments():
+    """Create draft assessments across the user's projects."""
+    return _run_batch('assessments', create_assessments)
+
+@api_bp.route('/responses/batch', methods=['POST'])
+@token_required
+@rate_class('expensive')
+def batch_responses():
+    """Save questionnaire responses across many assessments."""
+    return _run_batch('assessments', save_responses)
 
 @api_bp.route('/assessments/<int:assessment_id>/finalize', methods=['POST'])
 @token_required
 def finalize_assessment_api(assessment_id):
     user_id = g.user_id
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found'}), 404
@@ -209,12 +321,7 @@ def assessment_detail_api_handler(assessment_id):
     """Get, update, or delete a specific assessment."""
     user_id = g.user_id
     
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found or access denied'}), 404
@@ -238,56 +345,56 @@ def assessment_detail_api_handler(assessment_id):
         }), 200
     
     elif request.method == 'DELETE':
-        orm_db.session.query(QuestionResponse).filter_by(assessment_id=assessment_id).delete()
-        orm_db.session.query(SdgScore).filter_by(assessment_id=assessment_id).delete()
+        # Scores and responses go with it through ON DELETE CASCADE
         orm_db.session.delete(assessment)
         orm_db.session.commit()
+        forget_assessment(assessment_id)
         return '', 204
     
     # GET request
-    assessment_dict = {
-        'id': assessment.id,
-        'project_id': assessment.project_id,
-        'user_id': assessment.user_id,
-        'status': assessment.status,
-        'draft_data': assessment.draft_data,
-        'created_at': assessment.created_at.isoformat() if assessment.created_at else None,
-        'updated_at': assessment.updated_at.isoformat() if assessment.updated_at else None,
-        'project_name': assessment.project.name
-    }
+    # Datetimes are written as ISO 8601 by the JSON provider
+    assessment_dict = serialize(assessment, ASSESSMENT_DETAIL_COLUMNS)
+    assessment_dict['project_name'] = assessment.project.name
     
     # Include SDG scores if they exist
     scores = orm_db.session.query(SdgScore).filter_by(assessment_id=assessment_id).all()
-    assessment_dict['scores'] = [{
-        'id': score.id,
-        'sdg_id': score.sdg_id,
-        'total_score': score.total_score
-    } for score in scores]
+    assessment_dict['scores'] = serialize_all(scores, SCORE_COLUMNS)
     
     return jsonify(assessment_dict)
 
 @api_bp.route('/assessments/<int:assessment_id>/summary', methods=['GET'])
 @token_required
+@rate_class('expensive')
 def get_assessment_summary_route(assessment_id):
     """Get a summary of assessment results."""
     user_id = g.user_id
     
     # Verify ownership using ORM
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, project = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found'}), 404
     
-    # Get assessment summary
-    summary = get_assessment_summary(orm_db.session, assessment_id)
+    # Stored summary, computed at scoring time (written here only when missing)
+    summary = assessment_summary(orm_db.session, assessment, project)
+    orm_db.session.commit()
     
     return jsonify(summary)
 
+@api_bp.route('/assessments/<int:assessment_id>/benchmark', methods=['GET'])
+@token_required
+@rate_class('expensive')
+def get_assessment_benchmark_route(assessment_id):
+    """Rank an assessment's scores against completed peers in its sector and project type."""
+    user_id = g.user_id
+
+    # Verify ownership using ORM
+    assessment, project = owned_assessment(assessment_id, user_id)
+    if not assessment:
+        return jsonify({'error': 'Assessment not found'}), 404
+
+    return jsonify(get_assessment_benchmark(assessment, project))
+
 @api_bp.route('/assessments/<int:assessment_id>/responses', methods=['POST'])
 @token_required
 def get_assessment_responses(assessment_id):
@@ -295,18 +402,14 @@ def get_assessment_responses(assessment_id):
     user_id = g.user_id
     
     # Verify ownership using ORM
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found'}), 404
     
     # Get assessment summary
     summary = get_assessment_summary(orm_db.session, assessment_id)
+    orm_db.session.commit()
     return jsonify(summary)
 
 @api_bp.route('/sdg/goals', methods=['GET'])
@@ -323,22 +426,24 @@ def get_sdg_goals():
 
 @api_bp.route('/dashboard', methods=['GET'])
 @token_required
+@rate_class('expensive')
 def get_dashboard_metrics_api():
     """Get dashboard metrics."""
     user_id = g.user_id
     
     # Get total projects
     total_projects = orm_db.session.query(func.count(Project.id))\
-        .filter(Project.user_id == user_id).scalar()
+        .filter(Project.user_id == user_id, Project.deleted_at.is_(None)).scalar()
     
     # Get total assessments
     total_assessments = orm_db.session.query(func.count(Assessment.id))\
-        .join(Project).filter(Project.user_id == user_id).scalar()
+        .join(Project).filter(Project.user_id == user_id, Project.deleted_at.is_(None)).scalar()
     
     # Get completed assessments
     completed_assessments = orm_db.session.query(func.count(Assessment.id))\
         .join(Project).filter(
             Project.user_id == user_id,
+            Project.deleted_at.is_(None),
             Assessment.status == 'completed'
         ).scalar()
     
@@ -369,12 +474,7 @@ def save_questionnaire_response(assessment_id):
     user_id = g.user_id
     
     # Verify ownership using ORM
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found'}), 404
@@ -387,37 +487,8 @@ def save_questionnaire_response(assessment_id):
     if not isinstance(responses, list):
         return jsonify({'error': 'Responses must be a list'}), 400
     
-    # Process each response
-    for response in responses:
-        question_id = response.get('question_id')
-        response_text = response.get('response_text')
-        score = response.get('score')
-        
-        if not question_id or not response_text or score is None:
-            continue
-        
-        # Check if response already exists
-        existing = orm_db.session.query(QuestionResponse).filter_by(
-            assessment_id=assessment_id,
-            question_id=question_id
-        ).first()
-        
-        if existing:
-            # Update existing response
-            existing.response_text = response_text
-            existing.score = score
-            existing.updated_at = datetime.datetime.utcnow()
-        else:
-            # Insert new response
-            new_response = QuestionResponse(
-                assessment_id=assessment_id,
-                question_id=question_id,
-                response_text=response_text,
-                score=score
-            )
-            orm_db.session.add(new_response)
-    
-    orm_db.session.commit()
+    # Upserts go through the writer queue (group-committed on SQLite)
+    run_write(upsert_responses, assessment_id, responses)
     return jsonify({'message': 'Responses saved successfully'}), 200
 
 @api_bp.route('/save-progress', methods=['POST'])
@@ -433,12 +504,7 @@ def save_progress():
     assessment_id = data['assessment_id']
     
     # Verify ownership using ORM
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).filter(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
     
     if not assessment:
         return jsonify({'error': 'Assessment not found'}), 404
@@ -446,8 +512,6 @@ def save_progress():
     # Save draft data
     draft_data = data.get('draft_data')
     if draft_data:
-        assessment.draft_data = draft_data
-        assessment.updated_at = datetime.datetime.utcnow()
-        orm_db.session.commit()
+        run_write(save_draft_data, assessment_id, draft_data, client_id=request.headers.get('X-Client-Id'))
     
     return jsonify({'message': 'Progress saved successfully'}), 200
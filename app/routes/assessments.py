@@ -5,7 +5,7 @@ Handles creating, viewing, editing, and analyzing assessments related to
 Sustainable Development Goals (SDGs).
 """
 
-from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify, current_app, json
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify, current_app, json, abort
 from flask_login import login_required, current_user
 from datetime import datetime
 import json
@@ -21,6 +21,11 @@ from app import db
 from app.utils.sdg_data import SDG_TARGETS
 from app.utils.db import get_db
 from app.services import scoring_service
+from app.services.benchmark_service import get_assessment_benchmark
+from app.services.assessment_service import save_draft_data
+from app.utils.write_queue import run_write
+from app.utils.db_routing import replica_read
+from app.services.ownership_service import resolve_assessment, owned_assessment, forget_assessment
 
 # Create blueprint
 assessments_bp = Blueprint('assessments', __name__, url_prefix='/assessments')
@@ -90,13 +95,12 @@ def map_option_to_direct_score(option):
 @login_required
 def show(id):
     """Show assessment details."""
-    assessment = db.session.get(Assessment, id)
-    if not assessment:
+    access = resolve_assessment(id)
+    if not access.found:
         abort(404)
-    
-    project = db.session.get(Project, assessment.project_id)
-    if not project or project.user_id != current_user.id:
+    if not access.owned_by(current_user.id):
         abort(403)
+    assessment, project = access.assessment, access.project
     
     return render_template('assessments/show.html', assessment=assessment, project=project)
 
@@ -109,7 +113,7 @@ def new(project_id):
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
 
         project = db.session.get(Project, project_id)
-        if not project or project.user_id != user_id:
+        if not project or project.user_id != user_id or project.deleted_at is not None:
             flash('Project not found or you do not have permission to access it', 'danger')
             return redirect(url_for('projects.index'))
 
@@ -159,10 +163,10 @@ def questionnaire_step(project_id, assessment_id, step):
         }
         
         # Verify project and assessment
-        project = db.session.get(Project, project_id)
-        assessment = db.session.get(Assessment, assessment_id)
+        access = resolve_assessment(assessment_id)
+        assessment, project = access.assessment, access.project
         
-        if not project or not assessment or assessment.project_id != project.id:
+        if not project or not assessment or assessment.project_id != project_id:
             flash('Project or assessment not found, or permission denied.', 'danger')
             return redirect(url_for('projects.index'))
         
@@ -239,15 +243,15 @@ def finalize(id):
     try:
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
         
-        assessment = db.session.get(Assessment, id)
-        if not assessment:
+        access = resolve_assessment(id)
+        if not access.found:
             flash('Assessment not found', 'danger')
             return redirect(url_for('projects.index'))
         
+        assessment = access.assessment
         project_id = assessment.project_id
-        project = db.session.get(Project, project_id)
         
-        if not project or project.user_id != user_id:
+        if not access.owned_by(user_id):
             flash('You do not have permission to finalize this assessment', 'danger')
             return redirect(url_for('projects.index'))
         
@@ -287,18 +291,17 @@ def finalize(id):
 @login_required
 def delete(id):
     """Delete an assessment."""
-    assessment = db.session.get(Assessment, id)
-    if not assessment:
+    access = resolve_assessment(id)
+    if not access.found:
         abort(404)
-    
-    project = db.session.get(Project, assessment.project_id)
-    if not project or project.user_id != current_user.id:
+    if not access.owned_by(current_user.id):
         abort(403)
+    assessment, project = access.assessment, access.project
     
-    # Delete SDG scores and the assessment
-    SdgScore.query.filter_by(assessment_id=id).delete()
+    # Scores and responses go with it through ON DELETE CASCADE
     db.session.delete(assessment)
     db.session.commit()
+    forget_assessment(id)
     
     flash('Assessment deleted successfully.', 'success')
     return redirect(url_for('projects.show', id=project.id))
@@ -314,13 +317,12 @@ def finalize_assessment(id):
     try:
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
         
-        assessment = db.session.get(Assessment, id)
-        if not assessment:
+        access = resolve_assessment(id)
+        if not access.found:
             return jsonify({'success': False, 'message': 'Assessment not found'}), 404
-        
-        project = db.session.get(Project, assessment.project_id)
-        if not project or project.user_id != user_id:
+        if not access.owned_by(user_id):
             return jsonify({'success': False, 'message': 'Permission denied'}), 403
+        assessment = access.assessment
         
         assessment.status = 'finalized'
         assessment.updated_at = datetime.now()
@@ -334,19 +336,20 @@ def finalize_assessment(id):
 
 
 @assessments_bp.route('/projects/<int:project_id>/assessments/<int:assessment_id>/results')
+@replica_read
 @login_required
 def results(project_id, assessment_id):
     """Display detailed assessment results with SDG details."""
     try:
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
 
-        assessment = db.session.get(Assessment, assessment_id)
-        if not assessment:
+        access = resolve_assessment(assessment_id)
+        if not access.found:
             flash('Assessment not found', 'danger')
             return redirect(url_for('projects.index'))
 
-        project = db.session.get(Project, assessment.project_id)
-        if not project or project.user_id != user_id:
+        assessment, project = access.assessment, access.project
+        if not access.owned_by(user_id):
             flash('You do not have permission to view this assessment', 'danger')
             return redirect(url_for('projects.index'))
 
@@ -384,12 +387,23 @@ def results(project_id, assessment_id):
         if overall_score is None:
             overall_score = 0.0
 
+        # Peer percentiles; the page still renders if the benchmark index is unavailable
+        benchmark = None
+        try:
+            benchmark = get_assessment_benchmark(assessment, project)
+            by_number = {entry['number']: entry for entry in benchmark['sdgs']}
+            for score_dict in sdg_scores_data:
+                score_dict['benchmark'] = by_number.get(score_dict['number'])
+        except Exception as e:
+            current_app.logger.warning(f"Benchmark unavailable for assessment {assessment_id}: {str(e)}")
+
         return render_template(
             'questionnaire/results.html',
             assessment=assessment,
             project=project,
             sdg_scores=sdg_scores_data,
-            overall_score_display=overall_score
+            overall_score_display=overall_score,
+            benchmark=benchmark
         )
     except Exception as e:
         current_app.logger.error(f"Error in results view: {str(e)}")
@@ -405,13 +419,13 @@ def recalculate_direct_scores(assessment_id):
     try:
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
 
-        assessment = db.session.get(Assessment, assessment_id)
-        if not assessment:
+        access = resolve_assessment(assessment_id)
+        if not access.found:
             flash('Assessment not found', 'danger')
             return redirect(url_for('projects.index'))
 
-        project = db.session.get(Project, assessment.project_id)
-        if not project or project.user_id != user_id:
+        project = access.project
+        if not access.owned_by(user_id):
             flash('You do not have permission to recalculate this assessment', 'danger')
             return redirect(url_for('projects.index'))
 
@@ -452,16 +466,16 @@ def save_draft(project_id, assessment_id):
 
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
 
-        assessment = db.session.get(Assessment, assessment_id)
         # Ensure user owns the assessment
-        if not assessment or assessment.user_id != user_id:
+        assessment, _ = owned_assessment(assessment_id, user_id, project_id)
+        if not assessment:
             return jsonify({'success': False, 'message': 'Assessment not found or permission denied'}), 404
 
         # Optionally validate the structure of 'data' here
 
-        assessment.draft_data = json.dumps(data)  # Store as JSON string
-        assessment.updated_at = datetime.now()
-        db.session.commit()
+        # Autosaves go through the writer queue (group-committed on SQLite)
+        run_write(save_draft_data, assessment_id, json.dumps(data),
+                  client_id=request.headers.get('X-Client-Id'))
 
         return jsonify({'success': True, 'message': 'Draft saved successfully'})
     except Exception as e:
@@ -477,9 +491,9 @@ def load_draft(project_id, assessment_id):
     try:
         user_id = getattr(current_user, 'id', None) or session.get('user_id')
 
-        assessment = db.session.get(Assessment, assessment_id)
         # Ensure user owns the assessment
-        if not assessment or assessment.user_id != user_id:
+        assessment, _ = owned_assessment(assessment_id, user_id, project_id)
+        if not assessment:
             return jsonify({'success': False, 'message': 'Assessment not found or permission denied'}), 404
 
         if not assessment.draft_data:  # Check if draft_data exists and is not empty
@@ -511,13 +525,13 @@ def submit_assessment(project_id, assessment_id):
         current_app.logger.info(f"Submit request for project {project_id}, assessment {assessment_id} by user {user_id}")
 
         # --- Basic Project/Assessment Verification ---
-        project = db.session.get(Project, project_id)
-        if not project:
+        access = resolve_assessment(assessment_id)
+        assessment, project = access.assessment, access.project
+        if not project or project.id != project_id or not access.owned_by(user_id):
             current_app.logger.warning(f"Submit failed: Project {project_id} not found or access denied for user {user_id}")
             # Return JSON error for AJAX
             return jsonify({'success': False, 'message': 'Project not found or permission denied'}), 404
 
-        assessment = db.session.get(Assessment, assessment_id)
         if not assessment or assessment.project_id != project_id:
             current_app.logger.warning(f"Submit failed: Assessment {assessment_id} not found or permission denied for user {user_id}")
             # Return JSON error for AJAX
@@ -853,11 +867,11 @@ def share_assessment(project_id, assessment_id):
     import secrets
     from datetime import timedelta
 
-    project = db.session.get(Project, project_id)
-    if not project or project.user_id != current_user.id:
+    access = resolve_assessment(assessment_id)
+    assessment, project = access.assessment, access.project
+    if project is None or project.user_id != current_user.id:
         return jsonify({'success': False, 'message': 'Unauthorized'}), 403
 
-    assessment = db.session.get(Assessment, assessment_id)
     if not assessment or assessment.project_id != project_id:
         return jsonify({'success': False, 'message': 'Assessment not found'}), 404
 
@@ -880,6 +894,7 @@ def share_assessment(project_id, assessment_id):
 
 
 @assessments_bp.route('/shared/<token>')
+@replica_read
 def view_shared(token):
     """View shared assessment results (public, no login required)."""
     assessment = Assessment.query.filter_by(share_token=token).first()
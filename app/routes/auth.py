@@ -3,7 +3,7 @@ Authentication routes.
 Handles user login, registration, and password management.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, abort, Response, stream_with_context
 from urllib.parse import urlparse as url_parse
 from flask_login import login_user, logout_user, current_user, login_required
 from app.models.user import User
@@ -11,6 +11,8 @@ from app import db
 from werkzeug.security import check_password_hash, generate_password_hash
 from app.utils.email_confirmed_required import email_confirmed_required
 from functools import wraps
+from datetime import datetime
+from app.services.export_service import DATASETS, FORMATS, stream_export
 
 # Import email utilities if they exist
 from app.utils.email_utils import send_confirmation_email, send_password_reset_email
@@ -201,6 +203,28 @@ def admin_dashboard():
     
     return render_template('auth/admin/dashboard.html', users=user_objs)
 
+@auth_bp.route('/admin/export/<dataset>')
+@login_required
+@admin_required
+def admin_export(dataset):
+    """Stream a full (or, with ?since=ISO-date, incremental) dump as CSV or NDJSON."""
+    export_format = request.args.get('format', 'csv')
+    if dataset not in DATASETS or export_format not in FORMATS:
+        abort(404)
+
+    since = request.args.get('since')
+    try:
+        since = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        abort(400)
+
+    filename = f"{dataset}{'_since_' + since.strftime('%Y%m%d') if since else ''}.{export_format}"
+    return Response(
+        stream_with_context(stream_export(dataset, export_format, since)),
+        mimetype=FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 @auth_bp.route('/profile')
 @login_required
 @email_confirmed_required
@@ -217,7 +241,7 @@ def profile():
                     is_admin=user_row.get('is_admin', 0))
     
     try:
-        projects_count = conn.execute('SELECT COUNT(*) FROM projects WHERE user_id = ?', 
+        projects_count = conn.execute('SELECT COUNT(*) FROM projects WHERE user_id = ? AND deleted_at IS NULL', 
                                      (current_user.id,)).fetchone()[0]
         assessments_count = conn.execute(
             'SELECT COUNT(*) FROM assessments WHERE user_id = ?', 
@@ -3,10 +3,18 @@ Dashboard routes for the application.
 Provides analytics, user management, and admin functionality.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, request, flash, session
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify
 from flask_login import login_required, current_user
 from app.utils.db import get_db
 from app import cache
+from app.services.dashboard_stats_service import get_dashboard_overview
+from app.services.analytics_rollup_service import (
+    get_time_series, get_breakdown, get_score_distribution
+)
+from app.services.score_cube_service import get_score_cube
+from app.utils.db_routing import replica_read
+from app.models.sdg import SdgGoal
+from app.services.admin_listing_service import fetch_page, ListingError, LISTINGS, DEFAULT_PAGE_SIZE
 from functools import wraps
 
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -29,6 +37,17 @@ def admin_required(f):
     
     return decorated_function
 
+def _listing_page(kind):
+    """Fetch one keyset page of an admin listing from the cursor, sort and filters in the query string."""
+    return fetch_page(
+        get_db(),
+        kind,
+        cursor=request.args.get('cursor'),
+        limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        sort=request.args.get('sort'),
+        filters=request.args
+    )
+
 @dashboard_bp.route('/')
 @login_required
 @admin_required
@@ -37,33 +56,9 @@ def index():
     """Dashboard home page with overall statistics."""
     conn = get_db()
 
-    # Consolidate all counts and average into a single query using CTEs
-    stats_query = '''
-        WITH stats AS (
-            SELECT
-                (SELECT COUNT(*) FROM users) as user_count,
-                (SELECT COUNT(*) FROM projects) as project_count,
-                (SELECT COUNT(*) FROM assessments) as assessment_count,
-                (SELECT COUNT(*) FROM assessments WHERE status = 'completed') as completed_count,
-                (SELECT AVG(overall_score) FROM assessments WHERE overall_score IS NOT NULL) as avg_score
-        )
-        SELECT * FROM stats
-    '''
-    stats = conn.execute(stats_query).fetchone()
-    user_count = stats[0]
-    project_count = stats[1]
-    assessment_count = stats[2]
-    completed_assessment_count = stats[3]
-    avg_score = stats[4]
-
-    # Get average scores per SDG
-    sdg_scores = conn.execute('''
-        SELECT g.number, g.name, AVG(s.total_score) as avg_score, g.color_code
-        FROM sdg_scores s
-        JOIN sdg_goals g ON s.sdg_id = g.id
-        GROUP BY g.id
-        ORDER BY g.number
-    ''').fetchall()
+    # Headline counts and per-SDG averages come from the incrementally
+    # maintained dashboard_stats rows rather than full-table aggregates
+    overview = get_dashboard_overview()
 
     # Get recent activity in a single query with UNION ALL
     recent_data = conn.execute('''
@@ -72,28 +67,31 @@ def index():
                p.user_id, p.updated_at, p.start_date, p.end_date, p.budget, p.sector, p.status
         FROM projects p
         JOIN users u ON p.user_id = u.id
+        WHERE p.deleted_at IS NULL
         ORDER BY p.created_at DESC
         LIMIT 5
     ''').fetchall()
     recent_projects = [dict(row) for row in recent_data]
 
     recent_assessments = conn.execute('''
-        SELECT a.*, p.name as project_name, u.name as user_name
+        SELECT a.id, a.project_id, a.status, a.overall_score, a.created_at,
+               p.name as project_name, u.name as user_name
         FROM assessments a
         JOIN projects p ON a.project_id = p.id
         JOIN users u ON a.user_id = u.id
+        WHERE p.deleted_at IS NULL
         ORDER BY a.created_at DESC
         LIMIT 5
     ''').fetchall()
     
     return render_template(
         'dashboard/index.html',
-        user_count=user_count,
-        project_count=project_count,
-        assessment_count=assessment_count,
-        completed_assessment_count=completed_assessment_count,
-        avg_score=avg_score,
-        sdg_scores=[dict(score) for score in sdg_scores],
+        user_count=overview['user_count'],
+        project_count=overview['project_count'],
+        assessment_count=overview['assessment_count'],
+        completed_assessment_count=overview['completed_count'],
+        avg_score=overview['avg_score'],
+        sdg_scores=overview['sdg_scores'],
         recent_projects=recent_projects,
         recent_assessments=[dict(assessment) for assessment in recent_assessments]
     )
@@ -103,23 +101,17 @@ def index():
 @admin_required
 def users():
     """User management dashboard."""
-    conn = get_db()
-
-    # Optimized query using LEFT JOINs instead of correlated subqueries
-    users_data = conn.execute('''
-        SELECT u.*,
-               COALESCE(COUNT(DISTINCT p.id), 0) as project_count,
-               COALESCE(COUNT(DISTINCT a.id), 0) as assessment_count
-        FROM users u
-        LEFT JOIN projects p ON p.user_id = u.id
-        LEFT JOIN assessments a ON a.project_id = p.id
-        GROUP BY u.id
-        ORDER BY u.name
-    ''').fetchall()
-
+    try:
+        page = _listing_page('users')
+    except ListingError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('dashboard.users'))
     return render_template(
         'dashboard/users.html',
-        users=[dict(user) for user in users_data]
+        users=page['items'],
+        next_cursor=page['next_cursor'],
+        sort=page['sort'],
+        filters=request.args
     )
 
 @dashboard_bp.route('/users/<int:user_id>')
@@ -136,20 +128,18 @@ def user_detail(user_id):
         flash('User not found', 'danger')
         return redirect(url_for('dashboard.users'))
     
-    # Get user's projects with optimized query (LEFT JOIN instead of subquery)
+    # Get user's projects; assessment_count is a maintained column
     projects = conn.execute('''
-        SELECT p.*,
-               COALESCE(COUNT(a.id), 0) as assessment_count
+        SELECT p.*
         FROM projects p
-        LEFT JOIN assessments a ON a.project_id = p.id
         WHERE p.user_id = ?
-        GROUP BY p.id
         ORDER BY p.created_at DESC
     ''', (user_id,)).fetchall()
     
-    # Get user's assessments
+    # Get user's assessments (listing columns only, no draft/expert blobs)
     assessments = conn.execute('''
-        SELECT a.*, p.name as project_name
+        SELECT a.id, a.project_id, a.status, a.overall_score, a.assessment_type,
+               a.created_at, a.updated_at, a.completed_at, p.name as project_name
         FROM assessments a
         JOIN projects p ON a.project_id = p.id
         WHERE p.user_id = ?
@@ -213,22 +203,17 @@ def edit_user(user_id):
 @admin_required
 def projects():
     """Project management dashboard."""
-    conn = get_db()
-
-    # Optimized query using LEFT JOIN instead of correlated subquery
-    projects_data = conn.execute('''
-        SELECT p.*, u.name as user_name,
-               COALESCE(COUNT(a.id), 0) as assessment_count
-        FROM projects p
-        JOIN users u ON p.user_id = u.id
-        LEFT JOIN assessments a ON a.project_id = p.id
-        GROUP BY p.id
-        ORDER BY p.created_at DESC
-    ''').fetchall()
-
+    try:
+        page = _listing_page('projects')
+    except ListingError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('dashboard.projects'))
     return render_template(
         'dashboard/projects.html',
-        projects=[dict(project) for project in projects_data]
+        projects=page['items'],
+        next_cursor=page['next_cursor'],
+        sort=page['sort'],
+        filters=request.args
     )
 
 @dashboard_bp.route('/assessments')
@@ -236,78 +221,69 @@ def projects():
 @admin_required
 def assessments():
     """Assessment management dashboard."""
-    conn = get_db()
-    
-    # Get all assessments with project and user info
-    assessments_data = conn.execute('''
-        SELECT a.*, p.name as project_name, u.name as user_name
-        FROM assessments a
-        JOIN projects p ON a.project_id = p.id
-        JOIN users u ON p.user_id = u.id
-        ORDER BY a.created_at DESC
-    ''').fetchall()
-    
+    try:
+        page = _listing_page('assessments')
+    except ListingError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('dashboard.assessments'))
     return render_template(
         'dashboard/assessments.html',
-        assessments=[dict(assessment) for assessment in assessments_data]
+        assessments=page['items'],
+        next_cursor=page['next_cursor'],
+        sort=page['sort'],
+        filters=request.args
     )
 
+@dashboard_bp.route('/listing/<kind>')
+@login_required
+@admin_required
+def listing_page(kind):
+    """Infinite-scroll JSON feed for the admin listings; follow next_cursor for more rows."""
+    if kind not in LISTINGS:
+        return jsonify({'error': f'Unknown listing: {kind}'}), 404
+    try:
+        page = _listing_page(kind)
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
 @dashboard_bp.route('/analytics')
+@replica_read
 @login_required
 @admin_required
 @cache.cached(timeout=300, key_prefix='dashboard_analytics')  # 5-minute cache
 def analytics():
     """Analytics dashboard with charts and statistics."""
-    conn = get_db()
-    
-    # Get SDG average scores
-    sdg_scores = conn.execute('''
-        SELECT g.number, g.name, AVG(s.total_score) as avg_score, g.color_code
-        FROM sdg_scores s
-        JOIN sdg_goals g ON s.sdg_id = g.id
-        GROUP BY g.id
-        ORDER BY g.number
-    ''').fetchall()
-    
-    # Monthly assessment counts
-    monthly_counts = conn.execute('''
-        SELECT strftime('%Y-%m', created_at) as month, COUNT(*) as count
-        FROM assessments
-        GROUP BY month
-        ORDER BY month
-    ''').fetchall()
-    
-    # Project type breakdown
-    project_types = conn.execute('''
-        SELECT project_type, COUNT(*) as count
-        FROM projects
-        GROUP BY project_type
-        ORDER BY count DESC
-    ''').fetchall()
-    
-    # Score distribution
-    score_distribution = conn.execute('''
-        SELECT 
-            CASE
-                WHEN overall_score < 2 THEN '0-2'
-                WHEN overall_score < 4 THEN '2-4'
-                WHEN overall_score < 6 THEN '4-6'
-                WHEN overall_score < 8 THEN '6-8'
-                ELSE '8-10'
-            END as score_range,
-            COUNT(*) as count
-        FROM assessments
-        WHERE overall_score IS NOT NULL
-        GROUP BY score_range
-        ORDER BY score_range
-    ''').fetchall()
-    
+    # Monthly assessment counts, project types and score bands come from the
+    # pre-aggregated rollups rather than scans of the base tables
+    monthly_counts = [
+        {'month': point['bucket'].strftime('%Y-%m'), 'count': point['count']}
+        for point in get_time_series('assessment', grain='month')
+    ]
+    project_types = [
+        {'project_type': project_type, 'count': count}
+        for project_type, count in get_breakdown('project', 'project_type')
+    ]
+
+    # Per-SDG averages and the sector breakdown come from the in-memory score cube
+    cube = get_score_cube()
+    snapshot = cube.snapshot  # One snapshot for both aggregates, whatever a refresh does meanwhile
+    goals = {goal.number: goal for goal in SdgGoal.query.order_by(SdgGoal.number).all()}
+    sdg_scores = [
+        {'number': number, 'name': goals[number].name, 'avg_score': mean,
+         'color_code': goals[number].color_code}
+        for number, mean in enumerate(cube.sdg_means(snapshot=snapshot), start=1)
+        if mean is not None and number in goals
+    ]
+    sdg_by_sector = cube.group_means('sector', snapshot=snapshot)
+
     return render_template(
         'dashboard/analytics.html',
-        sdg_scores=[dict(score) for score in sdg_scores],
-        monthly_counts=[dict(month) for month in monthly_counts],
-        project_types=[dict(pt) for pt in project_types],
-        score_distribution=[dict(score) for score in score_distribution]
+        sdg_scores=sdg_scores,
+        sdg_by_sector=sdg_by_sector,
+        monthly_counts=monthly_counts,
+        project_types=project_types,
+        score_distribution=get_score_distribution()
     )
 
 @dashboard_bp.route('/settings')
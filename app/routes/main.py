@@ -353,16 +353,40 @@ def ping():
 
 @main_bp.route('/health')
 def health_check():
-    """Health check endpoint for monitoring."""
+    """Health check endpoint for monitoring: overall status and database reachability only."""
+    status, code = _database_health()
+    return jsonify(status), code
+
+@main_bp.route('/health/details')
+def health_details():
+    """Health check with the pool, breaker, rate limit, event and template metrics (admins only)."""
+    from flask_login import current_user
+    from app.utils.db_pool import pool_status
+    if not current_user.is_authenticated or not current_user.is_admin:
+        # A plain 403 for monitoring clients rather than the login-page redirect
+        return jsonify({'error': 'Admin access required'}), 403
+    breaker = current_app.extensions.get('db_breaker')
+    limiter = current_app.extensions.get('rate_limiter')
+    broker = current_app.extensions.get('events')
+    status, code = _database_health()
+    status.update({
+        'pool': pool_status(db.engine),
+        'breaker': breaker.status() if breaker else None,
+        'rate_limits': limiter.status() if limiter else None,
+        'events': broker.status() if broker else None,
+        'templates': current_app.extensions['templates'].status()
+    })
+    return jsonify(status), code
+
+def _database_health():
+    """(body, status code) for the database check, without internals anonymous callers should not see."""
+    breaker = current_app.extensions.get('db_breaker')
+    if breaker is not None and not breaker.allow():
+        return {'status': 'unhealthy', 'database': 'circuit open'}, 503
     try:
         # Check database connection
         db.session.execute(text('SELECT 1'))
-        return jsonify({
-            'status': 'healthy',
-            'database': 'connected'
-        }), 200
+        return {'status': 'healthy', 'database': 'connected'}, 200
     except Exception as e:
-        return jsonify({
-            'status': 'unhealthy',
-            'error': str(e)
-        }), 503
+        current_app.logger.error(f"Health check database error: {str(e)}")
+        return {'status': 'unhealthy', 'database': 'unavailable'}, 503
@@ -13,6 +13,11 @@ from datetime import datetime
 from ..scoring_logic import calculate_scores_python  # Import the scoring function
 from app.utils.sdg_data import SDG_INFO  # Import SDG_INFO for the results page
 from app.forms.project_forms import ProjectForm
+from app.utils.db_routing import replica_read
+from app.services.deletion_service import delete_project
+from app.services.search_service import SEARCH_LIMIT, project_matches, search_projects, search_terms, autocomplete_projects
+from app.services.comparison_service import ComparisonError, compare_assessments, parse_assessment_ids
+from sqlalchemy import select
 
 projects_bp = Blueprint('projects', __name__)
 
@@ -38,11 +43,12 @@ def index():
     min_budget = request.args.get('min_budget', type=float)
     max_budget = request.args.get('max_budget', type=float)
     
-    query = Project.query.filter_by(user_id=current_user.id)
+    query = Project.query.filter_by(user_id=current_user.id, deleted_at=None)
     
-    # Apply search filter
-    if search_term:
-        query = query.filter(Project.name.ilike(f'%{search_term}%'))
+    # Apply search filter (full-text, over name, description, location and sector)
+    matches = project_matches(search_term) if search_term else None
+    if matches is not None:
+        query = query.filter(Project.id.in_(select(matches.c.id)))
     
     # Apply filters
     if project_type:
@@ -70,15 +76,12 @@ def index():
             current_sort = 'budget_asc'
             query = query.order_by(Project.budget.asc())
     elif sort == 'assessment_count':
-        # Join with assessments to get count for sorting
-        from sqlalchemy import func
-        query = query.outerjoin(Assessment).group_by(Project.id)
         if order == 'desc':
             current_sort = 'assessment_count_desc'
-            query = query.order_by(func.count(Assessment.id).desc())
+            query = query.order_by(Project.assessment_count.desc())
         else:
             current_sort = 'assessment_count_asc'
-            query = query.order_by(func.count(Assessment.id).asc())
+            query = query.order_by(Project.assessment_count.asc())
     else:  # default to created_at
         if order == 'desc':
             current_sort = 'date_desc'
@@ -98,7 +101,7 @@ def index():
 def show(id):
     """Show a specific project."""
     project = db.session.get(Project, id)
-    if project is None:
+    if project is None or project.deleted_at is not None:
         abort(404)
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
@@ -108,6 +111,34 @@ def show(id):
     
     return render_template('projects/show.html', project=project, assessments=assessments)
 
+@projects_bp.route('/<int:id>/compare')
+@replica_read
+@login_required
+def compare(id):
+    """Compare assessments of a project SDG by SDG."""
+    project = db.session.get(Project, id)
+    if project is None or project.deleted_at is not None:
+        abort(404)
+    if project.user_id != current_user.id:
+        abort(403)  # Forbidden
+
+    try:
+        comparison = compare_assessments(db.session, project, parse_assessment_ids(request.args.get('assessments')))
+    except ComparisonError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('projects.show', id=id))
+    if comparison is None:
+        abort(404)
+
+    assessments = db.session.execute(
+        select(Assessment.id, Assessment.status, Assessment.created_at)
+        .where(Assessment.project_id == id)
+        .order_by(Assessment.id.desc())
+    ).all()
+    selected = {assessment['id'] for assessment in comparison['assessments']}
+    return render_template('projects/compare.html', project=project, comparison=comparison,
+                           assessments=assessments, selected=selected, SDG_INFO=SDG_INFO)
+
 @projects_bp.route('/new', methods=['GET', 'POST'])
 @login_required
 def new_project():
@@ -137,7 +168,7 @@ def new_project():
 def edit(id):
     """Edit a project."""
     project = db.session.get(Project, id)
-    if project is None:
+    if project is None or project.deleted_at is not None:
         abort(404)
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
@@ -160,9 +191,10 @@ def delete(id):
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
     
-    db.session.delete(project)
-    db.session.commit()
-    flash('Project deleted successfully', 'success')
+    if delete_project(project):
+        flash('Project deleted successfully', 'success')
+    else:
+        flash('Project is being deleted; its assessments will disappear shortly', 'info')
     return redirect(url_for('projects.index'))
 
 @projects_bp.route('/<int:id>/status', methods=['POST'])
@@ -170,7 +202,7 @@ def delete(id):
 def update_status(id):
     """Update project status."""
     project = db.session.get(Project, id)
-    if project is None:
+    if project is None or project.deleted_at is not None:
         abort(404)
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
@@ -188,26 +220,32 @@ def update_status(id):
 @projects_bp.route('/search')
 @login_required
 def search():
-    """Search projects."""
+    """Search projects, showing the best SEARCH_LIMIT matches (the project list pages through all of them)."""
     query = request.args.get('q', '')
     project_type = request.args.get('type')
     
-    search_query = Project.query.filter_by(user_id=current_user.id)
-    
-    if query:
-        search_query = search_query.filter(Project.name.ilike(f'%{query}%'))
-    if project_type:
-        search_query = search_query.filter_by(project_type=project_type)
-    
-    projects = search_query.all()
+    if search_terms(query):
+        projects = search_projects(query, current_user.id, project_type=project_type)
+    else:
+        search_query = Project.query.filter_by(user_id=current_user.id, deleted_at=None)
+        if project_type:
+            search_query = search_query.filter_by(project_type=project_type)
+        projects = search_query.order_by(Project.created_at.desc(), Project.id.desc()).limit(SEARCH_LIMIT).all()
     return render_template('projects/search.html', projects=projects, query=query)
 
+@projects_bp.route('/autocomplete')
+@login_required
+def autocomplete():
+    """Project name suggestions for a partially typed search."""
+    limit = max(1, min(request.args.get('limit', 8, type=int), 20))
+    return jsonify(autocomplete_projects(request.args.get('q', ''), current_user.id, limit=limit))
+
 @projects_bp.route('/<int:id>/export')
 @login_required
 def export(id):
     """Export project data."""
     project = db.session.get(Project, id)
-    if project is None:
+    if project is None or project.deleted_at is not None:
         abort(404)
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
@@ -252,7 +290,7 @@ def export(id):
 def duplicate(id):
     """Duplicate a project."""
     project = db.session.get(Project, id)
-    if project is None:
+    if project is None or project.deleted_at is not None:
         abort(404)
     if project.user_id != current_user.id:
         abort(403)  # Forbidden
@@ -279,7 +317,7 @@ def duplicate(id):
 def new_assessment(id):
     """Create a new assessment for a project. Handles GET (show form) and POST (create or show errors)."""
     from app.models.assessment import Assessment
-    project = Project.query.filter_by(id=id, user_id=current_user.id).first()
+    project = Project.query.filter_by(id=id, user_id=current_user.id, deleted_at=None).first()
     if not project:
         flash('Project not found or you don\'t have permission to access it', 'danger')
         return redirect(url_for('projects.index'))
@@ -319,7 +357,7 @@ def save_progress():
         return jsonify({'error': 'No project ID provided'}), 400
     
     # Verify user owns the project
-    project = Project.query.filter_by(id=project_id, user_id=current_user.id).first()
+    project = Project.query.filter_by(id=project_id, user_id=current_user.id, deleted_at=None).first()
     if not project:
         return jsonify({'error': 'Project not found or access denied'}), 404
     
@@ -341,7 +379,7 @@ def save_progress():
 @login_required
 def save_expert_assessment(project_id):
     """Save an expert assessment for a project."""
-    project = Project.query.filter_by(id=project_id, user_id=current_user.id).first_or_404()
+    project = Project.query.filter_by(id=project_id, user_id=current_user.id, deleted_at=None).first_or_404()
 
     if request.method == 'POST':
         assessment_data_json = request.form.get('assessment-data')
@@ -425,6 +463,7 @@ def save_expert_assessment(project_id):
     return redirect(url_for('projects.view_project', project_id=project.id))
 
 @projects_bp.route('/expert-assessment/<int:assessment_id>/results')
+@replica_read
 @login_required
 def show_expert_results(assessment_id):
     """Display the results of an expert assessment."""
@@ -481,5 +520,5 @@ def show_expert_results(assessment_id):
 @login_required
 def expert_assessment(project_id):
     """Start a new expert assessment for a project."""
-    project = Project.query.filter_by(id=project_id, user_id=current_user.id).first_or_404()
+    project = Project.query.filter_by(id=project_id, user_id=current_user.id, deleted_at=None).first_or_404()
     return render_template('questionnaire/expert_assessment.html', project=project)
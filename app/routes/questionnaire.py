@@ -1,11 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from app import db as orm_db
-from app.models.assessment import Assessment
-from app.models.project import Project
 from app.models.response import QuestionResponse
 from app.models.sdg import SdgQuestion
 from app.services import scoring_service
+from app.services.ownership_service import owned_assessment
 from datetime import datetime
 import json
 from sqlalchemy import select
@@ -25,12 +24,7 @@ def save_questionnaire_response(assessment_id):
     user_id = current_user.id
 
     # ORM Version for Ownership Check
-    assessment = orm_db.session.execute(
-        select(Assessment).join(Project).where(
-            Assessment.id == assessment_id,
-            Project.user_id == user_id
-        )
-    ).scalar_one_or_none()
+    assessment, _ = owned_assessment(assessment_id, user_id)
 
     if not assessment:
         current_app.logger.warning(f"Save response failed: Assessment {assessment_id} not found or access denied for user {user_id}")
@@ -0,0 +1,196 @@
+"""
+Admin Listing Service
+Keyset-paginated listings of users, projects and assessments for the admin dashboard.
+
+Pages are addressed by an opaque cursor holding the sort key and id of the
+last row seen, so each page is an index range scan of `limit` rows no matter
+how deep the client scrolls. Only the columns the listings display are
+selected; draft_data, raw_expert_data and other blobs are never read.
+"""
+
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class ListingError(ValueError):
+    """Raised for an unknown listing, sort, or a malformed cursor."""
+
+
+class Listing:
+    """
+    Description of one admin listing.
+
+    Args:
+        select (str): SELECT ... FROM ... JOIN ... clause with explicit columns
+        id_column (str): Unique tiebreaker column for the keyset
+        sorts (dict): Sort name -> (sort expression, 'asc' or 'desc', result key holding its value);
+            the first is the default
+        filters (dict): Query arg -> SQL condition taking one ? parameter
+        prefix_filters (tuple): Filters whose value is matched as a LIKE prefix
+    """
+
+    def __init__(self, select, id_column, sorts, filters, prefix_filters=()):
+        self.select = select
+        self.id_column = id_column
+        self.sorts = sorts
+        self.filters = filters
+        self.prefix_filters = prefix_filters
+
+    @property
+    def default_sort(self):
+        return next(iter(self.sorts))
+
+
+def encode_cursor(sort, sort_value, row_id):
+    payload = json.dumps([sort, sort_value, row_id], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Return (sort_value, row_id) from a cursor issued for `sort`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ListingError('Malformed cursor')
+    if cursor_sort != sort or not isinstance(row_id, int):
+        raise ListingError('Cursor does not match the requested sort')
+    return sort_value, row_id
+
+
+LISTINGS = {
+    'users': Listing(
+        # Counters are maintained on the row (see counter_service)
+        select='SELECT u.id, u.name, u.email, u.is_admin, u.project_count, u.assessment_count FROM "user" u',
+        id_column='u.id',
+        sorts={
+            'name': ('u.name', 'asc', 'name'),
+            'newest': ('u.id', 'desc', 'id'),
+        },
+        filters={
+            'q': 'u.name LIKE ?',
+            'email': 'u.email LIKE ?',
+            'is_admin': 'u.is_admin = ?',
+        },
+        prefix_filters=('q', 'email'),
+    ),
+    'projects': Listing(
+        select='''
+            SELECT p.id, p.name, p.project_type, p.location, p.sector, p.status,
+                   p.user_id, p.created_at, p.updated_at, p.assessment_count, p.completed_count,
+                   p.latest_overall_score, p.last_assessed_at, u.name as user_name
+            FROM projects p
+            JOIN "user" u ON p.user_id = u.id
+        ''',
+        id_column='p.id',
+        sorts={
+            'newest': ('p.created_at', 'desc', 'created_at'),
+            'oldest': ('p.created_at', 'asc', 'created_at'),
+            'name': ('p.name', 'asc', 'name'),
+        },
+        filters={
+            'q': 'p.name LIKE ?',
+            'project_type': 'p.project_type = ?',
+            'sector': 'p.sector = ?',
+            'status': 'p.status = ?',
+            'user_id': 'p.user_id = ?',
+        },
+        prefix_filters=('q',),
+    ),
+    'assessments': Listing(
+        select='''
+            SELECT a.id, a.project_id, a.status, a.overall_score, a.assessment_type,
+                   a.created_at, a.updated_at, a.completed_at,
+                   p.name as project_name, p.user_id, u.name as user_name
+            FROM assessments a
+            JOIN projects p ON a.project_id = p.id
+            JOIN "user" u ON p.user_id = u.id
+        ''',
+        id_column='a.id',
+        sorts={
+            'newest': ('a.created_at', 'desc', 'created_at'),
+            'oldest': ('a.created_at', 'asc', 'created_at'),
+        },
+        filters={
+            'status': 'a.status = ?',
+            'assessment_type': 'a.assessment_type = ?',
+            'project_id': 'a.project_id = ?',
+            'user_id': 'p.user_id = ?',
+        },
+    ),
+}
+
+
+def fetch_page(conn, kind, cursor=None, limit=DEFAULT_PAGE_SIZE, sort=None, filters=None):
+    """
+    Fetch one page of an admin listing.
+
+    Args:
+        conn: sqlite3 connection with a Row factory (see get_db)
+        kind (str): 'users', 'projects' or 'assessments'
+        cursor (str): next_cursor returned by the previous page, or None for the first page
+        limit (int): Page size, clamped to MAX_PAGE_SIZE
+        sort (str): One of the listing's sorts, defaulting to its first
+        filters (dict): Query args; keys the listing does not support are ignored
+
+    Returns:
+        dict: {'items': [...], 'next_cursor': str or None, 'sort': str}
+    """
+    listing = LISTINGS.get(kind)
+    if listing is None:
+        raise ListingError(f'Unknown listing: {kind}')
+    sort = sort or listing.default_sort
+    if sort not in listing.sorts:
+        raise ListingError(f'Unknown sort for {kind}: {sort}')
+    sort_expr, direction, sort_key = listing.sorts[sort]
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+    conditions, params = [], []
+    for name, condition in listing.filters.items():
+        value = (filters or {}).get(name)
+        if value in (None, ''):
+            continue
+        if name in listing.prefix_filters:
+            value = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            condition += " ESCAPE '\\'"
+        conditions.append(condition)
+        params.append(value)
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort)
+        op = '<' if direction == 'desc' else '>'
+        if sort_expr == listing.id_column:
+            conditions.append(f'{listing.id_column} {op} ?')
+            params.append(last_id)
+        elif sort_value is None:
+            # SQLite sorts NULLs first: after a NULL come the other NULLs and, ascending, every value
+            following = f' OR {sort_expr} IS NOT NULL' if direction == 'asc' else ''
+            conditions.append(f'(({sort_expr} IS NULL AND {listing.id_column} {op} ?){following})')
+            params.append(last_id)
+        else:
+            # After a value, descending, come all the NULLs
+            following = f' OR {sort_expr} IS NULL' if direction == 'desc' else ''
+            conditions.append(f'({sort_expr} {op} ? OR ({sort_expr} = ? AND {listing.id_column} {op} ?){following})')
+            params.extend([sort_value, sort_value, last_id])
+
+    sql = listing.select
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    order = f'{sort_expr} {direction.upper()}'
+    if sort_expr != listing.id_column:
+        order += f', {listing.id_column} {direction.upper()}'
+    sql += f' ORDER BY {order} LIMIT ?'
+    params.append(limit + 1)
+
+    rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, last[sort_key], last['id'])
+    return {'items': rows, 'next_cursor': next_cursor, 'sort': sort}
@@ -0,0 +1,488 @@
+"""
+Analytics Rollup Service
+Maintains per-day and per-month rollups of projects and assessments, plus
+per-SDG score histograms, so analytics reads stay constant-time as history grows.
+
+Buckets are computed in Python from created_at rather than with SQL date
+functions, so the same code runs on SQLite and PostgreSQL. Rollups are kept
+current on write by flush listeners (ANALYTICS_ROLLUPS_ON_WRITE) or by running
+`flask refresh-rollups` periodically; `flask backfill-rollups` rebuilds history.
+"""
+
+from collections import defaultdict
+from datetime import datetime, date, time, timedelta
+
+from flask import current_app
+from sqlalchemy import event, select, delete, insert, func, case
+
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.analytics_rollup import AnalyticsRollup, SdgScoreHistogram
+from app.utils.db_events import pending_changes, increment_row
+from app.utils.cascades import cascaded_criterion
+
+GRAINS = ('day', 'month')
+SCORE_BANDS = ('0-2', '2-4', '4-6', '6-8', '8-10')
+
+PROJECT_ATTRS = ['created_at', 'project_type', 'sector', 'status', 'deleted_at']
+ASSESSMENT_ATTRS = ['created_at', 'status', 'overall_score', 'project_id']
+
+# session.info key holding deltas between before_flush and after_flush
+_PENDING_DELTAS_KEY = 'analytics_rollup_deltas'
+
+
+def score_band(value):
+    """Map a 0-10 score to its distribution band label, or None when unscored."""
+    if value is None:
+        return None
+    value = float(value)
+    if value < 2:
+        return '0-2'
+    if value < 4:
+        return '2-4'
+    if value < 6:
+        return '4-6'
+    if value < 8:
+        return '6-8'
+    return '8-10'
+
+
+def bucket_start(moment, grain):
+    """First day of the day/month bucket containing `moment`."""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day if grain == 'day' else day.replace(day=1)
+
+
+class _Deltas:
+    """Accumulates rollup and histogram increments for one flush or rebuild."""
+
+    def __init__(self, grains=GRAINS):
+        self.grains = grains
+        self.rollups = defaultdict(lambda: [0, 0, 0.0])
+        self.histograms = defaultdict(int)
+
+    def _add(self, created_at, keys, score, sign):
+        if created_at is None:
+            return
+        for grain in self.grains:
+            bucket = bucket_start(created_at, grain)
+            for entity, dimension, value in keys:
+                entry = self.rollups[(grain, bucket, entity, dimension, value or '')]
+                entry[0] += sign
+                if score is not None:
+                    entry[1] += sign
+                    entry[2] += sign * float(score)
+
+    def add_project(self, values, sign):
+        # A project being purged already left the rollups when deleted_at was set
+        if values['deleted_at'] is not None:
+            return
+        keys = [
+            ('project', 'all', ''),
+            ('project', 'project_type', values['project_type']),
+            ('project', 'sector', values['sector']),
+            ('project', 'status', values['status']),
+        ]
+        self._add(values['created_at'], keys, None, sign)
+
+    def add_assessment(self, values, project_dims, sign):
+        project_type, sector = project_dims
+        keys = [
+            ('assessment', 'all', ''),
+            ('assessment', 'status', values['status']),
+            ('assessment', 'project_type', project_type),
+            ('assessment', 'sector', sector),
+        ]
+        band = score_band(values['overall_score'])
+        if band:
+            keys.append(('assessment', 'score_band', band))
+        self._add(values['created_at'], keys, values['overall_score'], sign)
+
+    def add_score(self, sdg_id, total_score, sign):
+        band = score_band(total_score)
+        if sdg_id is not None and band:
+            self.histograms[(sdg_id, band)] += sign
+
+    def pending(self):
+        rollups = {key: entry for key, entry in self.rollups.items() if any(entry)}
+        histograms = {key: count for key, count in self.histograms.items() if count}
+        return (rollups, histograms) if rollups or histograms else None
+
+
+def _rollups_on_write():
+    return current_app.config.get('ANALYTICS_ROLLUPS_ON_WRITE', True)
+
+
+def _project_dims(session, obj, project_id, project_changes, which):
+    """(project_type, sector) of an assessment's project before ('old') or after ('new') the flush."""
+    if project_id in project_changes:
+        dims = project_changes[project_id][0 if which == 'old' else 1]
+        if dims is not None:
+            return dims
+    project = obj.__dict__.get('project')
+    if project is None or (project_id is not None and project.id != project_id):
+        if project_id is None:
+            return (None, None)
+        with session.no_autoflush:
+            project = session.get(Project, project_id)
+    return (project.project_type, project.sector) if project is not None else (None, None)
+
+
+def _collect_deltas(session, flush_context, instances):
+    """before_flush listener: turn pending ORM writes into rollup deltas."""
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+    if not _rollups_on_write():
+        return
+
+    changes = list(pending_changes(session, Project, Assessment, SdgScore))
+    if not changes:
+        return
+    deltas = _Deltas()
+
+    # Stamp created_at now so inserts land in the bucket the rollup records
+    now = datetime.utcnow()
+    for obj, old, new in changes:
+        if old is None and isinstance(obj, (Project, Assessment)) and obj.created_at is None:
+            obj.created_at = now
+
+    project_changes = {}
+    for obj, old, new in changes:
+        if not isinstance(obj, Project):
+            continue
+        old_values = old(PROJECT_ATTRS) if old else None
+        new_values = new(PROJECT_ATTRS) if new else None
+        if old_values:
+            deltas.add_project(old_values, -1)
+        if new_values:
+            deltas.add_project(new_values, +1)
+        if obj.id is not None:
+            project_changes[obj.id] = (
+                (old_values['project_type'], old_values['sector']) if old_values else None,
+                (new_values['project_type'], new_values['sector']) if new_values else None,
+            )
+
+    in_flush = set()
+    for obj, old, new in changes:
+        if isinstance(obj, Assessment):
+            if obj.id is not None:
+                in_flush.add(obj.id)
+            if old:
+                values = old(ASSESSMENT_ATTRS)
+                deltas.add_assessment(values, _project_dims(session, obj, values['project_id'], project_changes, 'old'), -1)
+            if new:
+                values = new(ASSESSMENT_ATTRS)
+                deltas.add_assessment(values, _project_dims(session, obj, values['project_id'], project_changes, 'new'), +1)
+        elif isinstance(obj, SdgScore):
+            if old:
+                values = old(['sdg_id', 'total_score'])
+                deltas.add_score(values['sdg_id'], values['total_score'], -1)
+            if new:
+                values = new(['sdg_id', 'total_score'])
+                sdg_id = values['sdg_id'] if values['sdg_id'] is not None else getattr(obj.sdg_goal, 'id', None)
+                deltas.add_score(sdg_id, values['total_score'], +1)
+
+    # A project whose type or sector changed moves its untouched assessments too
+    for project_id, (old_dims, new_dims) in project_changes.items():
+        if old_dims is None or new_dims is None or old_dims == new_dims:
+            continue
+        rows = session.connection().execute(
+            select(Assessment.id, Assessment.created_at, Assessment.status,
+                   Assessment.overall_score, Assessment.project_id)
+            .where(Assessment.project_id == project_id)
+        ).mappings()
+        for row in rows:
+            if row['id'] in in_flush:
+                continue
+            deltas.add_assessment(row, old_dims, -1)
+            deltas.add_assessment(row, new_dims, +1)
+
+    # Assessments and scores that ON DELETE CASCADE removes with their parents
+    conn = session.connection()
+    criterion = cascaded_criterion(session, Assessment)
+    if criterion is not None:
+        rows = conn.execute(
+            select(Assessment.created_at, Assessment.status, Assessment.overall_score, Assessment.project_id)
+            .where(criterion)
+        ).mappings()
+        for row in rows:
+            dims = project_changes.get(row['project_id'], (None, None))[0]
+            deltas.add_assessment(row, dims or (None, None), -1)
+    criterion = cascaded_criterion(session, SdgScore)
+    if criterion is not None:
+        band = _score_band_case()
+        counts = conn.execute(
+            select(SdgScore.sdg_id, band, func.count())
+            .where(criterion, SdgScore.total_score.isnot(None))
+            .group_by(SdgScore.sdg_id, band)
+        )
+        for sdg_id, band_label, count in counts:
+            deltas.histograms[(sdg_id, band_label)] -= count
+
+    pending = deltas.pending()
+    if pending:
+        session.info[_PENDING_DELTAS_KEY] = pending
+
+
+def _apply_deltas(session, flush_context):
+    """after_flush listener: apply collected deltas in the flushing transaction."""
+    pending = session.info.pop(_PENDING_DELTAS_KEY, None)
+    if not pending:
+        return
+    rollups, histograms = pending
+    conn = session.connection()
+    now = datetime.utcnow()
+
+    rollup_table = AnalyticsRollup.__table__
+    for (grain, bucket, entity, dimension, value), (items, scored, score_sum) in rollups.items():
+        key = {'grain': grain, 'bucket': bucket, 'entity': entity, 'dimension': dimension, 'value': value}
+        increment_row(conn, rollup_table, key,
+                      {'item_count': items, 'score_count': scored, 'score_sum': score_sum}, now)
+
+    histogram_table = SdgScoreHistogram.__table__
+    for (sdg_id, band), count in histograms.items():
+        increment_row(conn, histogram_table, {'sdg_id': sdg_id, 'band': band}, {'count': count}, now)
+
+
+def _discard_deltas(session, previous_transaction=None):
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+
+
+def register_rollup_listeners():
+    """
+    Attach the flush listeners that keep rollups current on write.
+    They are no-ops for apps with ANALYTICS_ROLLUPS_ON_WRITE disabled.
+    """
+    if event.contains(db.session, 'before_flush', _collect_deltas):
+        return
+    event.listen(db.session, 'before_flush', _collect_deltas)
+    event.listen(db.session, 'after_flush', _apply_deltas)
+    event.listen(db.session, 'after_soft_rollback', _discard_deltas)
+
+
+# --- Rebuilding ---
+
+def _write_rollups(session, rollups):
+    if not rollups:
+        return
+    now = datetime.utcnow()
+    session.execute(insert(AnalyticsRollup), [
+        {'grain': grain, 'bucket': bucket, 'entity': entity, 'dimension': dimension, 'value': value,
+         'item_count': items, 'score_count': scored, 'score_sum': score_sum, 'updated_at': now}
+        for (grain, bucket, entity, dimension, value), (items, scored, score_sum) in rollups.items()
+    ])
+
+
+def _recompute_days(session, start_day, end_day):
+    """Rebuild day buckets in [start_day, end_day) from the base tables."""
+    start_at = datetime.combine(start_day, time.min)
+    end_at = datetime.combine(end_day, time.min)
+    deltas = _Deltas(grains=('day',))
+
+    assessments = session.execute(
+        select(Assessment.created_at, Assessment.status, Assessment.overall_score,
+               Project.project_type, Project.sector)
+        .join(Project, Project.id == Assessment.project_id)
+        .where(Assessment.created_at >= start_at, Assessment.created_at < end_at)
+        .execution_options(yield_per=1000)
+    ).mappings()
+    for row in assessments:
+        deltas.add_assessment(row, (row['project_type'], row['sector']), +1)
+
+    projects = session.execute(
+        select(*[getattr(Project, attr) for attr in PROJECT_ATTRS])
+        .where(Project.created_at >= start_at, Project.created_at < end_at)
+        .execution_options(yield_per=1000)
+    ).mappings()
+    for row in projects:
+        deltas.add_project(row, +1)
+
+    session.execute(delete(AnalyticsRollup).where(
+        AnalyticsRollup.grain == 'day',
+        AnalyticsRollup.bucket >= start_day,
+        AnalyticsRollup.bucket < end_day,
+    ))
+    _write_rollups(session, deltas.rollups)
+
+
+def _next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _recompute_months(session, months):
+    """Rebuild month buckets by summing their day buckets."""
+    for month in sorted(months):
+        end = _next_month(month)
+        totals = session.execute(
+            select(AnalyticsRollup.entity, AnalyticsRollup.dimension, AnalyticsRollup.value,
+                   func.sum(AnalyticsRollup.item_count), func.sum(AnalyticsRollup.score_count),
+                   func.sum(AnalyticsRollup.score_sum))
+            .where(AnalyticsRollup.grain == 'day',
+                   AnalyticsRollup.bucket >= month, AnalyticsRollup.bucket < end)
+            .group_by(AnalyticsRollup.entity, AnalyticsRollup.dimension, AnalyticsRollup.value)
+        ).all()
+        session.execute(delete(AnalyticsRollup).where(
+            AnalyticsRollup.grain == 'month', AnalyticsRollup.bucket == month))
+        _write_rollups(session, {
+            ('month', month, entity, dimension, value): [items or 0, scored or 0, score_sum or 0.0]
+            for entity, dimension, value, items, scored, score_sum in totals
+            if items
+        })
+
+
+def _score_band_case():
+    """SQL counterpart of score_band()."""
+    return case(
+        (SdgScore.total_score < 2, '0-2'),
+        (SdgScore.total_score < 4, '2-4'),
+        (SdgScore.total_score < 6, '4-6'),
+        (SdgScore.total_score < 8, '6-8'),
+        else_='8-10',
+    )
+
+
+def rebuild_score_histograms():
+    """Recompute sdg_score_histograms with a single grouped query."""
+    session = db.session
+    band = _score_band_case()
+    counts = session.execute(
+        select(SdgScore.sdg_id, band, func.count())
+        .where(SdgScore.total_score.isnot(None))
+        .group_by(SdgScore.sdg_id, band)
+    ).all()
+    now = datetime.utcnow()
+    session.execute(delete(SdgScoreHistogram))
+    if counts:
+        session.execute(insert(SdgScoreHistogram), [
+            {'sdg_id': sdg_id, 'band': band_label, 'count': count, 'updated_at': now}
+            for sdg_id, band_label, count in counts
+        ])
+
+
+def _history_start(session):
+    firsts = [
+        session.query(func.min(Assessment.created_at)).scalar(),
+        session.query(func.min(Project.created_at)).scalar(),
+    ]
+    firsts = [first for first in firsts if first is not None]
+    return min(firsts).date() if firsts else None
+
+
+def backfill_rollups(start=None, end=None, chunk_days=31, progress=None):
+    """
+    Rebuild rollups over [start, end) in chunks, committing after each chunk.
+
+    Args:
+        start (date): First day to rebuild (defaults to the oldest record)
+        end (date): Day after the last day to rebuild (defaults to tomorrow)
+        chunk_days (int): Days recomputed per transaction
+        progress (callable): Called with (chunk_start, chunk_end) after each commit
+
+    Returns:
+        int: Number of chunks processed
+    """
+    session = db.session
+    start = start or _history_start(session)
+    end = end or (date.today() + timedelta(days=1))
+    chunks = 0
+    try:
+        day = start
+        while day is not None and day < end:
+            chunk_end = min(day + timedelta(days=chunk_days), end)
+            _recompute_days(session, day, chunk_end)
+            months = {bucket_start(day, 'month')}
+            month = bucket_start(day, 'month')
+            while month < chunk_end:
+                months.add(month)
+                month = _next_month(month)
+            _recompute_months(session, months)
+            session.commit()
+            chunks += 1
+            if progress:
+                progress(day, chunk_end)
+            day = chunk_end
+
+        rebuild_score_histograms()
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return chunks
+
+
+def refresh_rollups(since):
+    """
+    Recompute only the buckets touched by rows updated since `since`.
+    Intended for a periodic job when ANALYTICS_ROLLUPS_ON_WRITE is disabled.
+    Deletions do not bump updated_at, so schedule an occasional full backfill as well.
+
+    Returns:
+        int: Number of day buckets recomputed
+    """
+    session = db.session
+    moments = set(session.execute(
+        select(Assessment.created_at).where(Assessment.updated_at >= since)).scalars())
+    moments.update(session.execute(
+        select(Project.created_at).where(Project.updated_at >= since)).scalars())
+    moments.update(session.execute(
+        select(Assessment.created_at)
+        .join(Project, Project.id == Assessment.project_id)
+        .where(Project.updated_at >= since)).scalars())
+    days = sorted({bucket_start(moment, 'day') for moment in moments if moment is not None})
+
+    try:
+        for day in days:
+            _recompute_days(session, day, day + timedelta(days=1))
+        _recompute_months(session, {bucket_start(day, 'month') for day in days})
+        rebuild_score_histograms()
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(days)
+
+
+# --- Reading ---
+
+def get_time_series(entity='assessment', grain='month', dimension='all', start=None, end=None):
+    """
+    Bucketed counts for one entity/dimension.
+
+    Returns:
+        list: Dicts with bucket, value, count and avg_score, ordered by bucket
+    """
+    query = AnalyticsRollup.query.filter_by(entity=entity, grain=grain, dimension=dimension)
+    if start is not None:
+        query = query.filter(AnalyticsRollup.bucket >= bucket_start(start, grain))
+    if end is not None:
+        query = query.filter(AnalyticsRollup.bucket < end)
+    return [{
+        'bucket': row.bucket,
+        'value': row.value or None,
+        'count': row.item_count,
+        'avg_score': row.score_sum / row.score_count if row.score_count else None,
+    } for row in query.order_by(AnalyticsRollup.bucket, AnalyticsRollup.value).all() if row.item_count]
+
+
+def get_breakdown(entity, dimension):
+    """
+    All-time counts per dimension value, summed from the month buckets.
+
+    Returns:
+        list: (value, count) tuples, largest first
+    """
+    rows = db.session.execute(
+        select(AnalyticsRollup.value, func.sum(AnalyticsRollup.item_count))
+        .where(AnalyticsRollup.entity == entity, AnalyticsRollup.dimension == dimension,
+               AnalyticsRollup.grain == 'month')
+        .group_by(AnalyticsRollup.value)
+    ).all()
+    return sorted(((value or None, count) for value, count in rows if count),
+                  key=lambda item: item[1], reverse=True)
+
+
+def get_score_distribution():
+    """Overall score distribution in SCORE_BANDS order."""
+    counts = dict(get_breakdown('assessment', 'score_band'))
+    return [{'score_range': band, 'count': counts[band]} for band in SCORE_BANDS if band in counts]
+
@@ -0,0 +1,169 @@
+"""
+API Listing Service
+Keyset-paginated, sparse-fieldset reads for the JSON API.
+
+`fields=` names the columns a client wants (`fields=id,name,assessments.status`
+for embedded assessments); only those columns are selected, through load_only.
+Assessments leave out their heavy JSON columns (draft_data, raw_expert_data)
+unless they are asked for by name. `include=scores` embeds each assessment's
+SDG scores, loaded with one extra query per page rather than one per row.
+
+Project lists are ordered by updated_at then id, newest first and projects
+without updated_at last, and paged with the same opaque cursors as the admin
+listings (see admin_listing_service).
+"""
+
+import datetime
+
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import load_only, selectinload
+
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.services.admin_listing_service import ListingError, encode_cursor, decode_cursor
+from app.utils.serializers import model_serializer, serialize_all
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+HEAVY_ASSESSMENT_COLUMNS = ('draft_data', 'raw_expert_data')
+PROJECT_COLUMNS = tuple(c.name for c in Project.__table__.columns)
+ASSESSMENT_COLUMNS = tuple(c.name for c in Assessment.__table__.columns)
+DEFAULT_ASSESSMENT_COLUMNS = tuple(c for c in ASSESSMENT_COLUMNS if c not in HEAVY_ASSESSMENT_COLUMNS)
+SCORE_COLUMNS = ('id', 'sdg_id', 'total_score')
+INCLUDES = ('scores',)
+
+# Cursor sort name for the project list
+_PROJECT_SORT = 'updated'
+
+
+def parse_fields(value):
+    """
+    Split a `fields=` argument into requested columns per resource.
+
+    Returns:
+        dict: Resource ('' for the top level, 'assessments' for embedded ones) -> set of names
+    """
+    fields = {}
+    for name in (value or '').split(','):
+        name = name.strip()
+        if not name:
+            continue
+        resource, _, column = name.rpartition('.')
+        fields.setdefault(resource, set()).add(column)
+    return fields
+
+
+def parse_includes(value):
+    includes = {name.strip() for name in (value or '').split(',') if name.strip()}
+    unknown = includes - set(INCLUDES)
+    if unknown:
+        raise ListingError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return includes
+
+
+def _columns(requested, available, default):
+    """Requested columns in table order (id always included), or the defaults."""
+    if not requested:
+        return default
+    unknown = requested - set(available)
+    if unknown:
+        raise ListingError(f"Unknown field: {', '.join(sorted(unknown))}")
+    return tuple(c for c in available if c in requested or c == 'id')
+
+
+def _load_only(model, columns):
+    return load_only(*[getattr(model, column) for column in columns])
+
+
+def _after_cursor(cursor):
+    """Keyset condition for rows after `cursor` in updated_at DESC, id DESC order (NULLs last)."""
+    updated_at, last_id = decode_cursor(cursor, _PROJECT_SORT)
+    if updated_at is None:
+        return and_(Project.updated_at.is_(None), Project.id < last_id)
+    try:
+        updated_at = datetime.datetime.fromisoformat(updated_at)
+    except (TypeError, ValueError):
+        raise ListingError('Malformed cursor')
+    return or_(
+        Project.updated_at < updated_at,
+        and_(Project.updated_at == updated_at, Project.id < last_id),
+        Project.updated_at.is_(None),
+    )
+
+
+def project_page(session, user_id, cursor=None, limit=None, fields=None):
+    """
+    One page of a user's projects.
+
+    Args:
+        cursor (str): next_cursor from the previous page, or None for the first page
+        limit (int): Page size, clamped to MAX_PAGE_SIZE
+        fields (dict): parse_fields() result
+
+    Returns:
+        dict: {'items': [...], 'next_cursor': str or None}
+    """
+    columns = _columns((fields or {}).get(''), PROJECT_COLUMNS, PROJECT_COLUMNS)
+    limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    # The sort key is loaded even when not requested, to build the cursor
+    loaded = set(columns) | {'id', 'updated_at'}
+    query = (
+        select(Project).options(_load_only(Project, loaded))
+        .where(Project.user_id == user_id, Project.deleted_at.is_(None))
+        # NULLS LAST spelled out: PostgreSQL sorts NULLs first under DESC, SQLite last
+        .order_by(Project.updated_at.desc().nulls_last(), Project.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(_after_cursor(cursor))
+    projects = session.scalars(query).all()
+
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        last = projects[-1]
+        next_cursor = encode_cursor(_PROJECT_SORT, last.updated_at, last.id)
+    return {'items': serialize_all(projects, columns), 'next_cursor': next_cursor}
+
+
+def project_resource(session, project_id, user_id, fields=None, includes=()):
+    """
+    A user's project with its assessments embedded.
+
+    Returns:
+        dict: The project, or None when it does not exist or belongs to someone else
+    """
+    fields = fields or {}
+    columns = _columns(fields.get(''), PROJECT_COLUMNS + ('assessments',), PROJECT_COLUMNS)
+    embed = 'assessments' in columns or not fields.get('')
+    columns = tuple(c for c in columns if c != 'assessments')
+    project = session.scalar(
+        select(Project).options(_load_only(Project, columns))
+        .where(Project.id == project_id, Project.user_id == user_id, Project.deleted_at.is_(None))
+    )
+    if project is None:
+        return None
+    resource = model_serializer(Project, columns)(project)
+    if embed:
+        resource['assessments'] = assessment_rows(session, project_id, fields.get('assessments'), includes)
+    return resource
+
+
+def assessment_rows(session, project_id, requested=None, includes=()):
+    """A project's assessments with the requested columns (heavy JSON columns only by name)."""
+    columns = _columns(requested, ASSESSMENT_COLUMNS, DEFAULT_ASSESSMENT_COLUMNS)
+    options = [_load_only(Assessment, columns)]
+    if 'scores' in includes:
+        options.append(selectinload(Assessment.sdg_scores).options(
+            _load_only(SdgScore, SCORE_COLUMNS + ('assessment_id',))))
+    assessments = session.scalars(
+        select(Assessment).options(*options)
+        .where(Assessment.project_id == project_id).order_by(Assessment.id)
+    ).all()
+
+    rows = serialize_all(assessments, columns)
+    if 'scores' in includes:
+        for row, assessment in zip(rows, assessments):
+            row['scores'] = serialize_all(assessment.sdg_scores, SCORE_COLUMNS)
+    return rows
@@ -11,6 +11,7 @@ from datetime import datetime
 from app import db
 from app.models.assessment import Assessment, SdgScore
 from app.models.project import Project
+from app.utils.events import publish_after_commit
 
 def get_assessment(assessment_id):
     """Get an assessment by ID."""
@@ -85,3 +86,82 @@ def save_assessment_scores(assessment_id, sdgs, form_data):
         current_app.logger.error(f"Error saving SDG scores: {str(e)}")
         db.session.rollback()
         return False
+
+# --- Queued writes ---
+# These take the writing session as their first argument so they can run
+# through app.utils.write_queue.run_write, inline or on the writer thread.
+
+def save_draft_data(session, assessment_id, draft_data, client_id=None):
+    """
+    Store an assessment's autosaved draft (a JSON string).
+
+    Once committed, a draft.saved event goes to the owner's other pages, which
+    compare `client_id` with their own to notice a draft edited elsewhere.
+    """
+    assessment = session.get(Assessment, assessment_id)
+    if assessment is None:
+        raise LookupError(f'Assessment {assessment_id} not found')
+    assessment.draft_data = draft_data
+    assessment.updated_at = datetime.utcnow()
+    publish_after_commit(session, assessment.user_id, 'draft.saved', {
+        'assessment_id': assessment_id,
+        'saved_at': assessment.updated_at,
+        'client_id': client_id,
+    })
+    return True
+
+def upsert_responses(session, assessment_id, responses):
+    """
+    Insert or update question responses for an assessment.
+
+    Args:
+        responses (list): Dicts with question_id, response_text and score
+
+    Returns:
+        int: Number of responses written
+    """
+    valid = [r for r in responses
+             if r.get('question_id') and r.get('response_text') and r.get('score') is not None]
+    return upsert_response_sets(session, {assessment_id: valid})
+
+
+def upsert_response_sets(session, responses_by_assessment):
+    """
+    Insert or update responses for several assessments, reading existing rows in one query.
+
+    Args:
+        responses_by_assessment (dict): Assessment id -> list of validated response dicts
+            (question_id, score and optionally response_text)
+
+    Returns:
+        int: Number of responses written
+    """
+    from app.models.response import QuestionResponse
+
+    pairs = {(assessment_id, r['question_id'])
+             for assessment_id, responses in responses_by_assessment.items() for r in responses}
+    if not pairs:
+        return 0
+
+    existing = {
+        (response.assessment_id, response.question_id): response
+        for response in session.query(QuestionResponse).filter(
+            QuestionResponse.assessment_id.in_({assessment_id for assessment_id, _ in pairs}),
+            QuestionResponse.question_id.in_({question_id for _, question_id in pairs})
+        )
+    }
+    now = datetime.utcnow()
+    written = 0
+    for assessment_id, responses in responses_by_assessment.items():
+        for r in responses:
+            key = (assessment_id, r['question_id'])
+            response = existing.get(key)
+            if response is None:
+                response = QuestionResponse(assessment_id=assessment_id, question_id=r['question_id'])
+                session.add(response)
+                existing[key] = response
+            response.response_text = r.get('response_text')
+            response.response_score = r['score']
+            response.updated_at = now
+            written += 1
+    return written
@@ -0,0 +1,245 @@
+"""
+Batch Service
+Creates and updates many projects, assessments and responses in one request.
+
+Every item of a batch is validated before anything is written; a batch with
+any invalid item raises BatchValidationError listing each failure by index and
+writes nothing. Valid batches are written in one transaction: ownership and
+existing rows are read with one query per batch, and the new rows go out in a
+single flush, which SQLAlchemy sends as multi-row INSERTs. Writing through the
+session (rather than Core inserts) keeps the stats, rollup, counter and search
+index maintenance that hangs off flushes.
+
+The writer functions take the session first so routes can hand them to
+run_write().
+"""
+
+import datetime
+
+from sqlalchemy import select
+
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.models.sdg import SdgQuestion
+from app.services.assessment_service import upsert_response_sets
+
+# Writable project fields, in assignment order (end_date is validated against start_date)
+PROJECT_FIELDS = ('name', 'description', 'project_type', 'location', 'size_sqm',
+                  'start_date', 'end_date', 'budget', 'sector', 'status')
+PROJECT_STATUSES = ('planning', 'in_progress', 'completed', 'on_hold', 'cancelled')
+ASSESSMENT_TYPES = ('standard', 'expert')
+
+
+class BatchValidationError(ValueError):
+    """A batch with invalid items; `errors` is a list of {'index', 'error'}."""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid item(s) in batch')
+        self.errors = errors
+
+
+def _number(value):
+    if value is None or value == '':
+        return None
+    return float(value)
+
+
+def _date(value):
+    if not value:
+        return None
+    return datetime.datetime.strptime(value, '%Y-%m-%d')
+
+
+_PARSERS = {'size_sqm': _number, 'budget': _number, 'start_date': _date, 'end_date': _date}
+
+
+def _project_values(item):
+    """Whitelisted, parsed fields of one project item (raises ValueError/TypeError)."""
+    values = {}
+    for field in PROJECT_FIELDS:
+        if field in item:
+            parse = _PARSERS.get(field)
+            values[field] = parse(item[field]) if parse else item[field]
+    if 'status' in values and values['status'] not in PROJECT_STATUSES:
+        raise ValueError(f"Invalid status: {values['status']}")
+    return values
+
+
+def _is_id(value):
+    # JSON true/false arrive as bools, which are ints equal to 1/0 and would match ids 1 and 0
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_id(item, key):
+    """The integer `key` of an item, or ValueError naming the field."""
+    value = item.get(key)
+    if not _is_id(value):
+        raise ValueError(f'{key} must be an integer')
+    return value
+
+
+def _ids(items, key):
+    """Integer values of `key` in the dict items, skipping malformed ones (reported later)."""
+    ids = set()
+    for item in items:
+        value = item.get(key) if isinstance(item, dict) else None
+        if _is_id(value):
+            ids.add(value)
+    return ids
+
+
+def save_projects(session, user_id, items):
+    """
+    Create projects, or update the user's projects for items carrying an `id`.
+
+    Returns:
+        list: {'index', 'id', 'status': 'created'|'updated'} per item, in order
+    """
+    existing = {}
+    update_ids = _ids(items, 'id')
+    if update_ids:
+        existing = {project.id: project for project in session.scalars(
+            select(Project).where(Project.id.in_(update_ids), Project.user_id == user_id,
+                                  Project.deleted_at.is_(None))
+        )}
+
+    errors, planned, seen = [], [], set()
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Item must be an object')
+            values = _project_values(item)
+            project_id = item.get('id')
+            if project_id is None:
+                if not values.get('name'):
+                    raise ValueError('Project name is required')
+                # Model validators run on assignment; the transient copy is never added
+                planned.append((index, Project(user_id=user_id, **values), None))
+                continue
+            project = existing.get(_check_id(item, 'id'))
+            if project is None:
+                raise ValueError('Project not found or access denied')
+            if project_id in seen:
+                raise ValueError('Project appears more than once in the batch')
+            seen.add(project_id)
+            merged = {field: getattr(project, field) for field in PROJECT_FIELDS}
+            merged.update(values)
+            Project(**merged)
+            planned.append((index, project, values))
+        except (ValueError, TypeError) as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+
+    now = datetime.datetime.utcnow()
+    for _, project, values in planned:
+        if values is None:
+            session.add(project)
+            continue
+        for field in PROJECT_FIELDS:
+            if field in values:
+                setattr(project, field, values[field])
+        project.updated_at = now
+    session.flush()
+    return [{'index': index, 'id': project.id, 'status': 'created' if values is None else 'updated'}
+            for index, project, values in planned]
+
+
+def create_assessments(session, user_id, items):
+    """
+    Create draft assessments on the user's projects.
+
+    Returns:
+        list: {'index', 'id', 'status': 'created'} per item, in order
+    """
+    project_ids = _ids(items, 'project_id')
+    owned = set(session.scalars(
+        select(Project.id).where(Project.id.in_(project_ids), Project.user_id == user_id,
+                                 Project.deleted_at.is_(None))
+    )) if project_ids else set()
+
+    errors, assessments = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Item must be an object')
+            if _check_id(item, 'project_id') not in owned:
+                raise ValueError('Project not found or access denied')
+            if item.get('assessment_type', 'standard') not in ASSESSMENT_TYPES:
+                raise ValueError(f"Invalid assessment type: {item['assessment_type']}")
+            assessments.append(Assessment(project_id=item['project_id'], user_id=user_id, status='draft',
+                                          assessment_type=item.get('assessment_type', 'standard')))
+        except (ValueError, TypeError) as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+
+    session.add_all(assessments)
+    session.flush()
+    return [{'index': index, 'id': assessment.id, 'status': 'created'}
+            for index, assessment in enumerate(assessments)]
+
+
+def _response_values(response, questions):
+    if not isinstance(response, dict):
+        raise ValueError('Response must be an object')
+    if _check_id(response, 'question_id') not in questions:
+        raise ValueError(f"Unknown question: {response.get('question_id')}")
+    if response.get('score') is None:
+        raise ValueError(f"Missing score for question {response['question_id']}")
+    return {'question_id': response['question_id'], 'score': float(response['score']),
+            'response_text': response.get('response_text')}
+
+
+def save_responses(session, user_id, items):
+    """
+    Upsert question responses across the user's assessments.
+
+    Args:
+        items (list): {'assessment_id', 'responses': [{'question_id', 'score', 'response_text'}]}
+
+    Returns:
+        list: {'index', 'id', 'status': 'saved', 'responses': n} per item, in order
+    """
+    assessment_ids = _ids(items, 'assessment_id')
+    owned = set(session.scalars(
+        select(Assessment.id).join(Project, Project.id == Assessment.project_id)
+        .where(Assessment.id.in_(assessment_ids), Project.user_id == user_id, Project.deleted_at.is_(None))
+    )) if assessment_ids else set()
+    question_ids = set()
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get('responses'), list):
+            question_ids |= _ids(item['responses'], 'question_id')
+    questions = set(session.scalars(
+        select(SdgQuestion.id).where(SdgQuestion.id.in_(question_ids))
+    )) if question_ids else set()
+
+    errors, by_assessment, planned = [], {}, []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Item must be an object')
+            assessment_id = _check_id(item, 'assessment_id')
+            if assessment_id not in owned:
+                raise ValueError('Assessment not found or access denied')
+            if assessment_id in by_assessment:
+                raise ValueError('Assessment appears more than once in the batch')
+            if not isinstance(item.get('responses'), list):
+                raise ValueError('Responses must be a list')
+            # Later answers to the same question win, as in sequential saves
+            responses = {}
+            for response in item['responses']:
+                values = _response_values(response, questions)
+                responses[values['question_id']] = values
+            by_assessment[assessment_id] = list(responses.values())
+            planned.append((index, assessment_id))
+        except (ValueError, TypeError) as e:
+            errors.append({'index': index, 'error': str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+
+    upsert_response_sets(session, by_assessment)
+    session.flush()
+    return [{'index': index, 'id': assessment_id, 'status': 'saved',
+             'responses': len(by_assessment[assessment_id])}
+            for index, assessment_id in planned]
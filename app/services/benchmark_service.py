@@ -0,0 +1,169 @@
+"""
+Benchmark Service
+Percentile rank of an assessment's SDG scores against peer assessments.
+
+Peers are completed assessments, segmented by all projects, the same sector and
+the same project type. For every (segment, SDG) the index keeps a sorted list of
+peer scores, so a percentile rank is two bisect lookups. The index is derived
+from the score cube and follows its refreshes: when the cube applies an
+incremental refresh, only the changed rows are removed from and re-inserted
+into the sorted lists.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+from app.services.score_cube_service import get_score_cube, SDG_COUNT
+
+SEGMENTS = ('all', 'sector', 'project_type')
+OVERALL = SDG_COUNT  # Slot after the 17 SDGs holds the overall score
+MIN_PEERS = 5        # Below this a percentile would identify individual peers
+
+
+def _row_entries(snap, row):
+    """(segment key, slot, score) for each score a completed row contributes."""
+    if snap.vocab['status'][snap.codes['status'][row]] != 'completed':
+        return []
+    keys = [('all', None)] + [
+        (segment, snap.vocab[segment][snap.codes[segment][row]]) for segment in SEGMENTS[1:]
+    ]
+    values = list(snap.scores[row]) + [snap.overall[row]]
+    return [(key, slot, float(value)) for key in keys for slot, value in enumerate(values) if not np.isnan(value)]
+
+
+class BenchmarkIndex:
+    """Sorted peer score lists per (segment, SDG), kept in step with the score cube."""
+
+    def __init__(self):
+        self._lists = {}
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def sync(self, snap):
+        """Bring the index up to date with a cube snapshot."""
+        if self._snapshot is not None and self._snapshot.version == snap.version:
+            return
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current.version == snap.version:
+                return
+            if current is not None and snap.base_version == current.version:
+                self._apply_delta(current, snap)
+            else:
+                self._rebuild(snap)
+            self._snapshot = snap
+
+    def _rebuild(self, snap):
+        completed = snap.codes['status'] == (
+            snap.vocab['status'].index('completed') if 'completed' in snap.vocab['status'] else -1
+        )
+        values = np.column_stack([snap.scores, snap.overall]) if len(snap) else np.empty((0, OVERALL + 1))
+        lists = {}
+        segment_codes = [('all', np.zeros(len(snap), dtype=np.int32), [None])]
+        segment_codes += [(segment, snap.codes[segment], snap.vocab[segment]) for segment in SEGMENTS[1:]]
+        for segment, codes, vocab in segment_codes:
+            for code, value in enumerate(vocab):
+                rows = values[completed & (codes == code)]
+                if not len(rows):
+                    continue
+                columns = []
+                for slot in range(OVERALL + 1):
+                    column = rows[:, slot]
+                    columns.append(np.sort(column[~np.isnan(column)]).astype(np.float64).tolist())
+                lists[(segment, value)] = columns
+        self._lists = lists
+
+    def _apply_delta(self, old, new):
+        # Copy-on-write per touched list so concurrent readers never see a half-applied delta
+        lists = dict(self._lists)
+        copied_keys, copied_slots = set(), set()
+
+        def column(key, slot):
+            if key not in copied_keys:
+                lists[key] = list(lists.get(key) or [[] for _ in range(OVERALL + 1)])
+                copied_keys.add(key)
+            if (key, slot) not in copied_slots:
+                lists[key][slot] = list(lists[key][slot])
+                copied_slots.add((key, slot))
+            return lists[key][slot]
+
+        for row in new.changed_rows.tolist():
+            if row < len(old):
+                for key, slot, value in _row_entries(old, row):
+                    values = column(key, slot)
+                    i = bisect_left(values, value)
+                    if i < len(values) and values[i] == value:
+                        del values[i]
+            for key, slot, value in _row_entries(new, row):
+                insort(column(key, slot), value)
+        self._lists = lists
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def percentile(self, segment_key, slot, value):
+        """
+        Mid-rank percentile of `value` among the segment's peers.
+
+        Returns:
+            dict: {'percentile': float or None, 'peers': int}
+        """
+        values = self._lists.get(segment_key, [[]] * (OVERALL + 1))[slot]
+        peers = len(values)
+        if value is None or peers < MIN_PEERS:
+            return {'percentile': None, 'peers': peers}
+        value = float(np.float32(value))
+        rank = (bisect_left(values, value) + bisect_right(values, value)) / 2
+        return {'percentile': round(100.0 * rank / peers, 1), 'peers': peers}
+
+
+_index = BenchmarkIndex()
+
+
+def get_benchmark_index():
+    """Process-wide benchmark index, synced with the (possibly refreshed) score cube."""
+    cube = get_score_cube()
+    _index.sync(cube.snapshot)
+    return _index
+
+
+def get_assessment_benchmark(assessment, project):
+    """
+    Percentile ranks of an assessment's overall and per-SDG scores.
+
+    Args:
+        assessment (Assessment): Assessment to benchmark
+        project (Project): Its project, which determines the sector and type peer groups
+
+    Returns:
+        dict: Segment values, the overall ranking and one ranking per SDG number
+    """
+    index = get_benchmark_index()
+    segments = {'all': None, 'sector': project.sector, 'project_type': project.project_type}
+
+    # Read the assessment's own scores from the cube when it is there, saving a query
+    snap = index.snapshot
+    row = snap.row_of.get(assessment.id)
+    if row is not None:
+        scores = {slot + 1: float(value) for slot, value in enumerate(snap.scores[row]) if not np.isnan(value)}
+    else:
+        scores = {score.sdg_goal.number: score.total_score for score in assessment.sdg_scores
+                  if score.sdg_goal is not None and score.total_score is not None}
+
+    def rank(slot, value):
+        return {segment: index.percentile((segment, segment_value), slot, value)
+                for segment, segment_value in segments.items()}
+
+    return {
+        'assessment_id': assessment.id,
+        'segments': {'sector': project.sector, 'project_type': project.project_type},
+        'min_peers': MIN_PEERS,
+        'overall': {'score': assessment.overall_score, **rank(OVERALL, assessment.overall_score)},
+        'sdgs': [
+            {'number': number, 'score': score, **rank(number - 1, score)}
+            for number, score in sorted(scores.items()) if 1 <= number <= SDG_COUNT
+        ],
+    }
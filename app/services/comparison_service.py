@@ -0,0 +1,207 @@
+"""
+Comparison Service
+Side-by-side comparison of several assessments of one project.
+
+The requested assessments' SDG scores are read with one pivoting query (one
+row per assessment, one column per SDG) into an (assessments x 17) matrix,
+NaN where an SDG was not scored. Deltas between successive assessments, the
+per-SDG trend (least-squares slope over the assessment sequence) and the
+largest movers are then computed column-wise with NumPy.
+"""
+
+import numpy as np
+from sqlalchemy import select, func, case
+
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.utils.sdg_data import SDG_INFO
+
+SDG_COUNT = 17
+MAX_COMPARED = 10     # Assessments per comparison
+MOVERS = 5            # SDGs listed as largest movers
+TREND_THRESHOLD = 0.25  # Slope (points per assessment) below which an SDG counts as stable
+
+
+class ComparisonError(ValueError):
+    """Raised for a malformed or unusable selection of assessments."""
+
+
+def parse_assessment_ids(raw):
+    """
+    Parse the comma-separated `assessments` parameter, keeping the first
+    occurrence of each id. Returns None when the parameter is absent or empty.
+    """
+    if not raw or not raw.strip():
+        return None
+    ids = []
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            assessment_id = int(part)
+        except ValueError:
+            raise ComparisonError(f'Invalid assessment id: {part!r}')
+        if assessment_id not in ids:
+            ids.append(assessment_id)
+    if len(ids) > MAX_COMPARED:
+        raise ComparisonError(f'At most {MAX_COMPARED} assessments can be compared')
+    return ids
+
+
+def score_matrix(session, project_id, assessment_ids=None):
+    """
+    Read assessments of a project and their SDG total scores in one query.
+
+    Args:
+        session: SQLAlchemy session
+        project_id (int): Project the assessments must belong to
+        assessment_ids (list): Assessments to read; None for the project's
+            MAX_COMPARED most recent ones
+
+    Returns:
+        tuple: (list of assessment dicts in chronological order,
+        float64 array of shape (len(assessments), 17))
+    """
+    pivot = [
+        func.max(case((SdgGoal.number == number, SdgScore.total_score))).label(f'sdg_{number}')
+        for number in range(1, SDG_COUNT + 1)
+    ]
+    moment = func.coalesce(Assessment.completed_at, Assessment.created_at)
+    query = (
+        select(Assessment.id, Assessment.status, Assessment.overall_score, moment.label('assessed_at'), *pivot)
+        .select_from(Assessment)
+        .outerjoin(SdgScore, SdgScore.assessment_id == Assessment.id)
+        .outerjoin(SdgGoal, SdgGoal.id == SdgScore.sdg_id)
+        .where(Assessment.project_id == project_id)
+        .group_by(Assessment.id, Assessment.status, Assessment.overall_score, moment)
+    )
+    if assessment_ids is not None:
+        query = query.where(Assessment.id.in_(assessment_ids))
+    else:
+        query = query.order_by(moment.desc(), Assessment.id.desc()).limit(MAX_COMPARED)
+    rows = sorted(session.execute(query).all(), key=lambda row: (row.assessed_at is None, row.assessed_at, row.id))
+
+    assessments = [{
+        'id': row.id,
+        'status': row.status,
+        'overall_score': row.overall_score,
+        'assessed_at': row.assessed_at,
+    } for row in rows]
+    matrix = np.array([[np.nan if value is None else value for value in row[4:]] for row in rows],
+                      dtype=np.float64).reshape(len(rows), SDG_COUNT)
+    return assessments, matrix
+
+
+def _listify(values, digits=2):
+    """Rounded floats with NaN as None, for JSON."""
+    rounded = np.round(values, digits)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+
+def _trend_slopes(matrix):
+    """Least-squares slope of each column against the row index, ignoring NaN (NaN below two points)."""
+    observed = ~np.isnan(matrix)
+    counts = observed.sum(axis=0)
+    x = np.broadcast_to(np.arange(len(matrix), dtype=np.float64)[:, None], matrix.shape)
+    y = np.where(observed, matrix, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (x * observed).sum(axis=0) / counts
+        y_mean = y.sum(axis=0) / counts
+        dx = np.where(observed, x - x_mean, 0.0)
+        slopes = (dx * (y - y_mean)).sum(axis=0) / (dx * dx).sum(axis=0)
+    slopes[counts < 2] = np.nan
+    return slopes
+
+
+def _first_last(matrix):
+    """First and last observed value of each column (NaN for columns observed fewer than twice)."""
+    observed = ~np.isnan(matrix)
+    columns = np.arange(matrix.shape[1])
+    first = matrix[observed.argmax(axis=0), columns]
+    last = matrix[len(matrix) - 1 - observed[::-1].argmax(axis=0), columns]
+    too_few = observed.sum(axis=0) < 2
+    first[too_few] = np.nan
+    last[too_few] = np.nan
+    return first, last
+
+
+def _direction(slope):
+    if slope is None:
+        return None
+    if slope >= TREND_THRESHOLD:
+        return 'improving'
+    if slope <= -TREND_THRESHOLD:
+        return 'declining'
+    return 'stable'
+
+
+def compare_assessments(session, project, assessment_ids=None, movers=MOVERS):
+    """
+    Compare assessments of `project` SDG by SDG.
+
+    Args:
+        session: SQLAlchemy session
+        project (Project): Project the assessments belong to (ownership already checked)
+        assessment_ids (list): Assessments to compare; None for the most recent ones
+        movers (int): Number of largest movers to list
+
+    Returns:
+        dict: assessments (chronological), scores matrix, deltas between successive
+        assessments, first-to-last change, per-SDG trends and largest movers;
+        None when a requested assessment is not part of the project
+
+    Raises:
+        ComparisonError: When fewer than two assessments are selected
+    """
+    assessments, matrix = score_matrix(session, project.id, assessment_ids)
+    if assessment_ids is not None and len(assessments) != len(assessment_ids):
+        return None
+    if len(assessments) < 2:
+        raise ComparisonError('At least two assessments are needed for a comparison')
+
+    overall = np.array([np.nan if a['overall_score'] is None else a['overall_score'] for a in assessments],
+                       dtype=np.float64)
+    step_deltas = np.diff(matrix, axis=0)
+    overall_deltas = np.diff(overall)
+
+    first, last = _first_last(matrix)
+    change = last - first
+    slopes = _trend_slopes(matrix)
+
+    # Largest absolute first-to-last changes; NaN sorts last
+    magnitude = np.where(np.isnan(change), -1.0, np.abs(change))
+    order = np.argsort(-magnitude, kind='stable')[:movers]
+    order = order[magnitude[order] > 0]
+
+    slope_values = _listify(slopes, 3)
+    return {
+        'project_id': project.id,
+        'sdgs': list(range(1, SDG_COUNT + 1)),
+        'assessments': assessments,
+        'scores': _listify(matrix),
+        'deltas': [
+            {'from': previous['id'], 'to': current['id'], 'overall': overall_delta, 'sdgs': sdg_deltas}
+            for previous, current, overall_delta, sdg_deltas in zip(
+                assessments, assessments[1:], _listify(overall_deltas), _listify(step_deltas))
+        ],
+        'change': {
+            'overall': _listify(overall[-1:] - overall[:1])[0],
+            'sdgs': _listify(change),
+        },
+        'trends': [
+            {'sdg': number, 'slope': slope, 'direction': _direction(slope)}
+            for number, slope in zip(range(1, SDG_COUNT + 1), slope_values)
+        ],
+        'movers': [
+            {
+                'sdg': int(column) + 1,
+                'name': SDG_INFO[int(column) + 1]['name'],
+                'color': SDG_INFO[int(column) + 1]['color_code'],
+                'from': round(float(first[column]), 2),
+                'to': round(float(last[column]), 2),
+                'change': round(float(change[column]), 2),
+            }
+            for column in order
+        ],
+    }
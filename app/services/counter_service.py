@@ -0,0 +1,241 @@
+"""
+Counter Service
+Maintains the denormalized counters on projects (assessment_count,
+completed_count, latest_overall_score, last_assessed_at) and users
+(project_count, assessment_count), so listings read them off the row instead
+of counting assessments.
+
+Counts are applied as increments by flush listeners in the writing transaction.
+The latest-score columns of the touched projects are recomputed from their
+completed assessments in the same transaction. A user's assessment_count
+covers the assessments on the projects they own.
+`flask reconcile-counters` repairs any drift from the base tables.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import event, select, update, func, or_
+
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.utils.db_events import pending_changes
+
+PROJECT_COUNTERS = ('assessment_count', 'completed_count', 'latest_overall_score', 'last_assessed_at')
+USER_COUNTERS = ('project_count', 'assessment_count')
+
+# session.info keys holding deltas between before_flush and after_flush, and the
+# rows whose counters after_flush rewrote
+_PENDING_DELTAS_KEY = 'counter_deltas'
+_STALE_KEY = 'counter_stale'
+
+
+class _Deltas:
+    """Counter increments for one flush, keyed by id or, for rows not inserted yet, by instance."""
+
+    def __init__(self):
+        self.projects = defaultdict(lambda: defaultdict(int))
+        self.users = defaultdict(lambda: defaultdict(int))
+        # Assessments whose owner is only known through their project's row
+        self.users_via_project = defaultdict(int)
+        self.latest = set()
+        self.deleted_projects = set()
+
+    def __bool__(self):
+        return bool(self.projects or self.users or self.users_via_project or self.latest)
+
+
+def _ref(value, instance):
+    """A foreign key value, or the related instance when it is not flushed yet."""
+    if value is not None or instance is None:
+        return value
+    return instance.id if instance.id is not None else instance
+
+
+def _resolve(ref):
+    return getattr(ref, 'id', ref)
+
+
+def _collect_deltas(session, flush_context, instances):
+    """before_flush listener: turn pending ORM writes into counter deltas."""
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+    changes = list(pending_changes(session, Project, Assessment))
+    if not changes:
+        return
+    deltas = _Deltas()
+    owners = {}
+
+    for obj, old, new in changes:
+        if not isinstance(obj, Project):
+            continue
+        ref = obj.id if obj.id is not None else obj
+        # The stored count moves with the project when it is deleted or changes owner
+        count = 0
+        # project_count leaves out projects being purged (deleted_at set)
+        if old:
+            values = old(['user_id', 'assessment_count', 'deleted_at'])
+            count = values['assessment_count'] or 0
+            if values['deleted_at'] is None:
+                deltas.users[values['user_id']]['project_count'] -= 1
+            deltas.users[values['user_id']]['assessment_count'] -= count
+        if new:
+            values = new(['user_id', 'deleted_at'])
+            owner = _ref(values['user_id'], obj.__dict__.get('user'))
+            if values['deleted_at'] is None:
+                deltas.users[owner]['project_count'] += 1
+            deltas.users[owner]['assessment_count'] += count
+            owners[ref] = owner
+        else:
+            owners[ref] = None
+            deltas.deleted_projects.add(ref)
+
+    for obj, old, new in changes:
+        if not isinstance(obj, Assessment):
+            continue
+        for accessor, sign in ((old, -1), (new, +1)):
+            if accessor is None:
+                continue
+            values = accessor(['project_id', 'status'])
+            ref = _ref(values['project_id'], obj.__dict__.get('project') if sign > 0 else None)
+            if ref is None or ref in deltas.deleted_projects:
+                continue
+            completed = values['status'] == 'completed'
+            deltas.projects[ref]['assessment_count'] += sign
+            deltas.projects[ref]['completed_count'] += sign if completed else 0
+            if completed:
+                deltas.latest.add(ref)
+            if ref in owners:
+                deltas.users[owners[ref]]['assessment_count'] += sign
+            else:
+                deltas.users_via_project[ref] += sign
+
+    if deltas:
+        session.info[_PENDING_DELTAS_KEY] = deltas
+
+
+def _latest_columns(projects):
+    """Correlated subqueries for a project's latest completed assessment."""
+    assessed_at = func.coalesce(Assessment.completed_at, Assessment.created_at)
+    completed = (Assessment.project_id == projects.c.id, Assessment.status == 'completed')
+    return {
+        'latest_overall_score': select(Assessment.overall_score).where(*completed)
+        .order_by(assessed_at.desc(), Assessment.id.desc()).limit(1).scalar_subquery(),
+        'last_assessed_at': select(func.max(assessed_at)).where(*completed).scalar_subquery(),
+    }
+
+
+def _apply_deltas(session, flush_context):
+    """after_flush listener: apply collected deltas in the flushing transaction."""
+    deltas = session.info.pop(_PENDING_DELTAS_KEY, None)
+    if not deltas:
+        return
+    conn = session.connection()
+    projects, users = Project.__table__, User.__table__
+
+    for ref, columns in deltas.projects.items():
+        columns = {col: projects.c[col] + amount for col, amount in columns.items() if amount}
+        if columns:
+            # Assigning updated_at to itself keeps its onupdate from firing for a counter bump
+            conn.execute(update(projects).where(projects.c.id == _resolve(ref))
+                         .values(updated_at=projects.c.updated_at, **columns))
+    for ref, amount in deltas.users_via_project.items():
+        if amount:
+            owner = select(projects.c.user_id).where(projects.c.id == _resolve(ref)).scalar_subquery()
+            conn.execute(update(users).where(users.c.id == owner)
+                         .values(assessment_count=users.c.assessment_count + amount))
+    for ref, columns in deltas.users.items():
+        columns = {col: users.c[col] + amount for col, amount in columns.items() if amount}
+        if columns and ref is not None:
+            conn.execute(update(users).where(users.c.id == _resolve(ref)).values(**columns))
+    if deltas.latest:
+        conn.execute(update(projects).where(projects.c.id.in_([_resolve(ref) for ref in deltas.latest]))
+                     .values(updated_at=projects.c.updated_at, **_latest_columns(projects)))
+
+    # Counters were written behind the ORM's back; reload them on next access
+    session.info[_STALE_KEY] = (
+        {_resolve(ref) for ref in list(deltas.projects) + list(deltas.latest)},
+        {_resolve(ref) for ref in deltas.users if ref is not None},
+    )
+
+
+def _expire_counters(session, flush_context):
+    """after_flush_postexec listener: expire counter attributes the flush rewrote in SQL."""
+    stale = session.info.pop(_STALE_KEY, None)
+    if not stale:
+        return
+    project_ids, user_ids = stale
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Project) and obj.id in project_ids:
+            session.expire(obj, list(PROJECT_COUNTERS))
+        elif isinstance(obj, User) and obj.id in user_ids:
+            session.expire(obj, list(USER_COUNTERS))
+
+
+def _discard_deltas(session, previous_transaction=None):
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+    session.info.pop(_STALE_KEY, None)
+
+
+def register_counter_listeners():
+    """
+    Attach the flush listeners that keep the counter columns current.
+    Safe to call once per application; repeated calls are ignored.
+    """
+    if event.contains(db.session, 'before_flush', _collect_deltas):
+        return
+    event.listen(db.session, 'before_flush', _collect_deltas)
+    event.listen(db.session, 'after_flush', _apply_deltas)
+    event.listen(db.session, 'after_flush_postexec', _expire_counters)
+    event.listen(db.session, 'after_soft_rollback', _discard_deltas)
+
+
+def _expected_project_counters(projects):
+    counts = (Assessment.project_id == projects.c.id,)
+    return {
+        'assessment_count': select(func.count(Assessment.id)).where(*counts).scalar_subquery(),
+        'completed_count': select(func.count(Assessment.id))
+        .where(*counts, Assessment.status == 'completed').scalar_subquery(),
+        **_latest_columns(projects),
+    }
+
+
+def _expected_user_counters(users):
+    projects = Project.__table__
+    return {
+        'project_count': select(func.count(projects.c.id))
+        .where(projects.c.user_id == users.c.id, projects.c.deleted_at.is_(None)).scalar_subquery(),
+        'assessment_count': select(func.count(Assessment.id))
+        .join(projects, projects.c.id == Assessment.project_id)
+        .where(projects.c.user_id == users.c.id).scalar_subquery(),
+    }
+
+
+def reconcile_counters():
+    """
+    Recompute every counter column from the base tables, rewriting only drifted rows.
+
+    Returns:
+        dict: Number of projects and users that were corrected
+    """
+    session = db.session
+    fixed = {}
+    try:
+        for name, table, expected in (
+            ('projects', Project.__table__, _expected_project_counters),
+            ('users', User.__table__, _expected_user_counters),
+        ):
+            values = expected(table)
+            drifted = select(table.c.id).where(or_(
+                *[table.c[col].is_distinct_from(value) for col, value in values.items()]
+            ))
+            ids = list(session.execute(drifted).scalars())
+            if ids:
+                extra = {'updated_at': table.c.updated_at} if 'updated_at' in table.c else {}
+                session.execute(update(table).where(table.c.id.in_(ids)).values(**extra, **values))
+            fixed[name] = len(ids)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return fixed
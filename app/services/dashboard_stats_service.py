@@ -0,0 +1,241 @@
+"""
+Dashboard Stats Service
+Maintains the dashboard_stats aggregate table so the admin dashboard reads a
+handful of rows instead of scanning users, projects, assessments and sdg_scores.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import event, func, case, select, insert, delete
+
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.models.dashboard_stat import DashboardStat, GLOBAL_STATS_KEY
+from app.utils.db_events import pending_changes, increment_row
+from app.utils.cascades import cascaded_criterion
+
+# session.info key holding deltas between before_flush and after_flush
+_PENDING_DELTAS_KEY = 'dashboard_stats_deltas'
+
+_COUNTER_COLUMNS = (
+    'user_count', 'project_count', 'assessment_count', 'completed_count',
+    'score_count', 'score_sum', 'score_sum_sq',
+)
+
+
+def _score_terms(value, sign):
+    """Count, sum and sum-of-squares contribution of a single score."""
+    if value is None:
+        return {}
+    value = float(value)
+    return {'score_count': sign, 'score_sum': sign * value, 'score_sum_sq': sign * value * value}
+
+
+def _add(deltas, sdg_id, terms):
+    for column, amount in terms.items():
+        deltas[sdg_id][column] += amount
+
+
+def _assessment_terms(values, sign):
+    terms = {
+        'assessment_count': sign,
+        'completed_count': sign if values['status'] == 'completed' else 0,
+    }
+    terms.update(_score_terms(values['overall_score'], sign))
+    return terms
+
+
+def _collect_deltas(session, flush_context, instances):
+    """before_flush listener: turn pending ORM writes into aggregate deltas."""
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+    deltas = defaultdict(lambda: defaultdict(float))
+
+    for obj, old, new in pending_changes(session, User, Project, Assessment, SdgScore):
+        if isinstance(obj, User):
+            if old is None:
+                deltas[GLOBAL_STATS_KEY]['user_count'] += 1
+            elif new is None:
+                deltas[GLOBAL_STATS_KEY]['user_count'] -= 1
+
+        elif isinstance(obj, Project):
+            # Projects being purged (deleted_at set) are not counted
+            counted_before = old is not None and old(['deleted_at'])['deleted_at'] is None
+            counted_after = new is not None and new(['deleted_at'])['deleted_at'] is None
+            deltas[GLOBAL_STATS_KEY]['project_count'] += counted_after - counted_before
+
+        elif isinstance(obj, Assessment):
+            attrs = ['status', 'overall_score']
+            if old is not None:
+                _add(deltas, GLOBAL_STATS_KEY, _assessment_terms(old(attrs), -1))
+            if new is not None:
+                _add(deltas, GLOBAL_STATS_KEY, _assessment_terms(new(attrs), +1))
+
+        elif isinstance(obj, SdgScore):
+            attrs = ['sdg_id', 'total_score']
+            if old is not None:
+                values = old(attrs)
+                _add(deltas, values['sdg_id'], _score_terms(values['total_score'], -1))
+            if new is not None:
+                values = new(attrs)
+                sdg_id = values['sdg_id']
+                if sdg_id is None and obj.sdg_goal is not None:
+                    sdg_id = obj.sdg_goal.id
+                _add(deltas, sdg_id, _score_terms(values['total_score'], +1))
+
+    _collect_cascaded(session, deltas)
+
+    pending = {
+        sdg_id: {col: amount for col, amount in columns.items() if amount}
+        for sdg_id, columns in deltas.items() if sdg_id is not None
+    }
+    pending = {sdg_id: columns for sdg_id, columns in pending.items() if columns}
+    if pending:
+        session.info[_PENDING_DELTAS_KEY] = pending
+
+
+def _collect_cascaded(session, deltas):
+    """Subtract assessments and scores that ON DELETE CASCADE removes with their parents, in two grouped queries."""
+    conn = session.connection()
+    criterion = cascaded_criterion(session, Assessment)
+    if criterion is not None:
+        totals = conn.execute(select(
+            func.count(Assessment.id),
+            func.sum(case((Assessment.status == 'completed', 1), else_=0)),
+            func.count(Assessment.overall_score),
+            func.sum(Assessment.overall_score),
+            func.sum(Assessment.overall_score * Assessment.overall_score),
+        ).where(criterion)).one()
+        for column, amount in zip(_COUNTER_COLUMNS[2:], totals):
+            deltas[GLOBAL_STATS_KEY][column] -= amount or 0
+
+    criterion = cascaded_criterion(session, SdgScore)
+    if criterion is not None:
+        rows = conn.execute(select(
+            SdgScore.sdg_id,
+            func.count(SdgScore.total_score),
+            func.sum(SdgScore.total_score),
+            func.sum(SdgScore.total_score * SdgScore.total_score),
+        ).where(criterion).group_by(SdgScore.sdg_id))
+        for sdg_id, count, total, total_sq in rows:
+            _add(deltas, sdg_id, {'score_count': -count, 'score_sum': -(total or 0.0),
+                                  'score_sum_sq': -(total_sq or 0.0)})
+
+
+def _apply_deltas(session, flush_context):
+    """after_flush listener: apply collected deltas in the flushing transaction."""
+    pending = session.info.pop(_PENDING_DELTAS_KEY, None)
+    if not pending:
+        return
+
+    table = DashboardStat.__table__
+    conn = session.connection()
+    now = datetime.utcnow()
+    for sdg_id, columns in pending.items():
+        # A missing row starts from zero; `rebuild` repairs any gap
+        increment_row(conn, table, {'sdg_id': sdg_id}, columns, now)
+
+
+def _discard_deltas(session, previous_transaction=None):
+    session.info.pop(_PENDING_DELTAS_KEY, None)
+
+
+def register_stats_listeners():
+    """
+    Attach the flush listeners that keep dashboard_stats current.
+    Safe to call once per application; repeated calls are ignored.
+    """
+    if event.contains(db.session, 'before_flush', _collect_deltas):
+        return
+    event.listen(db.session, 'before_flush', _collect_deltas)
+    event.listen(db.session, 'after_flush', _apply_deltas)
+    event.listen(db.session, 'after_soft_rollback', _discard_deltas)
+
+
+def rebuild_dashboard_stats():
+    """
+    Recompute every dashboard_stats row from the base tables.
+    Use after bulk imports, raw SQL maintenance, or to repair drift.
+
+    Returns:
+        int: Number of stats rows written
+    """
+    session = db.session
+    rows = {GLOBAL_STATS_KEY: {col: 0 for col in _COUNTER_COLUMNS}}
+    global_row = rows[GLOBAL_STATS_KEY]
+
+    global_row['user_count'] = session.query(func.count(User.id)).scalar() or 0
+    global_row['project_count'] = session.query(func.count(Project.id)) \
+        .filter(Project.deleted_at.is_(None)).scalar() or 0
+
+    assessment_totals = session.query(
+        func.count(Assessment.id),
+        func.sum(case((Assessment.status == 'completed', 1), else_=0)),
+        func.count(Assessment.overall_score),
+        func.sum(Assessment.overall_score),
+        func.sum(Assessment.overall_score * Assessment.overall_score),
+    ).one()
+    (global_row['assessment_count'], global_row['completed_count'], global_row['score_count'],
+     global_row['score_sum'], global_row['score_sum_sq']) = [value or 0 for value in assessment_totals]
+
+    score_totals = session.query(
+        SdgScore.sdg_id,
+        func.count(SdgScore.total_score),
+        func.sum(SdgScore.total_score),
+        func.sum(SdgScore.total_score * SdgScore.total_score),
+    ).group_by(SdgScore.sdg_id).all()
+    for sdg_id, count, total, total_sq in score_totals:
+        row = rows.setdefault(sdg_id, {col: 0 for col in _COUNTER_COLUMNS})
+        row.update(score_count=count or 0, score_sum=total or 0.0, score_sum_sq=total_sq or 0.0)
+
+    now = datetime.utcnow()
+    try:
+        session.execute(delete(DashboardStat))
+        session.execute(
+            insert(DashboardStat),
+            [{'sdg_id': sdg_id, 'updated_at': now, **values} for sdg_id, values in rows.items()],
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(rows)
+
+
+def get_dashboard_overview():
+    """
+    Read the dashboard headline numbers and per-SDG averages.
+
+    Returns:
+        dict: Global counts and average score, plus `sdg_scores` ordered by SDG number
+    """
+    stats = {row.sdg_id: row for row in DashboardStat.query.all()}
+    global_row = stats.get(GLOBAL_STATS_KEY) or DashboardStat(
+        **{col: 0 for col in _COUNTER_COLUMNS}
+    )
+
+    sdg_scores = []
+    for goal in SdgGoal.query.order_by(SdgGoal.number).all():
+        row = stats.get(goal.id)
+        if row is None or not row.score_count:
+            continue
+        sdg_scores.append({
+            'number': goal.number,
+            'name': goal.name,
+            'avg_score': row.avg_score,
+            'score_stddev': row.score_stddev,
+            'score_count': row.score_count,
+            'color_code': goal.color_code,
+        })
+
+    return {
+        'user_count': global_row.user_count,
+        'project_count': global_row.project_count,
+        'assessment_count': global_row.assessment_count,
+        'completed_count': global_row.completed_count,
+        'avg_score': global_row.avg_score,
+        'sdg_scores': sdg_scores,
+    }
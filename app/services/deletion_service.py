@@ -0,0 +1,111 @@
+"""
+Deletion Service
+Deletes projects with set-based cascades, purging very large ones in the background.
+
+A project with up to PROJECT_PURGE_THRESHOLD assessments is deleted in one
+flush: its row goes in a single DELETE and ON DELETE CASCADE removes the
+assessments, scores and responses (see app/utils/cascades.py). Larger projects
+get deleted_at set, which hides them from listings, the API and the
+aggregates, and are purged by a background thread that deletes their
+assessments PROJECT_PURGE_BATCH_SIZE at a time, committing between batches so
+no single transaction holds the write lock for long.
+"""
+
+from datetime import datetime
+from threading import Lock, Thread
+
+from flask import current_app
+from sqlalchemy import select, func
+
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment
+
+# Projects this process is purging
+_purging = set()
+_purging_lock = Lock()
+
+
+def delete_project(project, session=None):
+    """
+    Delete a project and everything under it.
+
+    A project left with deleted_at set by a purge that did not finish (a
+    restart, a failed batch) gets its purge started again.
+
+    Returns:
+        bool: True when the project was deleted, False when a background purge is running
+    """
+    session = session or db.session
+    if project.deleted_at is None:
+        assessment_count = session.scalar(
+            select(func.count(Assessment.id)).where(Assessment.project_id == project.id)
+        )
+        if assessment_count <= current_app.config.get('PROJECT_PURGE_THRESHOLD', 500):
+            session.delete(project)
+            session.commit()
+            return True
+
+        project.deleted_at = datetime.utcnow()
+        session.commit()
+    _start_purge(current_app._get_current_object(), project.id)
+    return False
+
+
+def _start_purge(app, project_id):
+    """Purge the project in a background thread unless this process is already purging it."""
+    with _purging_lock:
+        if project_id in _purging:
+            return
+        _purging.add(project_id)
+    Thread(target=_purge_in_background, args=(app, project_id), daemon=True).start()
+
+
+def _purge_in_background(app, project_id):
+    with app.app_context():
+        try:
+            purge_project(project_id)
+        except Exception as e:
+            app.logger.error(f"Failed to purge project {project_id}: {str(e)}")
+        finally:
+            db.session.remove()
+            with _purging_lock:
+                _purging.discard(project_id)
+
+
+def purge_project(project_id, batch_size=None):
+    """
+    Delete a project's assessments in batches, committing after each, then the project.
+
+    Args:
+        project_id (int): Project to delete
+        batch_size (int): Assessments per transaction (default: PROJECT_PURGE_BATCH_SIZE)
+
+    Returns:
+        int: Number of assessments deleted
+    """
+    session = db.session
+    batch_size = batch_size or current_app.config.get('PROJECT_PURGE_BATCH_SIZE', 200)
+    deleted = 0
+    try:
+        while True:
+            # Scores and responses cascade in SQL; only the assessment rows are loaded
+            batch = session.scalars(
+                select(Assessment).where(Assessment.project_id == project_id)
+                .order_by(Assessment.id).limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            for assessment in batch:
+                session.delete(assessment)
+            session.commit()
+            deleted += len(batch)
+
+        project = session.get(Project, project_id)
+        if project is not None:
+            session.delete(project)
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return deleted
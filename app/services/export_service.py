@@ -0,0 +1,150 @@
+"""
+Export Service
+Streaming bulk exports of projects, assessments (with per-SDG scores pivoted to
+17 columns) and question responses as CSV or NDJSON.
+
+Rows are read through server-side cursors with yield_per and written out as a
+generator of text chunks, so memory stays flat however many rows are exported.
+"""
+
+import csv
+import json
+from datetime import datetime, date
+from io import StringIO
+
+from sqlalchemy import select, func, case, or_
+
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.response import QuestionResponse
+from app.models.sdg import SdgGoal
+from app.utils.db_routing import replica_reads
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+BATCH_SIZE = 1000
+
+SDG_COLUMNS = [f'sdg_{number}' for number in range(1, 18)]
+
+
+def _projects_query(since):
+    query = select(
+        Project.id, Project.name, Project.project_type, Project.sector, Project.location,
+        Project.size_sqm, Project.budget, Project.status, Project.user_id,
+        Project.start_date, Project.end_date, Project.created_at, Project.updated_at,
+    ).order_by(Project.id)
+    if since is not None:
+        query = query.where(Project.updated_at >= since)
+    return query
+
+
+def _assessments_query(since):
+    # Pivot the per-SDG total scores into one column per goal in the database,
+    # so each streamed row is complete and nothing is buffered in Python
+    pivot = [
+        func.max(case((SdgGoal.number == number, SdgScore.total_score))).label(column)
+        for number, column in enumerate(SDG_COLUMNS, start=1)
+    ]
+    query = (
+        select(
+            Assessment.id, Assessment.project_id, Assessment.user_id, Assessment.status,
+            Assessment.assessment_type, Assessment.overall_score, Assessment.created_at,
+            Assessment.updated_at, Assessment.completed_at, *pivot,
+        )
+        .outerjoin(SdgScore, SdgScore.assessment_id == Assessment.id)
+        .outerjoin(SdgGoal, SdgGoal.id == SdgScore.sdg_id)
+        .group_by(Assessment.id)
+        .order_by(Assessment.id)
+    )
+    if since is not None:
+        query = query.where(or_(
+            Assessment.updated_at >= since,
+            Assessment.id.in_(select(SdgScore.assessment_id).where(SdgScore.updated_at >= since)),
+        ))
+    return query
+
+
+def _responses_query(since):
+    query = select(
+        QuestionResponse.id, QuestionResponse.assessment_id, QuestionResponse.question_id,
+        QuestionResponse.response_score, QuestionResponse.response_text,
+        QuestionResponse.created_at, QuestionResponse.updated_at,
+    ).order_by(QuestionResponse.id)
+    if since is not None:
+        query = query.where(QuestionResponse.updated_at >= since)
+    return query
+
+
+DATASETS = {
+    'projects': _projects_query,
+    'assessments': _assessments_query,
+    'responses': _responses_query,
+}
+
+
+@replica_reads()
+def iter_rows(dataset, since=None, batch_size=BATCH_SIZE, session=None):
+    """
+    Stream (columns, row-tuple iterator) for a dataset.
+
+    Args:
+        dataset (str): 'projects', 'assessments' or 'responses'
+        since (datetime): Only rows updated at or after this moment
+        batch_size (int): Rows fetched per round trip from the server-side cursor
+
+    Returns:
+        tuple: (list of column names, iterator of row tuples)
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f'Unknown export dataset: {dataset}')
+    session = session or db.session
+    query = DATASETS[dataset](since)
+    result = session.execute(query.execution_options(yield_per=batch_size))
+    return list(result.keys()), result
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(dataset, since=None, batch_size=BATCH_SIZE, session=None):
+    """Yield CSV text, one chunk per batch of rows."""
+    columns, rows = iter_rows(dataset, since, batch_size, session)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(['' if value is None else _cell(value) for value in row])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_ndjson(dataset, since=None, batch_size=BATCH_SIZE, session=None):
+    """Yield NDJSON text, one chunk per batch of rows."""
+    columns, rows = iter_rows(dataset, since, batch_size, session)
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: _cell(value) for column, value in zip(columns, row)}))
+        if len(lines) >= batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(dataset, export_format='csv', since=None, batch_size=BATCH_SIZE, session=None):
+    """Generator of text chunks for a dataset in 'csv' or 'ndjson' format."""
+    if export_format not in FORMATS:
+        raise ValueError(f'Unknown export format: {export_format}')
+    if dataset not in DATASETS:
+        raise ValueError(f'Unknown export dataset: {dataset}')
+    writer = stream_csv if export_format == 'csv' else stream_ndjson
+    return writer(dataset, since, batch_size, session)
@@ -0,0 +1,107 @@
+"""
+Ownership Service
+Resolves an assessment, its project and whether a user owns it in one query.
+
+Routes used to load the assessment and then its project with two separate
+lookups, or rebuild the same select(Assessment).join(Project) per route. The
+resolver runs one cached lambda statement (compiled once per process) and
+memoizes the result for the rest of the request, so later checks in the same
+request and templates (via the `assessment_access` global) reuse it.
+"""
+
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import select, lambda_stmt, and_
+
+from app import db
+from app.models.assessment import Assessment
+from app.models.project import Project
+
+
+class AssessmentAccess:
+    """An assessment, its project and ownership checks against them."""
+
+    __slots__ = ('assessment', 'project')
+
+    def __init__(self, assessment, project):
+        self.assessment = assessment
+        self.project = project
+
+    @property
+    def found(self):
+        return self.assessment is not None
+
+    def owned_by(self, user_id, project_id=None):
+        """Whether user_id owns the project (and it is `project_id`, when given)."""
+        if self.assessment is None or self.project is None or user_id is None:
+            return False
+        if project_id is not None and self.assessment.project_id != project_id:
+            return False
+        return self.project.user_id == user_id
+
+
+def _current_user_id():
+    # API requests authenticate with a token (g.user_id); pages with Flask-Login
+    user_id = g.get('user_id')
+    if user_id is None and current_user and current_user.is_authenticated:
+        user_id = current_user.id
+    return user_id
+
+
+def _load(assessment_id, session):
+    statement = lambda_stmt(
+        # A project being purged resolves as missing, so its assessments are not owned by anyone
+        lambda: select(Assessment, Project).outerjoin(
+            Project, and_(Project.id == Assessment.project_id, Project.deleted_at.is_(None)))
+    )
+    statement += lambda s: s.where(Assessment.id == assessment_id)
+    row = session.execute(statement).first()
+    return AssessmentAccess(*row) if row else AssessmentAccess(None, None)
+
+
+def resolve_assessment(assessment_id, session=None):
+    """
+    Load an assessment with its project, memoized for the current request.
+
+    Returns:
+        AssessmentAccess: With assessment and project None when the assessment does not exist
+    """
+    session = session or db.session
+    if not has_request_context():
+        return _load(assessment_id, session)
+    memo = g.setdefault('assessment_access', {})
+    access = memo.get(assessment_id)
+    if access is None:
+        access = memo[assessment_id] = _load(assessment_id, session)
+    return access
+
+
+def owned_assessment(assessment_id, user_id=None, project_id=None):
+    """
+    The assessment and project if the user (default: the request's user) owns them.
+
+    Returns:
+        tuple: (assessment, project), or (None, None) when missing or not owned
+    """
+    access = resolve_assessment(assessment_id)
+    if user_id is None:
+        user_id = _current_user_id()
+    if not access.owned_by(user_id, project_id):
+        return None, None
+    return access.assessment, access.project
+
+
+def forget_assessment(assessment_id):
+    """Drop a memoized resolution, e.g. after deleting the assessment."""
+    if has_request_context():
+        g.get('assessment_access', {}).pop(assessment_id, None)
+
+
+def register_ownership_resolver(app):
+    """Start every request with an empty memo and expose the resolver to templates."""
+
+    @app.before_request
+    def reset_assessment_access():
+        g.pop('assessment_access', None)
+
+    app.jinja_env.globals['assessment_access'] = resolve_assessment
@@ -1,5 +1,6 @@
 from flask import abort
 from app.utils.db import get_db
+from app.services.search_service import search_terms, fts5_match
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,10 +17,10 @@ def get_projects(user_id, page=1, per_page=10, filters=None):
         if 'status' in filters and filters['status']:
             sql += " AND status = ?"
             params.append(filters['status'])
-        if 'search' in filters and filters['search']:
-            sql += " AND (name LIKE ? OR description LIKE ?)"
-            search = f"%{filters['search']}%"
-            params.extend([search, search])
+        terms = search_terms(filters.get('search'))
+        if terms:
+            sql += " AND id IN (SELECT rowid FROM projects_fts WHERE projects_fts MATCH ?)"
+            params.append(fts5_match(terms))
     sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
     params.extend([per_page, (page - 1) * per_page])
     projects = conn.execute(sql, tuple(params)).fetchall()
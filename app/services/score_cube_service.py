@@ -0,0 +1,443 @@
+"""
+Score Cube Service
+An in-memory, NumPy-backed copy of every assessment's SDG scores for analytics.
+
+The cube holds an (assessments x 17) float32 matrix of SDG total scores (NaN
+where an SDG was not scored) with aligned per-assessment arrays for the overall
+score, project_type, sector, status, completed_at, user and project. Categorical
+columns are dictionary-encoded to integer codes so group-bys are a bincount.
+
+Each worker process loads the cube once and then refreshes it incrementally:
+only assessments whose own, project or SDG score updated_at moved past the
+watermark are re-read. When an analytics snapshot exists (see snapshot_service)
+the first load starts from it and only re-reads what changed since. Queries run against an immutable snapshot, so a refresh
+in one thread never disturbs a query in another.
+"""
+
+import copy
+import itertools
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, func, or_
+
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.services.snapshot_service import MANIFEST, read_manifest, read_snapshot, load_score_matrix, snapshot_dir
+from app.utils.db_routing import replica_reads
+
+SDG_COUNT = 17
+CATEGORICAL = ('project_type', 'sector', 'status')
+
+
+_versions = itertools.count(1)
+
+
+class _Snapshot:
+    """
+    Immutable arrays for one version of the cube.
+
+    A snapshot produced by an incremental refresh records the version it was
+    derived from and the rows that changed, so dependent indexes can apply the
+    same delta instead of rebuilding.
+    """
+
+    def __init__(self, ids, scores, overall, codes, vocab, completed_at, user_id, project_id, watermark,
+                 base_version=None, changed_rows=None):
+        self.ids = ids
+        self.scores = scores
+        self.overall = overall
+        self.codes = codes            # column -> int32 codes into vocab[column]
+        self.vocab = vocab            # column -> list of distinct values (None included)
+        self.completed_at = completed_at
+        self.user_id = user_id
+        self.project_id = project_id
+        self.watermark = watermark
+        self.version = next(_versions)
+        self.base_version = base_version
+        self.changed_rows = changed_rows
+        self.row_of = {assessment_id: row for row, assessment_id in enumerate(ids.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _empty_snapshot():
+    return _Snapshot(
+        ids=np.empty(0, dtype=np.int64),
+        scores=np.empty((0, SDG_COUNT), dtype=np.float32),
+        overall=np.empty(0, dtype=np.float32),
+        codes={column: np.empty(0, dtype=np.int32) for column in CATEGORICAL},
+        vocab={column: [] for column in CATEGORICAL},
+        completed_at=np.empty(0, dtype='datetime64[s]'),
+        user_id=np.empty(0, dtype=np.int64),
+        project_id=np.empty(0, dtype=np.int64),
+        watermark=None,
+    )
+
+
+def _max_updated_at(session):
+    stamps = [
+        session.execute(select(func.max(Assessment.updated_at))).scalar(),
+        session.execute(select(func.max(Project.updated_at))).scalar(),
+        session.execute(select(func.max(SdgScore.updated_at))).scalar(),
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def _read_rows(session, assessment_filter=None):
+    """Read assessment attributes and SDG scores, optionally for a subset of assessments."""
+    query = (
+        select(Assessment.id, Assessment.overall_score, Assessment.status, Assessment.completed_at,
+               Assessment.user_id, Assessment.project_id, Project.project_type, Project.sector)
+        .join(Project, Project.id == Assessment.project_id)
+        .order_by(Assessment.id)
+    )
+    score_query = (
+        select(SdgScore.assessment_id, SdgGoal.number, SdgScore.total_score)
+        .join(SdgGoal, SdgGoal.id == SdgScore.sdg_id)
+        .where(SdgScore.total_score.isnot(None))
+    )
+    if assessment_filter is not None:
+        query = query.where(Assessment.id.in_(assessment_filter))
+        score_query = score_query.where(SdgScore.assessment_id.in_(assessment_filter))
+
+    rows = session.execute(query.execution_options(yield_per=5000)).all()
+    scores = {}
+    for assessment_id, number, total_score in session.execute(score_query.execution_options(yield_per=5000)):
+        if number and 1 <= number <= SDG_COUNT:
+            scores.setdefault(assessment_id, {})[number - 1] = total_score
+    return rows, scores
+
+
+_SnapshotRow = namedtuple('_SnapshotRow', 'id overall_score status completed_at user_id project_id project_type sector')
+
+
+def _snapshot_source():
+    """The snapshot directory to seed the cube from, or None when disabled, absent or unreadable."""
+    if not current_app.config.get('SCORE_CUBE_FROM_SNAPSHOT'):
+        return None
+    directory = snapshot_dir()
+    if not os.path.exists(os.path.join(directory, MANIFEST)):
+        return None
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return directory
+
+
+def _read_snapshot_arrays(directory):
+    """
+    A cube snapshot built from the analytics snapshot in `directory`.
+
+    Returns:
+        _Snapshot: Arrays as of the snapshot's watermark, or None when it has no partitions
+    """
+    partitions = read_manifest(directory)['partitions']
+    if not partitions or partitions[-1]['watermark'] is None:
+        return None
+    # Partitions are read oldest first, so the last copy of each id wins
+    projects = {row['id']: row for row in read_snapshot(directory, 'projects').to_pylist()}
+    assessments = {row['id']: row for row in read_snapshot(directory, 'assessments').to_pylist()}
+    rows = [
+        _SnapshotRow(row['id'], row['overall_score'], row['status'], row['completed_at'], row['user_id'],
+                     row['project_id'], projects[row['project_id']]['project_type'],
+                     projects[row['project_id']]['sector'])
+        for row in sorted(assessments.values(), key=lambda row: row['id']) if row['project_id'] in projects
+    ]
+    vocab = {column: [] for column in CATEGORICAL}
+    arrays = _build_arrays(rows, {}, vocab)
+
+    ids, matrix = load_score_matrix(directory)
+    row_of = {assessment_id: row for row, assessment_id in enumerate(arrays['ids'].tolist())}
+    target = np.fromiter((row_of.get(i, -1) for i in ids.tolist()), dtype=np.int64, count=len(ids))
+    arrays['scores'][target[target >= 0]] = matrix[target >= 0]
+
+    watermark = datetime.fromisoformat(partitions[-1]['watermark'])
+    return _Snapshot(vocab=vocab, watermark=watermark, **arrays)
+
+
+def _encode(values, vocab):
+    """Dictionary-encode values against vocab, extending it with unseen values."""
+    index = {value: code for code, value in enumerate(vocab)}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(vocab)
+            vocab.append(value)
+        codes[i] = code
+    return codes
+
+
+def _build_arrays(rows, scores, vocab):
+    """Column arrays for `rows`, encoding categoricals against (a copy of) vocab."""
+    n = len(rows)
+    matrix = np.full((n, SDG_COUNT), np.nan, dtype=np.float32)
+    for i, row in enumerate(rows):
+        for column, value in scores.get(row.id, {}).items():
+            matrix[i, column] = value
+    return {
+        'ids': np.fromiter((row.id for row in rows), dtype=np.int64, count=n),
+        'scores': matrix,
+        'overall': np.array([np.nan if row.overall_score is None else row.overall_score for row in rows],
+                            dtype=np.float32),
+        'codes': {column: _encode([getattr(row, column) for row in rows], vocab[column]) for column in CATEGORICAL},
+        'completed_at': np.array([row.completed_at or 'NaT' for row in rows], dtype='datetime64[s]'),
+        'user_id': np.fromiter((row.user_id for row in rows), dtype=np.int64, count=n),
+        'project_id': np.fromiter((row.project_id for row in rows), dtype=np.int64, count=n),
+    }
+
+
+class ScoreCube:
+    """Loads, refreshes and queries the SDG score cube."""
+
+    def __init__(self):
+        self._snapshot = _empty_snapshot()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @replica_reads()
+    def load(self, session=None, snapshot_directory=None):
+        """
+        Read every assessment into a fresh snapshot.
+
+        Args:
+            snapshot_directory (str): Start from the analytics snapshot there and
+                re-read only what changed after its watermark
+        """
+        session = session or db.session
+        if snapshot_directory is not None:
+            seeded = _read_snapshot_arrays(snapshot_directory)
+            if seeded is not None:
+                with self._lock:
+                    self._snapshot = seeded
+                    self._loaded = True
+                # Falls back to a full load when rows were deleted after the snapshot
+                return self.refresh(session)
+
+        with self._lock:
+            watermark = _max_updated_at(session)
+            rows, scores = _read_rows(session)
+            vocab = {column: [] for column in CATEGORICAL}
+            arrays = _build_arrays(rows, scores, vocab)
+            self._snapshot = _Snapshot(vocab=vocab, watermark=watermark, **arrays)
+            self._loaded = True
+            self._checked_at = time.monotonic()
+        return len(self._snapshot)
+
+    @replica_reads()
+    def refresh(self, session=None):
+        """
+        Apply changes made since the watermark.
+
+        Falls back to a full load when rows have disappeared, since deletions
+        leave no updated_at behind.
+
+        Returns:
+            int: Number of assessments in the cube
+        """
+        session = session or db.session
+        if not self._loaded:
+            return self.load(session)
+
+        with self._lock:
+            current = self._snapshot
+            self._checked_at = time.monotonic()
+            # Read the new watermark first so writes racing this refresh are picked up next time
+            watermark = _max_updated_at(session)
+            total = session.execute(select(func.count(Assessment.id))).scalar() or 0
+
+            changed_ids = []
+            if current.watermark is not None and watermark != current.watermark:
+                since = current.watermark
+                changed_ids = session.execute(
+                    select(Assessment.id)
+                    .join(Project, Project.id == Assessment.project_id)
+                    .where(or_(
+                        Assessment.updated_at >= since,
+                        Project.updated_at >= since,
+                        Assessment.id.in_(select(SdgScore.assessment_id).where(SdgScore.updated_at >= since)),
+                    ))
+                ).scalars().all()
+
+            appended = sum(1 for assessment_id in changed_ids if assessment_id not in current.row_of)
+            consistent = total == len(current) + appended and (current.watermark is not None or total == 0)
+            if consistent:
+                if changed_ids:
+                    self._snapshot = self._merge(current, session, changed_ids, watermark)
+                elif watermark != current.watermark:
+                    snapshot = copy.copy(current)
+                    snapshot.watermark = watermark
+                    self._snapshot = snapshot
+                return len(self._snapshot)
+
+        return self.load(session)
+
+    def _merge(self, current, session, changed_ids, watermark):
+        rows, scores = _read_rows(session, changed_ids)
+        vocab = {column: list(values) for column, values in current.vocab.items()}
+        changed = _build_arrays(rows, scores, vocab)
+
+        existing = np.array([current.row_of.get(i, -1) for i in changed['ids'].tolist()], dtype=np.int64)
+        update_at, update_from = existing[existing >= 0], np.nonzero(existing >= 0)[0]
+        append_from = np.nonzero(existing < 0)[0]
+
+        def merged(old, new):
+            out = np.concatenate([old, new[append_from]])
+            out[update_at] = new[update_from]
+            return out
+
+        return _Snapshot(
+            ids=merged(current.ids, changed['ids']),
+            scores=merged(current.scores, changed['scores']),
+            overall=merged(current.overall, changed['overall']),
+            codes={column: merged(current.codes[column], changed['codes'][column]) for column in CATEGORICAL},
+            vocab=vocab,
+            completed_at=merged(current.completed_at, changed['completed_at']),
+            user_id=merged(current.user_id, changed['user_id']),
+            project_id=merged(current.project_id, changed['project_id']),
+            watermark=watermark,
+            base_version=current.version,
+            changed_rows=np.concatenate([update_at, np.arange(len(current), len(current) + len(append_from))]),
+        )
+
+    def refresh_if_stale(self, max_age):
+        """Refresh when the last check is older than max_age seconds."""
+        if not self._loaded:
+            self.load(snapshot_directory=_snapshot_source())
+        elif time.monotonic() - self._checked_at >= max_age:
+            self.refresh()
+        return self._snapshot
+
+    # --- Queries ---
+
+    def mask(self, snapshot=None, completed_only=False, completed_after=None, completed_before=None,
+             user_id=None, project_id=None, **categories):
+        """
+        Boolean row mask for a cross-filter.
+
+        A refresh may swap the cube's snapshot at any time, so callers that
+        aggregate under the mask pass the same `snapshot` to both calls.
+
+        Args:
+            snapshot: Snapshot to filter (default: the current one)
+            completed_only (bool): Only assessments with status 'completed'
+            completed_after, completed_before (datetime): completed_at range, [after, before)
+            user_id, project_id (int): Owner or project filter
+            **categories: project_type, sector or status equal to a value (or any of a list of values)
+        """
+        snap = snapshot or self._snapshot
+        mask = np.ones(len(snap), dtype=bool)
+        if completed_only:
+            categories.setdefault('status', 'completed')
+        for column, wanted in categories.items():
+            if column not in CATEGORICAL:
+                raise ValueError(f'Unknown cube column: {column}')
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            codes = [snap.vocab[column].index(value) for value in wanted if value in snap.vocab[column]]
+            mask &= np.isin(snap.codes[column], codes)
+        if completed_after is not None:
+            mask &= snap.completed_at >= np.datetime64(completed_after, 's')
+        if completed_before is not None:
+            mask &= snap.completed_at < np.datetime64(completed_before, 's')
+        if user_id is not None:
+            mask &= snap.user_id == user_id
+        if project_id is not None:
+            mask &= snap.project_id == project_id
+        return mask
+
+    def _resolve(self, snapshot, mask):
+        """The snapshot to aggregate, checked against the mask built from it."""
+        snap = snapshot or self._snapshot
+        if mask is not None and len(mask) != len(snap):
+            raise ValueError('Mask was built from another snapshot; pass the snapshot it was built from')
+        return snap
+
+    def _values(self, snap, sdg, mask):
+        """Non-NaN scores of one SDG (1-17) or the overall score (sdg=None) under a mask."""
+        column = snap.overall if sdg is None else snap.scores[:, sdg - 1]
+        if mask is not None:
+            column = column[mask]
+        return column[~np.isnan(column)]
+
+    def sdg_means(self, mask=None, snapshot=None):
+        """
+        Mean score per SDG.
+
+        Returns:
+            list: 17 floats (None where no assessment scored the SDG)
+        """
+        snap = self._resolve(snapshot, mask)
+        scores = snap.scores if mask is None else snap.scores[mask]
+        counts = np.sum(~np.isnan(scores), axis=0)
+        sums = np.nansum(scores, axis=0, dtype=np.float64)
+        return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
+    def group_means(self, by, mask=None, snapshot=None):
+        """
+        Mean score per SDG for each value of a categorical column.
+
+        Returns:
+            dict: value -> {'count': assessments, 'means': 17 floats or None}
+        """
+        snap = self._resolve(snapshot, mask)
+        codes, scores = snap.codes[by], snap.scores
+        if mask is not None:
+            codes, scores = codes[mask], scores[mask]
+        groups = len(snap.vocab[by])
+        valid = ~np.isnan(scores)
+        sums = np.zeros((groups, SDG_COUNT))
+        counts = np.zeros((groups, SDG_COUNT))
+        np.add.at(sums, codes, np.where(valid, scores, 0))
+        np.add.at(counts, codes, valid)
+        sizes = np.bincount(codes, minlength=groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        return {
+            value: {'count': int(sizes[code]),
+                    'means': [None if np.isnan(m) else float(m) for m in means[code]]}
+            for code, value in enumerate(snap.vocab[by]) if sizes[code]
+        }
+
+    def percentiles(self, sdg=None, q=(25, 50, 75), mask=None, snapshot=None):
+        """Percentiles of one SDG's score (or the overall score), or None when there is no data."""
+        values = self._values(self._resolve(snapshot, mask), sdg, mask)
+        if not len(values):
+            return None
+        return [float(v) for v in np.percentile(values, q)]
+
+    def histogram(self, sdg=None, bins=(0, 2, 4, 6, 8, 10.0001), mask=None, snapshot=None):
+        """Counts per bin of one SDG's score (or the overall score)."""
+        counts, _ = np.histogram(self._values(self._resolve(snapshot, mask), sdg, mask), bins=bins)
+        return counts.tolist()
+
+    def sorted_scores(self, sdg=None, mask=None, snapshot=None):
+        """Sorted float64 scores, for percentile-rank lookups."""
+        return np.sort(self._values(self._resolve(snapshot, mask), sdg, mask).astype(np.float64))
+
+    def count(self, mask=None, snapshot=None):
+        return int(len(self._resolve(snapshot, mask)) if mask is None else np.count_nonzero(mask))
+
+
+_cube = ScoreCube()
+
+
+def get_score_cube():
+    """Process-wide cube, loaded on first use and refreshed at most every SCORE_CUBE_REFRESH_SECONDS."""
+    _cube.refresh_if_stale(current_app.config.get('SCORE_CUBE_REFRESH_SECONDS', 30))
+    return _cube
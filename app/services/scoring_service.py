@@ -55,6 +55,8 @@ from app.models.sdg import SdgGoal, SdgQuestion  # Assuming SdgQuestion is defin
 from app.models.sdg_relationship import SdgRelationship  # Make sure this model exists and is imported
 from flask import current_app  # For logging
 from app.services.assessment_cache_service import invalidate_assessment_cache
+from app.services.summary_service import assessment_summary
+from app.utils.events import publish
 
 def calculate_sdg_scores(assessment_id):
     """
@@ -304,6 +306,16 @@ def calculate_sdg_scores(assessment_id):
             # Don't fail if cache invalidation fails
             print(f"Warning: Cache invalidation failed: {cache_e}")
 
+        # Tell the user's open pages (results, project) the new scores are in
+        try:
+            publish(assessment.user_id, 'scoring.completed', {
+                'assessment_id': assessment_id,
+                'project_id': assessment.project_id,
+                'overall_score': overall_score,
+            })
+        except Exception as event_e:
+            print(f"Warning: Publishing scoring.completed failed: {event_e}")
+
     except Exception as final_commit_e:
         db.session.rollback()
         print(f"ERROR during final commit in scoring service: {final_commit_e}")
@@ -554,81 +566,21 @@ def process_question_response(question_type, value, options=None, max_score=5):
     # For other question types or errors
     return 0
 
-def get_assessment_summary(conn, assessment_id):
+def get_assessment_summary(session, assessment_id):
     """
     Generate a summary of assessment results for display.
-    
+
+    The summary is precomputed when the assessment's scores are written
+    (see summary_service) and read here by primary key.
+
     Args:
-        conn: Database connection
+        session: SQLAlchemy session
         assessment_id: ID of the assessment to summarize
-        
+
     Returns:
         Dictionary containing summary information
     """
-    # Get assessment details
-    assessment = conn.execute('''
-        SELECT a.*, p.name as project_name, p.description as project_description
-        FROM assessments a
-        JOIN projects p ON a.project_id = p.id
-        WHERE a.id = ?
-    ''', (assessment_id,)).fetchone()
-    
+    assessment = session.get(Assessment, assessment_id)
     if not assessment:
         return {'error': 'Assessment not found'}
-    
-    # Get SDG scores
-    scores = conn.execute('''
-        SELECT s.*, g.number, g.name, g.description, g.color_code
-        FROM sdg_scores s
-        JOIN sdg_goals g ON s.sdg_id = g.id
-        WHERE s.assessment_id = ?
-        ORDER BY g.number
-    ''', (assessment_id,)).fetchall()
-    
-    # Convert to dictionaries for JSON serialization
-    scores_list = [dict(score) for score in scores]
-    
-    # Group by SDG categories
-    categories = {
-        'People': [s for s in scores_list if s['number'] in [1, 2, 3, 4, 5]],
-        'Planet': [s for s in scores_list if s['number'] in [6, 12, 13, 14, 15]],
-        'Prosperity': [s for s in scores_list if s['number'] in [7, 8, 9, 10, 11]],
-        'Peace & Partnership': [s for s in scores_list if s['number'] in [16, 17]]
-    }
-    
-    # Calculate category averages
-    category_scores = {}
-    for category, category_scores_list in categories.items():
-        if category_scores_list:
-            category_scores[category] = sum(s['total_score'] for s in category_scores_list) / len(category_scores_list)
-        else:
-            category_scores[category] = 0
-    
-    # Identify top and bottom performing SDGs
-    sorted_scores = sorted(scores_list, key=lambda s: s['total_score'], reverse=True)
-    top_sdgs = sorted_scores[:3] if len(sorted_scores) >= 3 else sorted_scores
-    bottom_sdgs = sorted_scores[-3:] if len(sorted_scores) >= 3 else sorted_scores
-    
-    # Prepare chart data
-    chart_data = [
-        {
-            'sdg': score['number'],
-            'name': score['name'],
-            'direct': score['direct_score'],
-            'bonus': score['bonus_score'],
-            'total': score['total_score'],
-            'color': score['color_code']
-        }
-        for score in scores_list
-    ]
-    
-    return {
-        'assessment': dict(assessment),
-        'scores': scores_list,
-        'categories': categories,
-        'category_scores': category_scores,
-        'top_sdgs': top_sdgs,
-        'bottom_sdgs': bottom_sdgs,
-        'chart_data': chart_data,
-        'overall_score': assessment['overall_score']
-    }
+    return assessment_summary(session, assessment)
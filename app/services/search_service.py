@@ -0,0 +1,155 @@
+"""
+Search Service
+Ranked full-text search over project name, description, location and sector.
+
+SQLite uses an FTS5 table (projects_fts) that triggers keep in step with
+projects; PostgreSQL uses a weighted, generated tsvector column
+(projects.search_vector) with a GIN index. The migration creates both; on
+SQLite, register_search_ddl() also creates the FTS table whenever
+metadata.create_all() creates projects (tests, fresh development databases).
+
+Queries are built only from the words in the user's input, so FTS operators
+typed into a search box are never interpreted. Autocomplete matches every
+word as a prefix.
+"""
+
+import re
+
+from sqlalchemy import event, select, func, literal_column, table, column, DDL
+
+from app import db
+from app.models.project import Project
+
+# Words used from one query; the rest are ignored
+MAX_TERMS = 8
+# Results the search page shows, best matches (or without search words, newest) first
+SEARCH_LIMIT = 50
+# bm25 column weights, in FTS table column order (name, description, location, sector)
+FTS5_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, description, location, sector,
+        content='projects', content_rowid='id', tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, description, location, sector)
+        VALUES (new.id, new.name, new.description, new.location, new.sector);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, location, sector)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.sector);
+    END""",
+    # Only the indexed columns: counter and timestamp updates do not touch the index
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF name, description, location, sector
+    ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, location, sector)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.sector);
+        INSERT INTO projects_fts(rowid, name, description, location, sector)
+        VALUES (new.id, new.name, new.description, new.location, new.sector);
+    END""",
+]
+
+
+def search_terms(text):
+    """Lower-cased words of a search string, at most MAX_TERMS."""
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+def fts5_match(terms, prefix=False):
+    """FTS5 MATCH expression requiring every term, each quoted so it is taken literally."""
+    return ' '.join(f'"{term}"' + ('*' if prefix else '') for term in terms)
+
+
+def _tsquery(terms, prefix=False):
+    return ' & '.join(term + (':*' if prefix else '') for term in terms)
+
+
+def project_matches(text, prefix=False, dialect_name=None):
+    """
+    Projects matching a search string, with a relevance score (higher is better).
+
+    Returns:
+        Subquery with `id` and `score` columns, or None when the string has no words
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+    dialect_name = dialect_name or db.engine.dialect.name
+    if dialect_name == 'sqlite':
+        fts = table('projects_fts', column('rowid'))
+        # FTS5 takes the table name itself as the MATCH and bm25() operand
+        fts_name = literal_column('projects_fts')
+        return (
+            select(fts.c.rowid.label('id'), (-func.bm25(fts_name, *FTS5_WEIGHTS)).label('score'))
+            .where(fts_name.op('MATCH')(fts5_match(terms, prefix)))
+            .subquery('project_matches')
+        )
+    if dialect_name == 'postgresql':
+        vector = literal_column('projects.search_vector')
+        query = func.to_tsquery('simple', _tsquery(terms, prefix))
+        return (
+            select(Project.id.label('id'), func.ts_rank_cd(vector, query).label('score'))
+            .where(vector.op('@@')(query))
+            .subquery('project_matches')
+        )
+    raise ValueError(f'Full-text search is not supported for {dialect_name}')
+
+
+def search_projects(text, user_id, project_type=None, limit=SEARCH_LIMIT):
+    """
+    A user's projects matching `text`, best matches first.
+
+    Returns:
+        list: Project instances
+    """
+    matches = project_matches(text)
+    if matches is None:
+        return []
+    query = (
+        select(Project).join(matches, matches.c.id == Project.id)
+        .where(Project.user_id == user_id, Project.deleted_at.is_(None))
+        .order_by(matches.c.score.desc(), Project.id.desc())
+        .limit(limit)
+    )
+    if project_type:
+        query = query.where(Project.project_type == project_type)
+    return db.session.scalars(query).all()
+
+
+def autocomplete_projects(text, user_id, limit=8):
+    """
+    Suggestions for a partially typed search, every word matched as a prefix.
+
+    Returns:
+        list: [{'id': ..., 'name': ...}] best matches first
+    """
+    matches = project_matches(text, prefix=True)
+    if matches is None:
+        return []
+    rows = db.session.execute(
+        select(Project.id, Project.name).join(matches, matches.c.id == Project.id)
+        .where(Project.user_id == user_id, Project.deleted_at.is_(None))
+        .order_by(matches.c.score.desc(), Project.id.desc())
+        .limit(limit)
+    )
+    return [{'id': project_id, 'name': name} for project_id, name in rows]
+
+
+def rebuild_search_index(connection):
+    """Repopulate the SQLite FTS table from projects (no-op on PostgreSQL, whose column is generated)."""
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')")
+
+
+_CREATE_DDL = [DDL(statement).execute_if(dialect='sqlite') for statement in SQLITE_DDL]
+_DROP_DDL = DDL('DROP TABLE IF EXISTS projects_fts').execute_if(dialect='sqlite')
+
+
+def register_search_ddl():
+    """Create the SQLite FTS table and triggers along with the projects table."""
+    table = Project.__table__
+    if event.contains(table, 'after_create', _CREATE_DDL[0]):
+        return
+    for ddl in _CREATE_DDL:
+        event.listen(table, 'after_create', ddl)
+    event.listen(table, 'after_drop', _DROP_DDL)
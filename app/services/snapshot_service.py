@@ -0,0 +1,254 @@
+"""
+Snapshot Service
+Columnar (Arrow IPC or Parquet) analytics snapshots of projects, assessments and
+the per-SDG score matrix.
+
+Each run writes one partition directory named after the data watermark (the
+newest updated_at it covers) and records it in manifest.json. Incremental runs
+only contain rows updated since the previous partition, so consumers load just
+the partitions they have not seen; `full` partitions restart the chain and are
+the only way deletions propagate. Rows can appear in two adjacent partitions,
+so readers keep the last copy of each id.
+
+pyarrow is an optional dependency, imported only when a snapshot is written or read.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, func
+
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.services.export_service import iter_rows, SDG_COLUMNS
+
+SNAPSHOT_FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+TABLES = ('projects', 'assessments', 'sdg_scores')
+MANIFEST = 'manifest.json'
+BATCH_SIZE = 10000
+
+# Low-cardinality text columns stored dictionary-encoded
+CATEGORICAL = {'sector', 'project_type', 'status', 'assessment_type'}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError('Snapshots need pyarrow: pip install pyarrow')
+    return pyarrow
+
+
+def snapshot_dir():
+    return current_app.config.get('SNAPSHOT_DIR') or os.path.join(current_app.instance_path, 'snapshots')
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {'partitions': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(directory, manifest):
+    # Write then rename so readers never see a half-written manifest
+    path = os.path.join(directory, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _watermark(session):
+    stamps = [
+        session.execute(select(func.max(model.updated_at))).scalar()
+        for model in (Project, Assessment, SdgScore)
+    ]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def _schemas(pa):
+    def column(name, sql_type=None):
+        if name in CATEGORICAL:
+            return pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+        return pa.field(name, sql_type)
+
+    timestamp = pa.timestamp('us')
+    return {
+        'projects': pa.schema([
+            column('id', pa.int64()), column('name', pa.string()), column('project_type'),
+            column('sector'), column('location', pa.string()), column('size_sqm', pa.float64()),
+            column('budget', pa.float64()), column('status'), column('user_id', pa.int64()),
+            column('start_date', timestamp), column('end_date', timestamp),
+            column('created_at', timestamp), column('updated_at', timestamp),
+        ]),
+        'assessments': pa.schema([
+            column('id', pa.int64()), column('project_id', pa.int64()), column('user_id', pa.int64()),
+            column('status'), column('assessment_type'), column('overall_score', pa.float32()),
+            column('created_at', timestamp), column('updated_at', timestamp), column('completed_at', timestamp),
+        ]),
+        'sdg_scores': pa.schema(
+            [column('assessment_id', pa.int64())] + [column(name, pa.float32()) for name in SDG_COLUMNS]
+        ),
+    }
+
+
+class _BatchWriter:
+    """Buffers rows per column and writes them as record batches."""
+
+    def __init__(self, pa, path, schema, file_format):
+        self.pa = pa
+        self.schema = schema
+        self.columns = {name: [] for name in schema.names}
+        self.rows = 0
+        if file_format == 'parquet':
+            self.writer = pa.parquet.ParquetWriter(path, schema)
+        else:
+            self.writer = pa.ipc.new_file(path, schema)
+
+    def append(self, values):
+        for name in self.schema.names:
+            self.columns[name].append(values.get(name))
+        self.rows += 1
+        if len(self.columns[self.schema.names[0]]) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.columns[self.schema.names[0]]:
+            batch = self.pa.RecordBatch.from_pydict(self.columns, schema=self.schema)
+            self.writer.write_batch(batch)
+            self.columns = {name: [] for name in self.schema.names}
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def write_snapshot(directory=None, file_format='arrow', full=False, session=None):
+    """
+    Write the next snapshot partition.
+
+    Args:
+        directory (str): Snapshot root (defaults to SNAPSHOT_DIR or instance/snapshots)
+        file_format (str): 'arrow' (IPC file, memory-mappable) or 'parquet'
+        full (bool): Write every row instead of rows updated since the last partition
+
+    Returns:
+        dict: The manifest entry for the new partition, or None when nothing changed
+    """
+    pa = _require_pyarrow()
+    if file_format not in SNAPSHOT_FORMATS:
+        raise ValueError(f'Unknown snapshot format: {file_format}')
+    session = session or db.session
+    directory = directory or snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    manifest = read_manifest(directory)
+    previous = manifest['partitions'][-1]['watermark'] if manifest['partitions'] else None
+    # Read the watermark before the data so concurrent writes land in the next partition
+    watermark = _watermark(session)
+    if not full and previous is not None and (watermark is None or watermark.isoformat() <= previous):
+        return None
+
+    since = None if (full or previous is None) else datetime.fromisoformat(previous)
+    version = (watermark or datetime.utcnow()).strftime('%Y%m%dT%H%M%S%f')
+    partition = os.path.join(directory, f'wm={version}')
+    os.makedirs(partition, exist_ok=True)
+
+    schemas = _schemas(pa)
+    extension = SNAPSHOT_FORMATS[file_format]
+    writers = {table: _BatchWriter(pa, os.path.join(partition, table + extension), schemas[table], file_format)
+               for table in TABLES}
+    try:
+        columns, rows = iter_rows('projects', since, BATCH_SIZE, session)
+        for row in rows:
+            writers['projects'].append(dict(zip(columns, row)))
+
+        # One pass over the pivoted assessment rows feeds both the attribute and score tables
+        columns, rows = iter_rows('assessments', since, BATCH_SIZE, session)
+        for row in rows:
+            values = dict(zip(columns, row))
+            writers['assessments'].append(values)
+            writers['sdg_scores'].append({'assessment_id': values['id'], **values})
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    entry = {
+        'version': version,
+        'watermark': watermark.isoformat() if watermark else None,
+        'since': since.isoformat() if since else None,
+        'full': since is None,
+        'format': file_format,
+        'path': os.path.basename(partition),
+        'rows': {table: writer.rows for table, writer in writers.items()},
+        'written_at': datetime.utcnow().isoformat(),
+    }
+    # Rewriting an unchanged watermark (e.g. a repeated --full) replaces its entry
+    manifest['partitions'] = [p for p in manifest['partitions'] if p['version'] != version] + [entry]
+    _write_manifest(directory, manifest)
+    return entry
+
+
+def partitions_to_load(directory, after_version=None):
+    """
+    Manifest entries a consumer needs: everything from the latest full partition
+    on, or only those newer than `after_version` when it already has that one.
+    """
+    partitions = read_manifest(directory)['partitions']
+    start = max((i for i, entry in enumerate(partitions) if entry['full']), default=0)
+    if after_version is not None:
+        newer = [i for i, entry in enumerate(partitions) if entry['version'] > after_version]
+        if newer and newer[0] > start:
+            start = newer[0]
+        elif not newer:
+            return []
+    return partitions[start:]
+
+
+def read_snapshot(directory, table, after_version=None):
+    """
+    Read one table across the partitions a consumer needs, memory-mapping Arrow files.
+
+    Returns:
+        pyarrow.Table: Rows from oldest to newest partition (later copies of an id win)
+    """
+    pa = _require_pyarrow()
+    if table not in TABLES:
+        raise ValueError(f'Unknown snapshot table: {table}')
+    tables = []
+    for entry in partitions_to_load(directory, after_version):
+        path = os.path.join(directory, entry['path'], table + SNAPSHOT_FORMATS[entry['format']])
+        if entry['format'] == 'arrow':
+            # Zero-copy: columns reference the mapped file rather than the heap
+            with pa.memory_map(path, 'r') as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        else:
+            tables.append(pa.parquet.read_table(path, memory_map=True))
+    if not tables:
+        return _schemas(pa)[table].empty_table()
+    return pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+
+def load_score_matrix(directory=None, after_version=None):
+    """
+    The per-SDG score matrix from the snapshot, deduplicated to the latest copy of each assessment.
+
+    Returns:
+        tuple: (int64 array of assessment ids, float32 array of shape (n, 17))
+    """
+    import numpy as np
+    table = read_snapshot(directory or snapshot_dir(), 'sdg_scores', after_version)
+    ids = table.column('assessment_id').to_numpy()
+    matrix = np.column_stack([table.column(name).to_numpy(zero_copy_only=False) for name in SDG_COLUMNS]) \
+        if len(ids) else np.empty((0, len(SDG_COLUMNS)), dtype=np.float32)
+    # Keep the last occurrence of each id (partitions are concatenated oldest first)
+    _, last = np.unique(ids[::-1], return_index=True)
+    keep = np.sort(len(ids) - 1 - last)
+    return ids[keep], matrix[keep].astype(np.float32, copy=False)
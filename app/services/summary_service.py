@@ -0,0 +1,207 @@
+"""
+Assessment Summary Service
+Computes an assessment's results summary (category averages, top and bottom
+SDGs, chart data) when its scores are written and stores it in
+assessment_summaries, so serving a summary is one primary-key read.
+
+A flush listener refreshes the summaries of every assessment whose scores or
+overall score the flush touched, in the flushing transaction. Summaries
+missing on read (assessments scored before the table existed) are computed
+then. Writes that bypass the ORM (the legacy sqlite3 helpers) or edit SDG goal
+names and colors are not tracked; `flask rebuild-summaries` recomputes all.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event, select, delete, insert, inspect
+from sqlalchemy.orm.attributes import get_history, PASSIVE_NO_INITIALIZE
+
+from app import db
+from app.models.assessment import Assessment, SdgScore
+from app.models.assessment_summary import AssessmentSummary
+from app.models.sdg import SdgGoal
+
+# SDG numbers grouped into the four reporting categories
+CATEGORIES = {
+    'People': (1, 2, 3, 4, 5),
+    'Planet': (6, 12, 13, 14, 15),
+    'Prosperity': (7, 8, 9, 10, 11),
+    'Peace & Partnership': (16, 17),
+}
+CATEGORY_OF = {number: category for category, numbers in CATEGORIES.items() for number in numbers}
+# Number of SDGs listed as top and bottom performers
+TOP_K = 3
+
+ASSESSMENT_COLUMNS = ('id', 'project_id', 'user_id', 'status', 'overall_score', 'assessment_type',
+                      'created_at', 'updated_at', 'completed_at')
+
+
+def build_summary(scores, k=TOP_K):
+    """
+    Summarize an assessment's SDG scores.
+
+    Args:
+        scores (list): Dicts with number, name, color_code, direct_score,
+            bonus_score and total_score, ordered by SDG number
+        k (int): Length of the top and bottom lists
+
+    Returns:
+        dict: The stored summary payload
+    """
+    chart_data = [{
+        'sdg': score['number'],
+        'name': score['name'],
+        'direct': score['direct_score'],
+        'bonus': score['bonus_score'],
+        'total': score['total_score'],
+        'color': score['color_code'],
+    } for score in scores]
+
+    members = {category: [] for category in CATEGORIES}
+    totals = {category: 0.0 for category in CATEGORIES}
+    for entry in chart_data:
+        category = CATEGORY_OF.get(entry['sdg'])
+        if category:
+            members[category].append(entry['sdg'])
+            totals[category] += entry['total'] or 0.0
+    category_scores = {
+        category: totals[category] / len(numbers) if numbers else 0
+        for category, numbers in members.items()
+    }
+
+    ranked = sorted(chart_data, key=lambda entry: entry['total'] or 0.0, reverse=True)
+    return {
+        'category_scores': category_scores,
+        'categories': members,
+        'top_sdgs': ranked[:k],
+        'bottom_sdgs': ranked[-k:] if len(ranked) >= k else ranked,
+        'chart_data': chart_data,
+    }
+
+
+def refresh_summaries(conn, assessment_ids):
+    """
+    Recompute and store the summaries of `assessment_ids` with one read query.
+    Summaries of assessments that no longer exist are dropped.
+
+    Args:
+        conn: Connection or session to run the statements on
+
+    Returns:
+        dict: assessment_id -> stored row values
+    """
+    assessment_ids = sorted(set(assessment_ids))
+    if not assessment_ids:
+        return {}
+    rows = conn.execute(
+        select(Assessment.id, Assessment.overall_score, SdgGoal.number, SdgGoal.name, SdgGoal.color_code,
+               SdgScore.direct_score, SdgScore.bonus_score, SdgScore.total_score)
+        .select_from(Assessment)
+        .outerjoin(SdgScore, SdgScore.assessment_id == Assessment.id)
+        .outerjoin(SdgGoal, SdgGoal.id == SdgScore.sdg_id)
+        .where(Assessment.id.in_(assessment_ids))
+        .order_by(Assessment.id, SdgGoal.number)
+    ).mappings()
+
+    overall, scores = {}, {}
+    for row in rows:
+        overall[row['id']] = row['overall_score']
+        entries = scores.setdefault(row['id'], [])
+        if row['number'] is not None:
+            entries.append(row)
+
+    now = datetime.utcnow()
+    values = {
+        assessment_id: {
+            'assessment_id': assessment_id,
+            'overall_score': overall[assessment_id],
+            'payload': build_summary(scores[assessment_id]),
+            'computed_at': now,
+        }
+        for assessment_id in overall
+    }
+    conn.execute(delete(AssessmentSummary).where(AssessmentSummary.assessment_id.in_(assessment_ids)))
+    if values:
+        conn.execute(insert(AssessmentSummary), list(values.values()))
+    return values
+
+
+def _touched_assessments(session):
+    """Ids of the assessments whose scores or overall score the flush wrote."""
+    ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        state = inspect(obj)
+        if isinstance(obj, SdgScore):
+            ids.add(state.dict.get('assessment_id'))
+            ids.update(get_history(obj, 'assessment_id', passive=PASSIVE_NO_INITIALIZE).deleted or ())
+        elif isinstance(obj, Assessment) and obj not in session.deleted and state.identity:
+            if obj in session.new or get_history(obj, 'overall_score', passive=PASSIVE_NO_INITIALIZE).has_changes():
+                ids.add(state.identity[0])
+    ids.discard(None)
+    return ids
+
+
+def _refresh_after_flush(session, flush_context):
+    """after_flush listener: refresh the summaries of the assessments this flush touched."""
+    ids = _touched_assessments(session)
+    if ids:
+        refresh_summaries(session.connection(), ids)
+
+
+def register_summary_listeners():
+    """Attach the flush listener that keeps assessment summaries current on write."""
+    if event.contains(db.session, 'after_flush', _refresh_after_flush):
+        return
+    event.listen(db.session, 'after_flush', _refresh_after_flush)
+
+
+def assessment_summary(session, assessment, project=None):
+    """
+    The results summary of `assessment` for display, read from its stored record.
+    A missing record is computed and written in the session's transaction;
+    the caller commits.
+
+    Args:
+        session: SQLAlchemy session
+        assessment: Assessment to summarize
+        project: Its project, when already loaded
+
+    Returns:
+        dict: assessment, overall_score, category_scores, categories,
+        top_sdgs, bottom_sdgs, chart_data and computed_at
+    """
+    record = session.get(AssessmentSummary, assessment.id)
+    if record is None:
+        stored = refresh_summaries(session, [assessment.id]).get(assessment.id)
+        if stored is None:
+            return {'error': 'Assessment not found'}
+        payload, overall_score, computed_at = stored['payload'], stored['overall_score'], stored['computed_at']
+    else:
+        payload, overall_score, computed_at = record.payload, record.overall_score, record.computed_at
+
+    project = project or assessment.project
+    details = {column: getattr(assessment, column) for column in ASSESSMENT_COLUMNS}
+    details['project_name'] = project.name if project else None
+    details['project_description'] = project.description if project else None
+    return {
+        'assessment': details,
+        'overall_score': overall_score,
+        **payload,
+        'computed_at': computed_at,
+    }
+
+
+def rebuild_summaries(batch_size=500):
+    """
+    Recompute every assessment summary, committing after each batch.
+
+    Returns:
+        int: Number of summaries written
+    """
+    session = db.session
+    ids = session.execute(select(Assessment.id).order_by(Assessment.id)).scalars().all()
+    written = 0
+    for start in range(0, len(ids), batch_size):
+        written += len(refresh_summaries(session, ids[start:start + batch_size]))
+        session.commit()
+    return written
@@ -3,10 +3,16 @@
  * Handles form interactions, validation, auto-save and scoring calculations
  */
 
+// Identifies this page's autosaves, so draft.saved events from other tabs can be told apart
+const DRAFT_CLIENT_ID = Math.random().toString(36).slice(2);
+
 // Initialize when DOM is ready
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize auto-save
     initAutoSave();
+
+    // Hear about saves of this draft from other windows instead of polling
+    initDraftEvents();
     
     // Update progress bar
     updateProgress();
@@ -83,7 +89,8 @@ function saveFormData(showMessage = false) {
         method: 'POST',
         body: formData,
         headers: {
-            'X-Requested-With': 'XMLHttpRequest'
+            'X-Requested-With': 'XMLHttpRequest',
+            'X-Client-Id': DRAFT_CLIENT_ID
         }
     })
     .then(response => response.json())
@@ -104,6 +111,26 @@ function saveFormData(showMessage = false) {
     });
 }
 
+/**
+ * Listen on the server-sent event stream for saves of this draft made elsewhere
+ */
+function initDraftEvents() {
+    const assessmentInput = document.querySelector('input[name="assessment_id"]');
+    if (!assessmentInput || !assessmentInput.value || typeof EventSource === 'undefined') return;
+
+    // EventSource reconnects by itself and resumes from the last event it saw
+    const events = new EventSource('/api/events');
+    events.addEventListener('draft.saved', function(event) {
+        const data = JSON.parse(event.data);
+        if (String(data.assessment_id) === assessmentInput.value && data.client_id !== DRAFT_CLIENT_ID) {
+            showSaveIndicator('This draft was saved from another window. Reload to see those changes.', 'info');
+        }
+    });
+    window.addEventListener('beforeunload', function() {
+        events.close();
+    });
+}
+
 /**
  * Update progress indicator based on completed questions
  */
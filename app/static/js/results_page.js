@@ -57,6 +57,7 @@ document.addEventListener('DOMContentLoaded', function() {
         initializeCharts(); // Create all charts
         initializeUIComponents(); // Populate score cards, strengths, recommendations, etc.
         setupEventHandlers(); // Attach listeners to buttons, etc.
+        listenForScoreUpdates(); // Recalculations push an event instead of being polled for
         hideLoadingOverlay(); // Hide loading spinner *after* essential setup
         console.log("Results page initialization sequence complete.");
     } catch (error) {
@@ -68,6 +69,33 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // --- Helper Functions ---
 
+/**
+ * Offers a reload when this assessment's scores are recalculated (scoring.completed event).
+ */
+function listenForScoreUpdates() {
+    if (!window.assessmentId || typeof EventSource === 'undefined') return;
+    const events = new EventSource('/api/events');
+    events.addEventListener('scoring.completed', function(event) {
+        const data = JSON.parse(event.data);
+        if (String(data.assessment_id) !== String(window.assessmentId) || document.getElementById('scores-updated-alert')) {
+            return;
+        }
+        const alert = document.createElement('div');
+        alert.id = 'scores-updated-alert';
+        alert.className = 'alert alert-info d-flex align-items-center justify-content-between';
+        alert.setAttribute('role', 'status');
+        alert.textContent = 'The scores of this assessment were recalculated. ';
+        const reload = document.createElement('button');
+        reload.type = 'button';
+        reload.className = 'btn btn-sm btn-primary';
+        reload.textContent = 'Show new scores';
+        reload.addEventListener('click', () => window.location.reload());
+        alert.appendChild(reload);
+        (document.querySelector('main') || document.body).prepend(alert);
+    });
+    window.addEventListener('beforeunload', () => events.close());
+}
+
 /**
  * Hides the loading overlay smoothly.
  */
@@ -0,0 +1,221 @@
+"""
+Fingerprinted static assets.
+
+`flask build-assets` (or `python -m app.utils.assets app/static`) minifies the
+JS and CSS under the static folder, concatenates the BUNDLES, and writes each
+result to static/dist/ under a name carrying a hash of its content
+(dist/js/main.3f9a0c1d2e4b.js), together with dist/manifest.json mapping
+source names to built ones. Run it before compress-static so the built files
+get .br/.gz siblings as well.
+
+Templates link assets with static_url('js/main.js'), and bundles with
+static_urls('js/expert_results.bundle.js'), which resolve through the manifest.
+Without a manifest (development, tests) they return the source files, one URL
+per bundle member. A built name changes exactly when its content does, so
+built files are served with a one-year immutable Cache-Control and a deploy
+invalidates only what it changed.
+
+JS is minified with rjsmin when it is installed and only bundled otherwise;
+CSS is minified here.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+
+from flask import current_app, request, url_for
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - exercised only with rjsmin installed
+    rjsmin = None
+
+ASSET_EXTENSIONS = ('.js', '.css')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# A built file name, possibly with the suffix of a precompressed sibling
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}\.(?:js|css)(?:\.gz|\.br)?$' % HASH_LENGTH)
+
+# Scripts always loaded together, in this order, served as one file
+BUNDLES = {
+    'js/expert_assessment.bundle.js': [
+        'js/assessment/i18n_assessment.js',
+        'js/assessment/scoring_assessment.js',
+        'js/assessment/main_assessment.js',
+        'js/assessment/ui_assessment.js',
+    ],
+    'js/expert_results.bundle.js': [
+        'js/assessment/i18n_assessment.js',
+        'js/assessment/charting_assessment.js',
+        'js/assessment/ui_assessment.js',
+        'js/assessment/results_display.js',
+    ],
+}
+
+_CSS_TOKEN = re.compile(r'''
+    (?P<url>url\(\s*(?P<quote>["']?)(?P<ref>[^"')]*)(?P=quote)\s*\))
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<comment>/\*.*?\*/)
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.S | re.X)
+
+
+def minify_css(text, rebase=None):
+    """
+    Strip comments (except /*! ... */) and redundant whitespace from a stylesheet.
+
+    Args:
+        text (str): Stylesheet
+        rebase (callable): Maps each relative url() reference to its new value
+    """
+    out = []
+    space = False
+    for match in _CSS_TOKEN.finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == 'space' or (kind == 'comment' and not token.startswith('/*!')):
+            space = space or kind == 'space'
+            continue
+        if kind == 'url' and rebase is not None:
+            ref = match.group('ref').strip()
+            if ref and not ref.startswith(('/', '#')) and ':' not in ref:
+                token = f"url({match.group('quote')}{rebase(ref)}{match.group('quote')})"
+        if space and out and out[-1][-1] not in '{};,>(:' and token[0] not in '{};,>)':
+            out.append(' ')
+        space = False
+        if token == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(token)
+    return ''.join(out)
+
+
+def minify_js(text):
+    """Minified script with rjsmin, or the script unchanged without it."""
+    if rjsmin is None:
+        return text
+    return rjsmin.jsmin(text)
+
+
+def _asset_sources(static_dir):
+    """Built name -> list of source names (relative, '/'-separated) for every asset and bundle."""
+    sources = {}
+    for root, dirs, files in os.walk(static_dir):
+        if root == static_dir:
+            dirs[:] = [name for name in dirs if name != DIST_DIR]
+        for name in sorted(files):
+            if name.endswith(ASSET_EXTENSIONS):
+                path = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+                sources[path] = [path]
+    for bundle, members in BUNDLES.items():
+        missing = [member for member in members if member not in sources]
+        if missing:
+            raise FileNotFoundError(f"Bundle {bundle} lists missing files: {', '.join(missing)}")
+        sources[bundle] = members
+    return sources
+
+
+def _compile(static_dir, name, members):
+    """Minified (and for bundles concatenated) content of asset `name`."""
+    target_dir = posixpath.join(DIST_DIR, posixpath.dirname(name))
+    parts = []
+    for member in members:
+        with open(os.path.join(static_dir, member), encoding='utf-8') as f:
+            text = f.read()
+        if member.endswith('.css'):
+            source_dir = posixpath.dirname(member)
+            text = minify_css(text, lambda ref: posixpath.relpath(
+                posixpath.normpath(posixpath.join(source_dir, ref)), target_dir))
+        else:
+            text = minify_js(text)
+        parts.append(text.strip())
+    # ';' keeps a script without a trailing semicolon from running into the next
+    return (';\n' if name.endswith('.js') else '\n').join(parts) + '\n'
+
+
+def build_assets(static_dir):
+    """
+    Minify, bundle and fingerprint the JS and CSS under static_dir into static_dir/dist.
+
+    The previous build is replaced as a whole once the new one is complete.
+
+    Returns:
+        dict: The manifest written (source name -> built name, both relative to static_dir)
+    """
+    dist = os.path.join(static_dir, DIST_DIR)
+    staging = dist + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    manifest = {}
+    for name, members in sorted(_asset_sources(static_dir).items()):
+        data = _compile(static_dir, name, members).encode('utf-8')
+        stem, extension = posixpath.splitext(name)
+        built = f'{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{extension}'
+        target = os.path.join(staging, *built.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        manifest[name] = f'{DIST_DIR}/{built}'
+
+    with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    shutil.rmtree(dist, ignore_errors=True)
+    os.replace(staging, dist)
+    return manifest
+
+
+def load_manifest(static_dir):
+    """The manifest of the last build under static_dir, or {} when there is none."""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def static_url(filename):
+    """URL of a static file, resolved through the asset manifest when one is loaded."""
+    manifest = current_app.extensions.get('assets') or {}
+    return url_for('static', filename=manifest.get(filename, filename))
+
+
+def static_urls(filename):
+    """URLs that load `filename`: its built file, or without a manifest the bundle's sources in order."""
+    manifest = current_app.extensions.get('assets') or {}
+    if filename in manifest:
+        return [url_for('static', filename=manifest[filename])]
+    return [url_for('static', filename=member) for member in BUNDLES.get(filename, [filename])]
+
+
+def _cache_fingerprinted(response):
+    """after_request hook: built files never change, so let browsers keep them."""
+    if request.endpoint == 'static' and response.status_code in (200, 304) and FINGERPRINTED.search(request.path):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Load the asset manifest (unless ASSETS_MANIFEST_ENABLED is false) and register the template helpers."""
+    manifest = {}
+    if app.config.get('ASSETS_MANIFEST_ENABLED', True) and app.static_folder:
+        manifest = load_manifest(app.static_folder)
+        if manifest:
+            app.logger.info(f"Serving {len(manifest)} fingerprinted static assets")
+    app.extensions['assets'] = manifest
+    app.add_template_global(static_url)
+    app.add_template_global(static_urls)
+    app.after_request(_cache_fingerprinted)
+
+
+if __name__ == '__main__':
+    import sys
+    for source, built in build_assets(sys.argv[1] if len(sys.argv) > 1 else 'app/static').items():
+        print(f'{source} -> {built}')
@@ -0,0 +1,124 @@
+"""
+Set-based cascade deletes.
+Project.assessments and Assessment.sdg_scores use passive_deletes, so
+deleting a parent through the ORM no longer loads its children: the
+foreign keys' ON DELETE CASCADE removes them in the same statement.
+
+SQLite only enforces foreign keys on connections with PRAGMA foreign_keys=ON,
+which the app cannot turn on while legacy rows reference missing parents. On
+such connections the after_flush listener performs the cascade itself, one
+DELETE per child table. Flush listeners that maintain derived tables use
+cascaded_criterion() to account for the rows a cascade removes.
+"""
+
+from sqlalchemy import event, select, delete, or_, inspect
+
+from app import db
+
+
+def _cascade_foreign_keys(table):
+    """Foreign keys of `table` declared ON DELETE CASCADE."""
+    return [fk for fk in table.foreign_keys if (fk.ondelete or '').upper() == 'CASCADE']
+
+
+def _deleted_ids(session, table):
+    """Primary keys of the session's deleted instances mapped to `table`."""
+    ids = set()
+    for obj in session.deleted:
+        mapper = inspect(obj).mapper
+        if mapper.local_table is table:
+            identity = inspect(obj).identity
+            if identity:
+                ids.add(identity[0])
+    return ids
+
+
+def _parent_clause(session, table, seen=()):
+    """Rows of `table` whose parent the session deletes, directly or through a cascade; None if none."""
+    clauses = []
+    for fk in _cascade_foreign_keys(table):
+        parent = fk.column.table
+        if parent in seen:
+            continue
+        deleted = _deleted_ids(session, parent)
+        if deleted:
+            clauses.append(fk.parent.in_(deleted))
+        upstream = _parent_clause(session, parent, seen + (table,))
+        if upstream is not None:
+            clauses.append(fk.parent.in_(select(fk.column).where(upstream)))
+    return or_(*clauses) if clauses else None
+
+
+def cascaded_criterion(session, model):
+    """
+    WHERE criterion for the rows of `model` that the database will cascade-delete
+    in this flush, excluding instances the session deletes itself (those reach
+    listeners through pending_changes already).
+
+    Returns:
+        The criterion, or None when the flush cascades to no rows of `model`
+    """
+    table = model.__table__
+    clause = _parent_clause(session, table)
+    if clause is None:
+        return None
+    own = _deleted_ids(session, table)
+    primary_key = list(table.primary_key.columns)[0]
+    return clause & primary_key.notin_(own) if own else clause
+
+
+def _enforces_foreign_keys(connection):
+    if connection.dialect.name != 'sqlite':
+        return True
+    return bool(connection.exec_driver_sql('PRAGMA foreign_keys').scalar())
+
+
+def _delete_loaded_children(session, flush_context, instances):
+    """
+    before_flush listener: delete instances already in the session whose parent
+    is being deleted, so the identity map holds no rows the cascade removed.
+    Expired instances are left alone; they raise ObjectDeletedError on refresh
+    like any row deleted under the session.
+    """
+    if not session.deleted:
+        return
+    children = [obj for obj in session.identity_map.values() if obj not in session.deleted]
+    for table in db.metadata.sorted_tables:
+        for fk in _cascade_foreign_keys(table):
+            parents = _deleted_ids(session, fk.column.table)
+            if not parents:
+                continue
+            for obj in children:
+                mapper = inspect(obj).mapper
+                if mapper.local_table is not table or obj in session.deleted:
+                    continue
+                column = mapper.get_property_by_column(fk.parent)
+                if inspect(obj).dict.get(column.key) in parents:
+                    session.delete(obj)
+
+
+def _cascade_without_enforcement(session, flush_context):
+    """after_flush listener: emulate ON DELETE CASCADE where the connection does not enforce it."""
+    if not session.deleted:
+        return
+    connection = session.connection()
+    if _enforces_foreign_keys(connection):
+        return
+    # Children first: their criteria select through parents that still exist
+    for table in reversed(db.metadata.sorted_tables):
+        if not _cascade_foreign_keys(table):
+            continue
+        clause = _parent_clause(session, table)
+        if clause is not None:
+            connection.execute(delete(table).where(clause))
+
+
+def register_cascade_listeners():
+    """
+    Attach the cascade listeners. Register them before other flush listeners so
+    those see the loaded children this one marks as deleted.
+    """
+    if event.contains(db.session, 'before_flush', _delete_loaded_children):
+        return
+    event.listen(db.session, 'before_flush', _delete_loaded_children)
+    event.listen(db.session, 'after_flush', _cascade_without_enforcement)
@@ -0,0 +1,312 @@
+"""
+Response compression for deployments without a compressing proxy in front.
+
+CompressionMiddleware wraps the WSGI app and compresses text-like responses
+(HTML, JSON, JS, CSS, SVG, ...) with brotli or gzip, whichever the client
+prefers in Accept-Encoding (brotli only when the brotli package is installed).
+Responses with a known length below COMPRESSION_MIN_SIZE are left alone;
+responses of known length are compressed in one go, streamed responses chunk
+by chunk with a flush after each chunk so they keep streaming. Already-encoded
+responses, binary types (images, archives, PDFs) and event streams pass
+through untouched.
+
+Static files are precompressed at build time (`flask compress-static`, or
+`python -m app.utils.compression app/static`), which writes `.br` and `.gz`
+siblings next to the JS, CSS and SVG files. A request for a static file whose
+up-to-date sibling the client accepts is served from the sibling by Flask's
+static route, so ETags and conditional requests keep working.
+"""
+
+import gzip
+import os
+import zlib
+
+from werkzeug.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only with brotli installed
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'application/xml', 'application/xhtml+xml',
+    'application/manifest+json', 'application/ld+json', 'image/svg+xml',
+}
+# text/* types that must not be buffered or re-chunked
+STREAMING_TYPES = {'text/event-stream'}
+PRECOMPRESS_EXTENSIONS = ('.js', '.css', '.svg')
+# File suffix per content coding
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Content codings this process can produce, preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings):
+    """The coding from `encodings` the Accept-Encoding header ranks highest, or None."""
+    weights = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(content_type):
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in STREAMING_TYPES:
+        return False
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor with a common interface."""
+
+    def __init__(self, encoding, gzip_level=6, brotli_quality=5):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self):
+        if self.encoding == 'br':
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware negotiating brotli/gzip for responses and precompressed static files.
+
+    Args:
+        app: WSGI application to wrap
+        min_size (int): Smallest body (by Content-Length) worth compressing
+        max_buffer (int): Largest known-length body compressed in one go; larger ones are streamed
+        static_folder (str): Directory served at static_url_path, for precompressed siblings
+    """
+
+    def __init__(self, app, min_size=1024, max_buffer=8 * 1024 * 1024, gzip_level=6, brotli_quality=5,
+                 static_folder=None, static_url_path='/static'):
+        self.app = app
+        self.min_size = min_size
+        self.max_buffer = max_buffer
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.static_folder = os.path.realpath(static_folder) if static_folder else None
+        self.static_prefix = (static_url_path or '/static').rstrip('/') + '/'
+        self.encodings = available_encodings()
+
+    def __call__(self, environ, start_response):
+        accept = environ.get('HTTP_ACCEPT_ENCODING', '')
+        method = environ.get('REQUEST_METHOD', 'GET')
+        path = environ.get('PATH_INFO', '')
+        if self.static_folder and method in ('GET', 'HEAD') and path.startswith(self.static_prefix):
+            suffix = self._precompressed(path, accept)
+            if suffix:
+                return self.app(dict(environ, PATH_INFO=path + suffix), self._vary(start_response))
+
+        encoding = negotiate(accept, self.encodings) if method != 'HEAD' else None
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return self._write
+
+        app_iter = self.app(environ, capture)
+        iterator = iter(app_iter)
+        first = []
+        if not captured:
+            # start_response may be deferred to the first chunk
+            first = [next(iterator, b'')]
+        status, headers, exc_info = captured
+        return self._respond(start_response, status, Headers(headers), exc_info, app_iter, first, iterator,
+                             encoding)
+
+    @staticmethod
+    def _write(data):
+        raise RuntimeError('CompressionMiddleware does not support the WSGI write() callable')
+
+    def _precompressed(self, path, accept):
+        """Suffix of an up-to-date precompressed sibling the client accepts, or None."""
+        source = os.path.realpath(os.path.join(self.static_folder, path[len(self.static_prefix):]))
+        if not source.startswith(self.static_folder + os.sep) or not source.endswith(PRECOMPRESS_EXTENSIONS):
+            return None
+        # Serving a sibling needs no encoder, so .br files built elsewhere are used too
+        candidates = list(SUFFIXES)
+        while candidates:
+            encoding = negotiate(accept, candidates)
+            if encoding is None:
+                return None
+            try:
+                if os.stat(source + SUFFIXES[encoding]).st_mtime >= os.stat(source).st_mtime:
+                    return SUFFIXES[encoding]
+            except OSError:
+                pass
+            candidates.remove(encoding)
+        return None
+
+    @staticmethod
+    def _vary(start_response):
+        def vary_start_response(status, headers, exc_info=None):
+            headers = Headers(headers)
+            headers.add('Vary', 'Accept-Encoding')
+            return start_response(status, headers.to_wsgi_list(), exc_info)
+        return vary_start_response
+
+    def _respond(self, start_response, status, headers, exc_info, app_iter, first, iterator, encoding):
+        code = int(status.split(' ', 1)[0])
+        if compressible(headers.get('Content-Type')):
+            if 'accept-encoding' not in headers.get('Vary', '').lower():
+                headers.add('Vary', 'Accept-Encoding')
+        else:
+            encoding = None
+        length = headers.get('Content-Length', type=int)
+        if (encoding is None or 'Content-Encoding' in headers or code < 200 or code in (204, 206, 304)
+                or 'no-transform' in headers.get('Cache-Control', '')
+                or (length is not None and length < self.min_size)):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return _chain(app_iter, first, iterator)
+
+        compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+        headers['Content-Encoding'] = encoding
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = 'W/' + etag
+
+        if length is not None and length <= self.max_buffer:
+            try:
+                body = b''.join(first) + b''.join(iterator)
+            finally:
+                _close(app_iter)
+            compressed = compressor.compress(body) + compressor.finish()
+            headers['Content-Length'] = str(len(compressed))
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return [compressed]
+
+        headers.remove('Content-Length')
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return _stream(app_iter, first, iterator, compressor)
+
+
+def _close(app_iter):
+    if hasattr(app_iter, 'close'):
+        app_iter.close()
+
+
+def _chain(app_iter, first, iterator):
+    if not first:
+        return app_iter
+    return _ClosingChain(app_iter, first, iterator)
+
+
+class _ClosingChain:
+    """The first, already-read chunk followed by the rest, closing the original iterable."""
+
+    def __init__(self, app_iter, first, iterator):
+        self.app_iter = app_iter
+        self.first = first
+        self.iterator = iterator
+
+    def __iter__(self):
+        yield from self.first
+        yield from self.iterator
+
+    def close(self):
+        _close(self.app_iter)
+
+
+def _stream(app_iter, first, iterator, compressor):
+    try:
+        for chunk in _ClosingChain(app_iter, first, iterator):
+            if chunk:
+                data = compressor.compress(chunk) + compressor.flush()
+                if data:
+                    yield data
+        yield compressor.finish()
+    finally:
+        _close(app_iter)
+
+
+def precompress_static(static_dir, min_size=1024):
+    """
+    Write .gz (and, with brotli installed, .br) siblings for the JS, CSS and SVG files under static_dir.
+
+    Siblings newer than their source are kept. Each sibling gets its source's
+    mtime, which the middleware uses to ignore siblings of since-edited files.
+
+    Returns:
+        list: Paths written
+    """
+    encoders = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders['.br'] = lambda data: brotli.compress(data, quality=11)
+
+    written = []
+    for root, _, files in os.walk(static_dir):
+        for name in sorted(files):
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            stat = os.stat(source)
+            if stat.st_size < min_size:
+                continue
+            data = None
+            for suffix, encode in encoders.items():
+                target = source + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime == stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(source, 'rb') as f:
+                        data = f.read()
+                with open(target + '.tmp', 'wb') as f:
+                    f.write(encode(data))
+                os.replace(target + '.tmp', target)
+                os.utime(target, (stat.st_atime, stat.st_mtime))
+                written.append(target)
+    return written
+
+
+def init_compression(app):
+    """Wrap app.wsgi_app in CompressionMiddleware unless COMPRESSION_ENABLED is false."""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config.get('COMPRESSION_MIN_SIZE', 1024),
+        gzip_level=app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 5),
+        static_folder=app.static_folder,
+        static_url_path=app.static_url_path or '/static',
+    )
+
+
+if __name__ == '__main__':
+    import sys
+    for path in precompress_static(sys.argv[1] if len(sys.argv) > 1 else 'app/static'):
+        print(path)
@@ -2,23 +2,34 @@ import sqlite3
 import os
 from flask import current_app, g
 
+def apply_sqlite_pragmas(conn, pragmas):
+    """Apply the SQLITE_PRAGMAS connection profile to a DB-API sqlite3 connection."""
+    cursor = conn.cursor()
+    try:
+        for name, value in (pragmas or {}).items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def _connect():
+    conn = sqlite3.connect(
+        os.path.join(current_app.instance_path, 'sdgassessmentdev.db'),
+        detect_types=sqlite3.PARSE_DECLTYPES
+    )
+    conn.row_factory = sqlite3.Row
+    apply_sqlite_pragmas(conn, current_app.config.get('SQLITE_PRAGMAS'))
+    return conn
+
 def get_db():
     """Connect to the application's configured database."""
     if 'db' not in g:
-        g.db = sqlite3.connect(
-            os.path.join(current_app.instance_path, 'sdgassessmentdev.db'),
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
+        g.db = _connect()
 
     return g.db
 
 def get_fresh_db():
     """Get a fresh database connection (not stored in g)."""
-    db_path = os.path.join(current_app.instance_path, 'sdgassessmentdev.db')
-    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _connect()
 
 def close_db(e=None):
     """Close the database connection."""
@@ -30,3 +41,33 @@ def close_db(e=None):
 def init_app(app):
     """Register database functions with the Flask app."""
     app.teardown_appcontext(close_db)
+
+def register_sqlite_pragmas(app, engine):
+    """
+    Apply SQLITE_PRAGMAS on every new connection the SQLAlchemy engine opens,
+    and have SQLAlchemy rather than pysqlite begin transactions.
+
+    pysqlite only opens a transaction before DML, so a SAVEPOINT issued first
+    (session.begin_nested()) runs outside any transaction and its RELEASE
+    commits at once. Turning off pysqlite's own handling and emitting BEGIN
+    from the engine's `begin` event is SQLAlchemy's documented workaround.
+    In-memory databases are left alone: their sessions all share one
+    connection, which cannot hold a transaction per session.
+    """
+    from sqlalchemy import event
+
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    explicit_begin = engine.url.database not in (None, '', ':memory:')
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        if explicit_begin:
+            dbapi_connection.isolation_level = None
+
+    if explicit_begin:
+        @event.listens_for(engine, 'begin')
+        def _begin_sqlite_transaction(connection):
+            connection.exec_driver_sql('BEGIN')
@@ -0,0 +1,135 @@
+"""
+Helpers for ORM flush listeners that maintain derived tables.
+Resolve the before/after values of tracked columns while a flush is pending,
+and apply counter increments in the flushing transaction.
+"""
+
+from sqlalchemy import inspect, select, update, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm.attributes import get_history, PASSIVE_NO_INITIALIZE
+
+
+def pending_changes(session, *models):
+    """
+    Yield (obj, old, new) for every pending insert, delete or update of `models`.
+
+    `old` and `new` are callables taking a list of attribute names and returning
+    a dict of values; `old` is None for inserts and `new` is None for deletes.
+    Listeners therefore only pay for the columns they actually track.
+    """
+    for obj in session.new:
+        if isinstance(obj, models):
+            yield obj, None, _current(obj)
+    for obj in session.deleted:
+        if isinstance(obj, models):
+            yield obj, _loaded(obj), None
+    for obj in session.dirty:
+        if isinstance(obj, models) and obj not in session.deleted and session.is_modified(obj):
+            old, new = _modified(session, obj)
+            yield obj, old, new
+
+
+def _current(obj):
+    """
+    Values of a pending (not yet inserted) instance: those assigned so far,
+    falling back to the column's scalar default for unassigned attributes.
+    """
+    mapper = inspect(obj).mapper
+
+    def values(attrs):
+        result = {}
+        for attr in attrs:
+            if attr in obj.__dict__:
+                result[attr] = obj.__dict__[attr]
+            else:
+                default = mapper.get_property(attr).columns[0].default
+                result[attr] = default.arg if default is not None and default.is_scalar else None
+        return result
+
+    return values
+
+
+def _loaded(obj):
+    """Committed values of an instance about to be deleted."""
+    return lambda attrs: {attr: getattr(obj, attr) for attr in attrs}
+
+
+def _modified(session, obj):
+    """Old/new accessors for a modified persistent instance, resolved once per attribute set."""
+    resolved = {}
+
+    def resolve(attrs):
+        key = tuple(attrs)
+        if key not in resolved:
+            resolved[key] = _history_values(session, obj, attrs)
+        return resolved[key]
+
+    return (lambda attrs: resolve(attrs)[0]), (lambda attrs: resolve(attrs)[1])
+
+
+def _history_values(session, obj, attrs):
+    """
+    Return (old, new) dicts for attrs of a modified persistent instance.
+
+    Attributes that were expired when they were assigned carry no old value in
+    their history, so those are read back from the committed database row.
+    """
+    old, new, missing = {}, {}, []
+    for attr in attrs:
+        hist = get_history(obj, attr, passive=PASSIVE_NO_INITIALIZE)
+        if hist.unchanged:
+            old[attr] = new[attr] = hist.unchanged[0]
+            continue
+        if hist.added:
+            new[attr] = hist.added[0]
+        if hist.deleted:
+            old[attr] = hist.deleted[0]
+        else:
+            missing.append(attr)
+
+    if missing:
+        state = inspect(obj)
+        columns = [state.mapper.get_property(attr).columns[0] for attr in missing]
+        pk_filter = [col == value for col, value in zip(state.mapper.primary_key, state.identity)]
+        row = session.connection().execute(select(*columns).where(*pk_filter)).first()
+        for attr, value in zip(missing, row or [None] * len(missing)):
+            old[attr] = value
+            new.setdefault(attr, value)
+    return old, new
+
+
+def increment_row(conn, table, key, increments, now=None):
+    """
+    Add `increments` to the counter columns of the row matching `key`, inserting
+    the row (other counters at zero) if it does not exist yet.
+
+    On SQLite and PostgreSQL this is one INSERT ... ON CONFLICT DO UPDATE, so two
+    transactions creating the same row concurrently both succeed; `key` must be
+    covered by a unique constraint.
+
+    Args:
+        conn: Connection of the flushing session
+        table: Table holding the counters
+        key (dict): Column values identifying the row
+        increments (dict): Column name -> amount to add
+        now (datetime): Value for updated_at, when the table has one
+    """
+    extra = {'updated_at': now} if now is not None and 'updated_at' in table.c else {}
+    dialect_insert = {'sqlite': sqlite_insert, 'postgresql': pg_insert}.get(conn.dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values(**key, **increments, **extra)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c[col] for col in key],
+            set_={**{col: table.c[col] + stmt.excluded[col] for col in increments},
+                  **{col: stmt.excluded[col] for col in extra}},
+        ))
+        return
+
+    result = conn.execute(
+        update(table)
+        .where(*[table.c[col] == value for col, value in key.items()])
+        .values({**{col: table.c[col] + amount for col, amount in increments.items()}, **extra})
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(**key, **increments, **extra))
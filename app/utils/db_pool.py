@@ -0,0 +1,205 @@
+"""
+Connection pool profile, pool metrics and the database circuit breaker.
+
+Stale connections are caught by the pool's pre-ping when a connection is
+checked out, so requests that never touch the database no longer pay for a
+round trip. When the database is down, the circuit breaker opens after a few
+consecutive connection failures: requests then fail fast with 503 instead of
+each waiting on a connect timeout, and a single probe checks for recovery
+with exponential backoff.
+"""
+
+import math
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_count += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+
+def engine_options(config, database_uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    Each gunicorn worker process has its own pool, sized to the worker's
+    threads plus a small overflow for background threads (writer queue,
+    cube refresh), so the server holds at most workers × (threads + overflow)
+    connections.
+    """
+    options = {'pool_pre_ping': True}
+    if database_uri.startswith('sqlite') and (':memory:' in database_uri or database_uri.rstrip('/') == 'sqlite:'):
+        # In-memory SQLite uses a static single-connection pool
+        return options
+    options.update({
+        'poolclass': MeteredQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 4),
+        'max_overflow': config.get('DB_POOL_MAX_OVERFLOW', 2),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+    })
+    return options
+
+
+def pool_status(engine):
+    """Snapshot of the engine's pool: connections checked out, overflow and checkout wait times."""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    if isinstance(pool, MeteredQueuePool):
+        status.update({
+            'checkouts': pool.wait_count,
+            'wait_avg_ms': round(1000 * pool.wait_total / pool.wait_count, 2) if pool.wait_count else 0.0,
+            'wait_max_ms': round(1000 * pool.wait_max, 2),
+        })
+    return status
+
+
+class CircuitBreaker:
+    """
+    Closed: requests go through and connection failures are counted.
+    Open: requests are refused until the backoff delay has passed.
+    Half-open: one caller probes the database; success closes the breaker,
+    failure reopens it with the delay doubled (up to max_delay).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, probe, threshold=3, base_delay=1.0, max_delay=60.0, clock=time.monotonic):
+        self.probe = probe
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.delay = base_delay
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.retry_at = self.clock() + self.delay
+
+    def allow(self):
+        """Whether a request may use the database, probing for recovery when the backoff has passed."""
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            if self.state != self.OPEN or self.clock() < self.retry_at:
+                return self.state == self.CLOSED
+            self.state = self.HALF_OPEN
+        try:
+            self.probe()
+        except Exception:
+            with self._lock:
+                self.delay = min(self.delay * 2, self.max_delay)
+                self._open()
+            return False
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.delay = self.base_delay
+        return True
+
+    def status(self):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_in': round(max(self.retry_at - self.clock(), 0.0), 2) if self.state != self.CLOSED else 0.0,
+        }
+
+
+def _unavailable(breaker):
+    retry_after = max(math.ceil(breaker.status()['retry_in']), 1)
+    if request.path.startswith('/api/') or request.accept_mimetypes.best == 'application/json':
+        response = jsonify({'error': 'Database temporarily unavailable'})
+    else:
+        response = current_app.response_class('Service temporarily unavailable, please retry shortly.',
+                                               mimetype='text/plain')
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def register_db_breaker(app, engine):
+    """Attach a circuit breaker to the engine and guard requests with it."""
+
+    def probe():
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+
+    breaker = CircuitBreaker(
+        probe,
+        threshold=app.config.get('DB_BREAKER_THRESHOLD', 3),
+        base_delay=app.config.get('DB_BREAKER_BASE_DELAY', 1.0),
+        max_delay=app.config.get('DB_BREAKER_MAX_DELAY', 60.0),
+    )
+    app.extensions['db_breaker'] = breaker
+
+    @event.listens_for(engine, 'handle_error')
+    def _record_failure(context):
+        # Disconnects and failures to connect at all; not e.g. SQL or lock errors
+        if context.is_disconnect or context.connection is None:
+            breaker.record_failure()
+
+    @event.listens_for(engine, 'checkout')
+    def _record_success(dbapi_connection, connection_record, connection_proxy):
+        breaker.record_success()
+
+    @app.before_request
+    def guard_database():
+        # Static files and the liveness check never need the database; /health reports the breaker itself
+        if request.endpoint in ('static', 'main.ping', 'main.health_check') or breaker.allow():
+            return None
+        return _unavailable(breaker)
+
+    @app.errorhandler(OperationalError)
+    def database_unavailable(e):
+        from app import db
+        db.session.rollback()
+        # Only a lost or refused connection is an outage; missing tables, bad SQL or
+        # "database is locked" are bugs or contention and stay 500s
+        if not (e.connection_invalidated or db.engine.dialect.is_disconnect(e.orig, None, None)):
+            raise e
+        app.logger.error(f"Database unavailable: {str(e)}")
+        return _unavailable(breaker)
+
+    return breaker
@@ -0,0 +1,141 @@
+"""
+Read-replica routing for db.session.
+
+When REPLICA_DATABASE_URI is set, the app gets a second engine for it and
+RoutingSession sends reads there while the session is flagged for replica
+reads. Flushes, INSERT/UPDATE/DELETE statements and textual SQL that
+is not a SELECT always go to the primary, as does everything a session reads
+after it has flushed a write.
+
+A session is flagged for a GET/HEAD request to a view marked with
+@replica_read (every API GET counts as marked), and for the duration of a
+function marked with @replica_reads(). After a user's successful write
+request, that user's reads stay on the primary for REPLICA_STICKY_SECONDS,
+so they read their own writes despite replication lag. The sticky marker
+lives in the app cache, so it is shared between workers when Redis is used.
+
+Locally, point REPLICA_DATABASE_URI at a second SQLite file (or a second
+PostgreSQL database) to exercise the routing.
+"""
+
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.elements import TextClause
+
+REPLICA_EXTENSION = 'db_replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().lower().startswith(('select', 'with'))
+    return False
+
+
+def _request_user_id():
+    # Read the ids directly: resolving current_user here would recurse into the user loader
+    user_id = g.get('user_id') or flask_session.get('_user_id')
+    return str(user_id) if user_id is not None else None
+
+
+def _sticky_key(user_id):
+    return f'replica-sticky:{user_id}'
+
+
+def _sticky_to_primary():
+    """Whether the current request's user wrote recently and must read from the primary."""
+    if not has_request_context():
+        return False
+    if 'replica_sticky' not in g:
+        from app import cache
+        user_id = _request_user_id()
+        g.replica_sticky = bool(user_id and cache.get(_sticky_key(user_id)))
+    return g.replica_sticky
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends flagged reads to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('use_replica') and not self.info.get('pinned_primary') \
+                and not self._flushing and not _is_write(clause):
+            engine = current_app.extensions.get(REPLICA_EXTENSION)
+            if engine is not None and not _sticky_to_primary():
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _pin_to_primary(session, flush_context):
+    # Once a session has written, later reads (e.g. refreshing what it just
+    # committed) must not hit a replica that may not have the rows yet
+    session.info['pinned_primary'] = True
+
+
+def replica_read(view):
+    """Mark a view as read-only so its GET/HEAD requests may read from the replica."""
+    view.replica_read = True
+    return view
+
+
+@contextmanager
+def replica_reads():
+    """Route db.session reads to the replica (if configured) inside the block or decorated function."""
+    from app import db
+    info = db.session.info
+    previous = info.get('use_replica')
+    info['use_replica'] = True
+    try:
+        yield
+    finally:
+        if previous is None:
+            info.pop('use_replica', None)
+        else:
+            info['use_replica'] = previous
+
+
+def replica_engine():
+    """The replica engine, or None when no replica is configured."""
+    return current_app.extensions.get(REPLICA_EXTENSION)
+
+
+def configure_replica(app, engine_options):
+    """Create the engine for REPLICA_DATABASE_URI, pooled like the primary."""
+    uri = app.config.get('REPLICA_DATABASE_URI')
+    if not uri:
+        return None
+    engine = create_engine(uri, **engine_options(app.config, uri))
+    app.extensions[REPLICA_EXTENSION] = engine
+    return engine
+
+
+def register_replica_routing(app):
+    """Flag read-only requests for replica reads and record users' writes for stickiness."""
+    from app import db, cache
+
+    @app.before_request
+    def route_reads_to_replica():
+        if REPLICA_EXTENSION not in app.extensions:
+            return
+        view = app.view_functions.get(request.endpoint)
+        info = db.session.info
+        info.pop('pinned_primary', None)
+        g.pop('replica_sticky', None)
+        info['use_replica'] = request.method in SAFE_METHODS and \
+            (request.blueprint == 'api' or getattr(view, 'replica_read', False))
+
+    @app.after_request
+    def mark_recent_write(response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 \
+                and REPLICA_EXTENSION in app.extensions:
+            user_id = _request_user_id()
+            if user_id:
+                cache.set(_sticky_key(user_id), True, timeout=current_app.config.get('REPLICA_STICKY_SECONDS', 10))
+        return response
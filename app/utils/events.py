@@ -0,0 +1,337 @@
+"""
+Per-user server-sent events.
+
+The EventBroker keeps, in each process, the open /api/events streams of each
+user and a short backlog of recent events per user, so a browser that
+reconnects with Last-Event-ID receives what it missed. publish() delivers to
+the streams of this process; with EVENTS_BACKEND=redis the event also goes out
+on a Redis channel, and a listener thread in every other process delivers it to
+its own streams. Each process starts its listener on its first request.
+
+Every stream holds one gthread worker thread for its lifetime, so streams are
+capped per process (EVENTS_MAX_CONNECTIONS, by default half the threads) and
+per user, and each stream ends after EVENTS_STREAM_SECONDS; EventSource
+reconnects by itself. A comment line every EVENTS_HEARTBEAT_SECONDS keeps
+proxies from closing idle streams and lets a dead client free its thread.
+
+Event types:
+  scoring.completed - an assessment's scores were (re)calculated
+  draft.saved       - an assessment draft was saved (other tabs detect conflicts)
+  export.ready      - an export is ready for download
+"""
+
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session
+
+EVENT_TYPES = ('scoring.completed', 'draft.saved', 'export.ready')
+
+# session.info key holding events to publish once the transaction commits
+_PENDING_EVENTS_KEY = 'pending_events'
+
+
+class TooManyStreams(Exception):
+    """Raised when the process or user stream cap is reached."""
+
+
+class Subscription:
+    """One open event stream: a bounded queue of (id, event, data) messages."""
+
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def put(self, message):
+        # A stalled client loses its oldest messages rather than blocking publishers
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RedisFanout:
+    """Relays published events between processes over a Redis pub/sub channel."""
+
+    name = 'redis'
+
+    def __init__(self, url, channel='sdg_events'):
+        import redis
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._redis = redis.Redis.from_url(url)
+        self._deliver = None
+        self._logger = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self, deliver, logger):
+        """Hand messages from other processes to `deliver`, once ensure_started has run in this process."""
+        self._deliver = deliver
+        self._logger = logger
+
+    def ensure_started(self):
+        # Start lazily, and again after a fork, so preloaded gunicorn workers each get a listener
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._listen, name='event-fanout', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for item in pubsub.listen():
+                    message = json.loads(item['data'])
+                    if message.pop('origin', None) != self.origin:
+                        self._deliver(message['user_id'], (message['id'], message['event'], message['data']))
+            except Exception as e:
+                self._logger.warning(f"Event fan-out listener error, reconnecting: {str(e)}")
+                time.sleep(1)
+
+    def send(self, user_id, message):
+        event_id, name, data = message
+        self._redis.publish(self.channel, json.dumps({
+            'origin': self.origin, 'user_id': user_id, 'id': event_id, 'event': name, 'data': data,
+        }, default=str))
+
+
+class EventBroker:
+    """In-process pub/sub of per-user events, with optional cross-process fan-out."""
+
+    def __init__(self, max_connections=2, max_per_user=3, queue_size=100, backlog=50, backlog_users=10000,
+                 fanout=None):
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.backlog_size = backlog
+        self.backlog_users = backlog_users
+        self.fanout = fanout
+        self._subscriptions = defaultdict(set)
+        self._backlog = OrderedDict()  # user_id -> deque of recent messages, least recently used first
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.published = 0
+        self.rejected = 0
+        self.fanout_errors = 0
+
+    def _next_id(self):
+        # Milliseconds plus a per-process sequence: increasing across reconnects and restarts
+        return f'{int(time.time() * 1000)}-{next(self._ids)}'
+
+    def subscribe(self, user_id, last_event_id=None):
+        """
+        Open a stream for `user_id`, queueing backlog events after `last_event_id`.
+
+        Raises:
+            TooManyStreams: When the process or the user has no stream left
+        """
+        with self._lock:
+            open_streams = sum(len(subs) for subs in self._subscriptions.values())
+            if open_streams >= self.max_connections or len(self._subscriptions.get(user_id, ())) >= self.max_per_user:
+                self.rejected += 1
+                raise TooManyStreams()
+            subscription = Subscription(user_id, self.queue_size)
+            self._subscriptions[user_id].add(subscription)
+            if last_event_id:
+                for message in self._backlog.get(user_id, ()):
+                    if _event_key(message[0]) > _event_key(last_event_id):
+                        subscription.put(message)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def deliver(self, user_id, message):
+        """Queue a message for this process's streams of `user_id` and keep it in the backlog."""
+        with self._lock:
+            backlog = self._backlog.get(user_id)
+            if backlog is None:
+                backlog = self._backlog[user_id] = deque(maxlen=self.backlog_size)
+                if len(self._backlog) > self.backlog_users:
+                    self._backlog.popitem(last=False)
+            else:
+                self._backlog.move_to_end(user_id)
+            backlog.append(message)
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def publish(self, user_id, name, data=None):
+        """Send event `name` with JSON-able `data` to every stream of `user_id`."""
+        if name not in EVENT_TYPES:
+            raise ValueError(f'Unknown event type: {name}')
+        message = (self._next_id(), name, data or {})
+        self.published += 1
+        self.deliver(user_id, message)
+        if self.fanout is not None:
+            try:
+                self.fanout.send(user_id, message)
+            except Exception as e:
+                self.fanout_errors += 1
+                current_app.logger.warning(f"Event fan-out failed, delivered locally only: {str(e)}")
+        return message[0]
+
+    def status(self):
+        with self._lock:
+            streams = sum(len(subs) for subs in self._subscriptions.values())
+            users = len(self._subscriptions)
+        return {
+            'backend': self.fanout.name if self.fanout else 'memory',
+            'streams': streams,
+            'users': users,
+            'max_connections': self.max_connections,
+            'published': self.published,
+            'rejected': self.rejected,
+            'fanout_errors': self.fanout_errors,
+        }
+
+
+def _event_key(event_id):
+    """Sort key of an event id ('<ms>-<seq>'); malformed ids sort first."""
+    try:
+        millis, _, sequence = str(event_id).partition('-')
+        return int(millis), int(sequence or 0)
+    except ValueError:
+        return -1, -1
+
+
+def format_event(message):
+    """A (id, event, data) message as an SSE frame."""
+    event_id, name, data = message
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def event_stream(broker, subscription, heartbeat=15.0, max_seconds=300.0, retry_ms=3000, clock=time.monotonic):
+    """
+    Yield SSE frames for `subscription` until max_seconds pass or the client goes away.
+    Touches neither the request nor the database, so the worker holds no connection.
+    """
+    deadline = clock() + max_seconds
+    try:
+        yield f"retry: {retry_ms}\n: connected\n\n"
+        while True:
+            remaining = deadline - clock()
+            if remaining <= 0:
+                return
+            message = subscription.get(timeout=min(heartbeat, remaining))
+            yield format_event(message) if message is not None else ": ping\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def get_broker():
+    return current_app.extensions.get('events')
+
+
+def publish(user_id, name, data=None):
+    """Publish an event to a user's streams now (no-op when events are disabled)."""
+    broker = get_broker()
+    if broker is None or user_id is None:
+        return None
+    return broker.publish(user_id, name, data)
+
+
+def publish_after_commit(session, user_id, name, data=None):
+    """
+    Publish an event once `session` commits its current transaction.
+
+    Dropped when the transaction rolls back, or when the savepoint it was queued
+    in (or one enclosing it) rolls back.
+    """
+    if isinstance(session, scoped_session):
+        session = session()
+    # The enclosing savepoints, innermost first
+    savepoints = []
+    transaction = session.get_nested_transaction()
+    while transaction is not None and transaction.nested:
+        savepoints.append(transaction)
+        transaction = transaction.parent
+    session.info.setdefault(_PENDING_EVENTS_KEY, []).append((savepoints, user_id, name, data))
+
+
+def _publish_pending(session):
+    """after_commit listener: publish the events the committed transaction queued."""
+    if session.in_nested_transaction():
+        # A released savepoint; its events wait for the outermost commit
+        return
+    for _, user_id, name, data in session.info.pop(_PENDING_EVENTS_KEY, ()):
+        try:
+            publish(user_id, name, data)
+        except Exception as e:
+            current_app.logger.warning(f"Publishing {name} failed: {str(e)}")
+
+
+def _discard_pending(session, previous_transaction=None):
+    """after_soft_rollback listener: drop the events of the rolled back transaction or savepoint."""
+    if previous_transaction is None or previous_transaction.parent is None:
+        session.info.pop(_PENDING_EVENTS_KEY, None)
+    elif previous_transaction.nested and session.info.get(_PENDING_EVENTS_KEY):
+        session.info[_PENDING_EVENTS_KEY] = [
+            pending for pending in session.info[_PENDING_EVENTS_KEY]
+            if not any(savepoint is previous_transaction for savepoint in pending[0])
+        ]
+
+
+def init_events(app):
+    """Create the app's event broker from EVENTS_* settings (none when EVENTS_ENABLED is false)."""
+    from app import db
+    if not event.contains(db.session, 'after_commit', _publish_pending):
+        event.listen(db.session, 'after_commit', _publish_pending)
+        event.listen(db.session, 'after_soft_rollback', _discard_pending)
+
+    if not app.config.get('EVENTS_ENABLED', True):
+        return None
+    max_connections = app.config.get('EVENTS_MAX_CONNECTIONS')
+    if not max_connections:
+        # Leave at least half of the gthread threads for ordinary requests
+        max_connections = max(int(os.environ.get('GUNICORN_THREADS') or 4) // 2, 1)
+
+    fanout = None
+    if app.config.get('EVENTS_BACKEND', 'memory') == 'redis':
+        url = app.config.get('EVENTS_REDIS_URL') or os.environ.get('REDIS_URL')
+        if not url:
+            raise RuntimeError('EVENTS_BACKEND is redis but neither EVENTS_REDIS_URL nor REDIS_URL is set')
+        fanout = RedisFanout(url)
+
+    broker = EventBroker(max_connections=max_connections,
+                         max_per_user=app.config.get('EVENTS_MAX_PER_USER', 3),
+                         fanout=fanout)
+    if fanout is not None:
+        # Not started here: under preload_app the thread would live only in the gunicorn master
+        fanout.start(broker.deliver, app.logger)
+        app.before_request(fanout.ensure_started)
+    app.extensions['events'] = broker
+    return broker
@@ -0,0 +1,87 @@
+"""
+JSON provider for jsonify(), request.get_json() and the tojson filter.
+
+Uses orjson when it is installed and the stdlib json module otherwise
+(JSON_BACKEND = 'orjson' or 'stdlib' forces one). Both backends write
+datetimes, dates and times as ISO 8601, Decimals as strings and dataclasses as
+objects, so responses look the same whichever is in use. orjson serializes
+datetimes and dataclasses in C and writes the response body as bytes without
+an intermediate str; anything it cannot encode (integers beyond 64 bits, ...)
+falls back to the stdlib encoder.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(o):
+    """Encode types the JSON encoder does not know natively."""
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with ISO 8601 dates and an orjson fast path."""
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = str(app.config.get('JSON_BACKEND', 'auto')).lower()
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError('JSON_BACKEND is orjson but orjson is not installed: pip install orjson')
+        self.use_orjson = orjson is not None and backend != 'stdlib'
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        """Serialize to UTF-8 bytes, through orjson when enabled."""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+            except orjson.JSONEncodeError:
+                pass
+        return json.dumps(obj, default=self.default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii,
+                          indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        # Extra json.dumps options (cls=, ...) are only understood by the stdlib encoder
+        if self.use_orjson and set(kwargs) <= {'indent', 'separators'}:
+            return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,187 @@
+"""
+Query plan checks for the app's hot queries.
+
+HOT_QUERIES catalogs the lookups that run on every page or API call, built
+with the same ORM constructs the routes use. check_plans() runs EXPLAIN QUERY
+PLAN (SQLite) or EXPLAIN (PostgreSQL, with sequential scans discouraged so
+that the plan shows whether an index path exists) for each one. It flags full
+table scans and sorts that need a temporary B-tree. suggest_index() derives
+the index that would serve a flagged query: its equality filters first, then
+its ORDER BY columns.
+
+The test suite runs the checks against a freshly migrated database, so a
+migration that drops an index, or a hot query that stops matching one, fails
+the suite.
+"""
+
+import re
+
+from sqlalchemy import select, func
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList, UnaryExpression
+
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.response import QuestionResponse
+from app.models.sdg_relationship import SdgRelationship
+from app.models.analytics_rollup import AnalyticsRollup
+
+
+class HotQuery:
+    """A cataloged query, with tables it may scan in full (small lookup tables)."""
+
+    def __init__(self, name, statement, allow_scan=()):
+        self.name = name
+        self.statement = statement
+        self.allow_scan = set(allow_scan)
+
+
+HOT_QUERIES = [
+    HotQuery('user_by_email', select(User).where(User.email == 'user@example.com')),
+    HotQuery('assessment_by_share_token', select(Assessment).where(Assessment.share_token == 'token')),
+    HotQuery('assessment_access', select(Assessment, Project)
+             .outerjoin(Project, Project.id == Assessment.project_id).where(Assessment.id == 1)),
+    HotQuery('user_projects_by_updated', select(Project).where(Project.user_id == 1)
+             .order_by(Project.updated_at.desc())),
+    HotQuery('user_projects_by_created', select(Project).where(Project.user_id == 1)
+             .order_by(Project.created_at.desc()).limit(10)),
+    HotQuery('project_assessments', select(Assessment).where(Assessment.project_id == 1)
+             .order_by(Assessment.id.desc())),
+    HotQuery('recent_assessments', select(Assessment)
+             .order_by(Assessment.created_at.desc(), Assessment.id.desc()).limit(20)),
+    HotQuery('assessments_by_type', select(Assessment).where(Assessment.assessment_type == 'expert')
+             .order_by(Assessment.created_at.desc(), Assessment.id.desc()).limit(20)),
+    HotQuery('assessment_scores', select(SdgScore).where(SdgScore.assessment_id == 1)),
+    HotQuery('assessment_responses', select(QuestionResponse).where(QuestionResponse.assessment_id == 1)),
+    HotQuery('relationships_by_source', select(SdgRelationship).where(SdgRelationship.source_sdg_id == 1)
+             .order_by(SdgRelationship.strength.desc())),
+    HotQuery('rollup_series', select(AnalyticsRollup.bucket, func.sum(AnalyticsRollup.item_count))
+             .where(AnalyticsRollup.entity == 'assessment', AnalyticsRollup.dimension == 'status',
+                    AnalyticsRollup.grain == 'month')
+             .group_by(AnalyticsRollup.bucket).order_by(AnalyticsRollup.bucket)),
+]
+
+
+def _compile(statement, dialect):
+    return str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def explain(connection, statement):
+    """
+    Plan lines for a statement on the connection's database.
+
+    Returns:
+        list: SQLite EXPLAIN QUERY PLAN details, or PostgreSQL plan node descriptions
+    """
+    sql = _compile(statement, connection.dialect)
+    if connection.dialect.name == 'sqlite':
+        return [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+    if connection.dialect.name == 'postgresql':
+        with connection.begin_nested() if connection.in_transaction() else connection.begin():
+            connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+            plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + sql).scalar()
+        lines = []
+
+        def walk(node):
+            relation = f" on {node['Relation Name']}" if 'Relation Name' in node else ''
+            lines.append(f"{node['Node Type']}{relation}")
+            for child in node.get('Plans', []):
+                walk(child)
+
+        walk(plan[0]['Plan'])
+        return lines
+    raise ValueError(f'Query plans are not supported for {connection.dialect.name}')
+
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+_PG_SEQ_SCAN = re.compile(r'^Seq Scan on (\w+)$')
+
+
+def plan_issues(plan, allow_scan=(), filtered=()):
+    """
+    Full scans and temporary sorts in plan lines, e.g. ['full scan: projects', 'temp b-tree sort'].
+
+    A SQLite scan along an index still reads the whole index, so it only
+    counts as served when the query does not filter that table (e.g. a
+    LIMITed scan in index order).
+    """
+    issues = []
+    for line in plan:
+        scan = _SQLITE_SCAN.match(line) or _PG_SEQ_SCAN.match(line)
+        if scan:
+            table = scan.group(1)
+            rest = scan.group(2) if scan.re is _SQLITE_SCAN else ''
+            if table in allow_scan:
+                continue
+            if 'INDEX' not in rest and 'PRIMARY KEY' not in rest:
+                issues.append(f'full scan: {table}')
+            elif table in filtered:
+                issues.append(f'full index scan: {table}')
+        elif line.startswith('USE TEMP B-TREE') or line in ('Sort', 'Incremental Sort'):
+            issues.append('temp b-tree sort')
+    return issues
+
+
+def check_plans(connection, queries=None):
+    """
+    Explain every hot query.
+
+    Returns:
+        dict: Query name -> {'plan': [...], 'issues': [...]}
+    """
+    report = {}
+    for query in queries or HOT_QUERIES:
+        plan = explain(connection, query.statement)
+        filtered = {column.table.name for column in _equality_columns(query.statement.whereclause)}
+        report[query.name] = {'plan': plan, 'issues': plan_issues(plan, query.allow_scan, filtered)}
+    return report
+
+
+def _equality_columns(clause):
+    if clause is None:
+        return []
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        return [column for part in clause.clauses for column in _equality_columns(part)]
+    if isinstance(clause, BinaryExpression) and clause.operator is operators.eq \
+            and hasattr(clause.left, 'table') and not hasattr(clause.right, 'table'):
+        return [clause.left]
+    return []
+
+
+def suggest_index(statement):
+    """
+    Index that serves a single-table query: equality-filtered columns, then ORDER BY columns.
+
+    Returns:
+        tuple: (table name, [column names]), or None when nothing indexable was found
+    """
+    columns = _equality_columns(statement.whereclause)
+    for clause in statement._order_by_clauses:
+        column = clause.element if isinstance(clause, UnaryExpression) else clause
+        if hasattr(column, 'table'):
+            columns.append(column)
+    if not columns:
+        return None
+    table = columns[0].table
+    names = []
+    for column in columns:
+        if column.table is table and column.name not in names:
+            names.append(column.name)
+    return table.name, names
+
+
+def advise(report, queries=None):
+    """CREATE INDEX suggestions for the queries with plan issues."""
+    suggestions = []
+    for query in queries or HOT_QUERIES:
+        if not report.get(query.name, {}).get('issues'):
+            continue
+        suggestion = suggest_index(query.statement)
+        if suggestion is None:
+            continue
+        table, columns = suggestion
+        sql = f"CREATE INDEX ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})"
+        if sql not in suggestions:
+            suggestions.append(sql)
+    return suggestions
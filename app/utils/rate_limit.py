@@ -0,0 +1,253 @@
+"""
+Token-bucket rate limits for the token-authenticated API.
+
+Each user gets one bucket per route class: 'read', 'write' (by HTTP method)
+and 'expensive' (routes marked with @rate_class('expensive')). A bucket holds
+up to `burst` tokens and refills at `per_second`; a request takes one token, and
+a request finding the bucket empty gets 429 with Retry-After.
+
+Buckets live in one of three backends (RATE_LIMIT_BACKEND):
+  memory - a dict in this process; each gunicorn worker limits on its own
+  shm    - a table of slots in a memory-mapped file shared by the workers of
+           one host, guarded by a POSIX record lock
+  redis  - a Lua script updating a hash per bucket, shared by every host
+Backend errors let the request through rather than failing the API.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, jsonify, make_response, request
+
+ROUTE_CLASSES = ('read', 'write', 'expensive')
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def rate_class(name):
+    """Put a route in a rate-limit class other than the one its HTTP method implies."""
+    if name not in ROUTE_CLASSES:
+        raise ValueError(f'Unknown rate-limit class: {name}')
+
+    def decorate(f):
+        f.rate_class = name
+        return f
+    return decorate
+
+
+def _refill(tokens, updated, burst, per_second, now):
+    return min(burst, tokens + max(now - updated, 0.0) * per_second)
+
+
+class MemoryBackend:
+    """Buckets in a dict, for one process."""
+
+    name = 'memory'
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, burst, per_second, now):
+        """Take a token: returns (allowed, tokens left)."""
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = _refill(tokens, updated, burst, per_second, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return allowed, tokens
+
+    def _prune(self, now, idle=3600):
+        # Buckets untouched for an hour have refilled; forgetting them changes nothing
+        for key in [key for key, (_, updated) in self._buckets.items() if now - updated > idle]:
+            del self._buckets[key]
+
+
+class SharedMemoryBackend:
+    """
+    Buckets in a memory-mapped file shared by the processes of one host.
+
+    The file is a fixed table of (key hash, tokens, updated) slots addressed by
+    open addressing; a slot idle for `idle` seconds is reused. lockf() locks are
+    per process, so a thread lock serializes the threads of each worker.
+    """
+
+    name = 'shm'
+    SLOT = struct.Struct('=Qdd')
+    PROBES = 8
+
+    def __init__(self, path, slots=8192, idle=3600):
+        import fcntl
+        self._fcntl = fcntl
+        self.slots = slots
+        self.idle = idle
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def _slot(self, key_hash, now):
+        """Offset of the key's slot (claiming a free or idle one), and whether it is new."""
+        start = key_hash % self.slots
+        oldest = None
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self.slots) * self.SLOT.size
+            slot_hash, _, updated = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, False
+            if slot_hash == 0 or now - updated > self.idle:
+                return offset, True
+            if oldest is None or updated < oldest[1]:
+                oldest = (offset, updated)
+        return oldest[0], True
+
+    def take(self, key, burst, per_second, now):
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') or 1
+        with self._lock:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX)
+            try:
+                offset, new = self._slot(key_hash, now)
+                if new:
+                    tokens, updated = burst, now
+                else:
+                    _, tokens, updated = self.SLOT.unpack_from(self._map, offset)
+                tokens = _refill(tokens, updated, burst, per_second, now)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self.SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN)
+        return allowed, tokens
+
+
+_REDIS_TAKE = """
+local burst = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated, 0) * per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / per_second) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Buckets in Redis, updated atomically by a Lua script."""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='sdg_rl:'):
+        import redis
+        self.prefix = prefix
+        self._take = redis.Redis.from_url(url).register_script(_REDIS_TAKE)
+
+    def take(self, key, burst, per_second, now):
+        allowed, tokens = self._take(keys=[self.prefix + key], args=[burst, per_second, now])
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:
+    """Per-user, per-route-class token buckets on a backend, with allow/limit counters."""
+
+    def __init__(self, backend, limits, clock=time.time):
+        self.backend = backend
+        self.limits = limits
+        self.clock = clock
+        self.allowed = Counter()
+        self.limited = Counter()
+        self.errors = 0
+
+    def hit(self, user_id, route_class):
+        """
+        Take a token from the user's bucket for `route_class`.
+
+        Returns:
+            tuple: (allowed, headers to add to the response)
+        """
+        burst, per_second = self.limits[route_class]
+        try:
+            allowed, tokens = self.backend.take(f'{route_class}:{user_id}', burst, per_second, self.clock())
+        except Exception as e:
+            self.errors += 1
+            current_app.logger.warning(f"Rate limit backend error, request allowed: {str(e)}")
+            return True, {}
+
+        headers = {'X-RateLimit-Limit': str(burst), 'X-RateLimit-Remaining': str(int(tokens))}
+        if allowed:
+            self.allowed[route_class] += 1
+        else:
+            self.limited[route_class] += 1
+            headers['Retry-After'] = str(max(math.ceil((1 - tokens) / per_second), 1))
+        return allowed, headers
+
+    def status(self):
+        """Counters for this process since start."""
+        return {
+            'backend': self.backend.name,
+            'allowed': {name: self.allowed[name] for name in ROUTE_CLASSES},
+            'limited': {name: self.limited[name] for name in ROUTE_CLASSES},
+            'backend_errors': self.errors,
+        }
+
+
+def call_rate_limited(f, user_id, *args, **kwargs):
+    """Call view `f` for `user_id` if their bucket for its route class has a token, else return 429."""
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        return f(*args, **kwargs)
+    route_class = getattr(f, 'rate_class', None) or ('read' if request.method in READ_METHODS else 'write')
+    allowed, headers = limiter.hit(user_id, route_class)
+    if not allowed:
+        response = jsonify({'error': 'Rate limit exceeded', 'retry_after': int(headers['Retry-After'])})
+        response.status_code = 429
+    else:
+        response = make_response(f(*args, **kwargs))
+    response.headers.update(headers)
+    return response
+
+
+def init_rate_limiter(app):
+    """Create the app's rate limiter from RATE_LIMIT_* settings (none when RATE_LIMIT_ENABLED is false)."""
+    if not app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+    backend_name = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend_name == 'redis':
+        url = app.config.get('RATE_LIMIT_REDIS_URL') or os.environ.get('REDIS_URL')
+        if not url:
+            raise RuntimeError('RATE_LIMIT_BACKEND is redis but neither RATE_LIMIT_REDIS_URL nor REDIS_URL is set')
+        backend = RedisBackend(url)
+    elif backend_name == 'shm':
+        path = app.config.get('RATE_LIMIT_SHM_PATH') or os.path.join(app.instance_path, 'rate_limits.bin')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SharedMemoryBackend(path, slots=app.config.get('RATE_LIMIT_SHM_SLOTS', 8192))
+    elif backend_name == 'memory':
+        backend = MemoryBackend()
+    else:
+        raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend_name}')
+
+    limiter = RateLimiter(backend, app.config.get('RATE_LIMITS', {
+        'read': (120, 2.0), 'write': (60, 1.0), 'expensive': (10, 0.2),
+    }))
+    app.extensions['rate_limiter'] = limiter
+    return limiter
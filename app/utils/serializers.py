@@ -0,0 +1,59 @@
+"""
+Precompiled serializers turning model instances into plain dicts.
+
+Building `{c.name: getattr(obj, c.name) for c in obj.__table__.columns}` per row
+walks the table's column collection and formats every key again for each
+object. model_serializer() does that work once per (model, columns): it
+generates a function whose body is a dict literal of attribute reads, e.g.
+`lambda obj: {'id': obj.id, 'name': obj.name}`, and caches it.
+"""
+
+import keyword
+from functools import lru_cache
+
+
+def _source(columns):
+    items = ', '.join(f'{column!r}: obj.{column}' for column in columns)
+    return f'lambda obj: {{{items}}}'
+
+
+@lru_cache(maxsize=None)
+def _compile(columns):
+    for column in columns:
+        if not column.isidentifier() or keyword.iskeyword(column):
+            raise ValueError(f'Not an attribute name: {column!r}')
+    return eval(compile(_source(columns), '<serializer>', 'eval'), {})
+
+
+def model_serializer(model, columns=None):
+    """
+    A function serializing `model` instances to dicts of `columns`.
+
+    Args:
+        model: Mapped class
+        columns (iterable): Attribute names, in output order; default every table column
+
+    Returns:
+        callable: obj -> dict
+    """
+    if columns is None:
+        return _table_serializer(model)
+    return _compile(tuple(columns))
+
+
+@lru_cache(maxsize=None)
+def _table_serializer(model):
+    return _compile(tuple(column.key for column in model.__table__.columns))
+
+
+def serialize(obj, columns=None):
+    """Serialize one instance (see model_serializer)."""
+    return model_serializer(type(obj), columns)(obj)
+
+
+def serialize_all(objs, columns=None):
+    """Serialize a list of instances of one model with a single compiled serializer."""
+    if not objs:
+        return []
+    serializer = model_serializer(type(objs[0]), columns)
+    return [serializer(obj) for obj in objs]
@@ -0,0 +1,149 @@
+"""
+Template compilation caching and render timing.
+
+Jinja compiles a template to Python on its first use in a process, which for
+the large questionnaire templates costs more than rendering them. Two things
+keep that off the first request a worker serves:
+
+- precompile_templates() loads every template at the end of create_app. With
+  gunicorn's preload_app the master does this once and every worker, including
+  the ones max_requests recycles, forks with the compiled templates in memory.
+- A FileSystemBytecodeCache in TEMPLATE_BYTECODE_CACHE_DIR (by default under
+  /dev/shm, like gunicorn's worker_tmp_dir) keeps the compiled code across
+  restarts and for processes that start without preload; `flask
+  precompile-templates` fills it and fails on templates that do not compile.
+  The cache is used only from a directory owned by the process's user and not
+  writable by anyone else.
+
+Every render_template call is timed: per-template counts and times are shown
+under 'templates' in /health/details, renders slower than
+TEMPLATE_SLOW_RENDER_MS are logged, and the request's template time goes out in
+a Server-Timing header.
+"""
+
+import os
+import stat
+import threading
+import time
+
+from flask import before_render_template, g, template_rendered
+from jinja2 import FileSystemBytecodeCache
+
+TEMPLATE_EXTENSIONS = ('html', 'txt', 'xml')
+SLOWEST_SHOWN = 5
+
+
+class TemplateTimings:
+    """Render counts and times per template for this process."""
+
+    def __init__(self, slow_ms=250):
+        self.slow_ms = slow_ms
+        self.precompiled = 0
+        self.precompile_seconds = 0.0
+        self.bytecode_cache = None
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed_ms):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = {'count': 1, 'total_ms': elapsed_ms, 'max_ms': elapsed_ms, 'first_ms': elapsed_ms}
+            else:
+                stats['count'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def status(self):
+        with self._lock:
+            stats = sorted(self._stats.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        return {
+            'precompiled': self.precompiled,
+            'precompile_seconds': round(self.precompile_seconds, 3),
+            'bytecode_cache': self.bytecode_cache,
+            'slowest': [{
+                'template': name,
+                'count': s['count'],
+                'avg_ms': round(s['total_ms'] / s['count'], 2),
+                'max_ms': round(s['max_ms'], 2),
+                'first_ms': round(s['first_ms'], 2),
+            } for name, s in stats[:SLOWEST_SHOWN]],
+        }
+
+
+def precompile_templates(app):
+    """
+    Load (and so compile) every template of the app into its template cache.
+
+    Returns:
+        tuple: (number of templates compiled, list of (name, error) for those that failed)
+    """
+    compiled, errors = 0, []
+    env = app.jinja_env
+    for name in env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            errors.append((name, str(e)))
+    return compiled, errors
+
+
+def _start_timer(sender, template, context, **extra):
+    g.setdefault('_template_timers', []).append(time.perf_counter())
+
+
+def _stop_timer(sender, template, context, **extra):
+    timers = g.get('_template_timers')
+    if not timers:
+        return
+    elapsed_ms = (time.perf_counter() - timers.pop()) * 1000
+    g._template_ms = g.get('_template_ms', 0.0) + elapsed_ms
+    timings = sender.extensions['templates']
+    timings.record(template.name, elapsed_ms)
+    if elapsed_ms >= timings.slow_ms:
+        sender.logger.warning(f"Slow template render: {template.name} took {elapsed_ms:.1f} ms")
+
+
+def _server_timing(response):
+    """after_request hook: report the request's template time to the browser's dev tools."""
+    elapsed_ms = g.get('_template_ms')
+    if elapsed_ms is not None:
+        response.headers.add('Server-Timing', f'template;dur={elapsed_ms:.1f}')
+    return response
+
+
+def init_template_cache(app):
+    """Install the bytecode cache and the render timing hooks (call before templates are first used)."""
+    timings = TemplateTimings(slow_ms=app.config.get('TEMPLATE_SLOW_RENDER_MS', 250))
+    directory = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if directory:
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # /dev/shm is world-writable: never load code from a directory someone else could fill
+            st = os.lstat(directory)
+            if (not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid()
+                    or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+                raise PermissionError('not a directory owned by this user and writable only by it')
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory, pattern='sdg-%s.cache')
+            timings.bytecode_cache = directory
+        except OSError as e:
+            app.logger.warning(f"Template bytecode cache disabled, {directory} is not usable: {str(e)}")
+    app.extensions['templates'] = timings
+    before_render_template.connect(_start_timer, app)
+    template_rendered.connect(_stop_timer, app)
+    app.after_request(_server_timing)
+
+
+def warm_templates(app):
+    """Precompile the app's templates at startup unless TEMPLATE_PRECOMPILE is false or the app reloads them."""
+    if not app.config.get('TEMPLATE_PRECOMPILE', True) or app.jinja_env.auto_reload:
+        return
+    started = time.perf_counter()
+    compiled, errors = precompile_templates(app)
+    timings = app.extensions['templates']
+    timings.precompiled = compiled
+    timings.precompile_seconds = time.perf_counter() - started
+    for name, error in errors:
+        app.logger.warning(f"Template {name} failed to compile: {error}")
+    app.logger.info(f"Precompiled {compiled} templates in {timings.precompile_seconds:.2f}s")
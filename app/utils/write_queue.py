@@ -0,0 +1,169 @@
+"""
+Serialized writer queue for SQLite deployments.
+
+SQLite allows one writer at a time, so concurrent gthread workers that each
+open a write transaction end up waiting on (or failing with) `database is
+locked`. Routing small, frequent writes such as autosaves and response upserts
+through one writer thread per process removes that contention, and draining
+the queue in batches turns many tiny commits into one group commit.
+
+Each submitted write is a callable taking the writer's session. It runs inside
+its own SAVEPOINT, so one failing write is rolled back and reported to its
+caller without failing the rest of the batch. The savepoints nest inside the
+batch's transaction only because register_sqlite_pragmas makes SQLAlchemy
+emit BEGIN itself; left to pysqlite, every RELEASE would commit on its own.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+
+from app import db
+
+
+class WriteQueue:
+    """One writer thread per process that applies queued writes in group commits."""
+
+    def __init__(self, app, max_batch=64, max_delay=0.0):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Start lazily, and again after a fork, so preloaded gunicorn workers each get a writer
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue fn(session, *args, **kwargs) for the writer thread.
+
+        Returns:
+            Future: Resolves to fn's return value once its batch has committed
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def _next_batch(self):
+        # Take whatever queued up while the previous batch was committing, then
+        # optionally linger up to max_delay for more before committing
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                with self.app.app_context():
+                    self._apply(batch)
+            except Exception as e:  # Keep the writer alive whatever happens to one batch
+                for future, *_ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _apply(self, batch):
+        session = db.session
+        results = []
+        for future, fn, args, kwargs in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            savepoint = session.begin_nested()
+            try:
+                result = fn(session, *args, **kwargs)
+                savepoint.commit()
+                results.append((future, result))
+            except Exception as e:
+                savepoint.rollback()
+                future.set_exception(e)
+
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.app.logger.error(f"Write queue group commit failed ({len(results)} writes): {str(e)}")
+            for future, _ in results:
+                future.set_exception(e)
+            return
+
+        for future, result in results:
+            future.set_result(result)
+
+
+def init_write_queue(app):
+    """
+    Create the app's writer queue when WRITE_QUEUE_ENABLED is true, or is
+    'auto' and the database is SQLite. Without a queue, run_write() writes inline.
+    """
+    enabled = app.config.get('WRITE_QUEUE_ENABLED', 'auto')
+    if enabled == 'auto':
+        enabled = app.config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite') \
+            and not app.config.get('TESTING')
+    if enabled:
+        app.extensions['write_queue'] = WriteQueue(
+            app,
+            max_batch=app.config.get('WRITE_QUEUE_MAX_BATCH', 64),
+            max_delay=app.config.get('WRITE_QUEUE_MAX_DELAY_MS', 0) / 1000.0,
+        )
+
+
+def run_write(fn, *args, wait=True, timeout=30, **kwargs):
+    """
+    Apply fn(session, *args, **kwargs) and commit, via the writer queue when enabled.
+
+    Args:
+        wait (bool): Block until the write has committed (and re-raise its error);
+            with wait=False a Future is returned instead
+        timeout (float): Seconds to wait for the commit
+
+    Returns:
+        The value fn returned, or a Future when wait is False
+    """
+    write_queue = current_app.extensions.get('write_queue')
+    if write_queue is None:
+        try:
+            result = fn(db.session, *args, **kwargs)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if wait:
+            return result
+        future = Future()
+        future.set_result(result)
+        return future
+
+    # End this thread's transaction first, as the inline path would: an open read
+    # transaction pins an old snapshot (and without WAL blocks the writer's commit)
+    db.session.commit()
+    future = write_queue.submit(fn, *args, **kwargs)
+    return future.result(timeout) if wait else future
@@ -7,6 +7,106 @@ class Config:
         'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'instance', 'sdgassessmentdev.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Update analytics rollups on every write; set to false and schedule
+    # `flask refresh-rollups` instead to take the work off the request path
+    ANALYTICS_ROLLUPS_ON_WRITE = os.environ.get('ANALYTICS_ROLLUPS_ON_WRITE', 'true').lower() in ['true', 'on', '1']
+    # Seconds between incremental refreshes of each worker's in-memory SDG score cube
+    SCORE_CUBE_REFRESH_SECONDS = int(os.environ.get('SCORE_CUBE_REFRESH_SECONDS') or 30)
+    # Seed each worker's cube from the latest `flask export-snapshot` partitions (when
+    # pyarrow is installed and a snapshot exists) and catch up from the database
+    SCORE_CUBE_FROM_SNAPSHOT = os.environ.get('SCORE_CUBE_FROM_SNAPSHOT', 'true').lower() in ['true', 'on', '1']
+    # Connection profile applied to every SQLite connection (SQLAlchemy and get_db):
+    # WAL lets readers run alongside the single writer, NORMAL sync is durable in WAL
+    # mode except on power loss, and busy_timeout waits for the write lock instead of
+    # failing immediately with `database is locked`
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000),
+        'mmap_size': 268435456,   # 256 MB
+        'cache_size': -65536,     # 64 MB (negative values are KiB)
+        'temp_store': 'MEMORY',
+    }
+
+    # Serialize small writes (autosaves, response upserts) through one writer thread per
+    # process with group commits; 'auto' enables it for SQLite databases
+    WRITE_QUEUE_ENABLED = os.environ.get('WRITE_QUEUE_ENABLED', 'auto').lower()
+    WRITE_QUEUE_ENABLED = WRITE_QUEUE_ENABLED if WRITE_QUEUE_ENABLED == 'auto' else WRITE_QUEUE_ENABLED in ['true', 'on', '1']
+    WRITE_QUEUE_MAX_BATCH = 64
+    WRITE_QUEUE_MAX_DELAY_MS = 0  # Extra wait for a batch to fill; writes queued during a commit batch anyway
+
+    # Connection pool per worker process: one connection per gunicorn thread plus a small
+    # overflow for background threads (gunicorn_config.py exports GUNICORN_THREADS)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or os.environ.get('GUNICORN_THREADS') or 4)
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW') or 2)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_RECYCLE = 1800
+    # Optional read replica: read-only views, API GETs and @replica_reads service functions
+    # read from it; a user's reads stay on the primary for STICKY_SECONDS after they write
+    REPLICA_DATABASE_URI = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS') or 10)
+    # Circuit breaker: open after this many consecutive connection failures, then probe
+    # for recovery after BASE_DELAY seconds, doubling up to MAX_DELAY
+    DB_BREAKER_THRESHOLD = 3
+    DB_BREAKER_BASE_DELAY = 1.0
+    DB_BREAKER_MAX_DELAY = 60.0
+
+    # Projects with more assessments than this are purged in the background, in
+    # batches of PROJECT_PURGE_BATCH_SIZE, instead of inside the delete request
+    PROJECT_PURGE_THRESHOLD = int(os.environ.get('PROJECT_PURGE_THRESHOLD') or 500)
+    PROJECT_PURGE_BATCH_SIZE = 200
+
+    # JSON encoder for responses: 'auto' uses orjson when installed, else 'orjson' or 'stdlib'
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Compress text responses above COMPRESSION_MIN_SIZE bytes (brotli when installed, else gzip);
+    # set COMPRESSION_ENABLED=false where a proxy such as nginx already compresses
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+
+    # Link static JS and CSS to their fingerprinted builds (flask build-assets) when a manifest exists;
+    # without one, or with ASSETS_MANIFEST_ENABLED=false, templates link the source files
+    ASSETS_MANIFEST_ENABLED = os.environ.get('ASSETS_MANIFEST_ENABLED', 'true').lower() in ['true', 'on', '1']
+
+    # Jinja bytecode cache shared by the workers, in shared memory like gunicorn's worker_tmp_dir (empty
+    # disables it); templates are compiled at startup so preloaded workers fork with them compiled, and
+    # renders slower than TEMPLATE_SLOW_RENDER_MS are logged
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get(
+        'TEMPLATE_BYTECODE_CACHE_DIR', '/dev/shm/sdg-jinja' if os.path.isdir('/dev/shm') else '')
+    TEMPLATE_PRECOMPILE = os.environ.get('TEMPLATE_PRECOMPILE', 'true').lower() in ['true', 'on', '1']
+    TEMPLATE_SLOW_RENDER_MS = int(os.environ.get('TEMPLATE_SLOW_RENDER_MS') or 250)
+
+    # Token-bucket limits per API user: route class -> (burst, tokens refilled per second).
+    # Buckets are per process ('memory'), per host ('shm') or shared through Redis ('redis')
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL')  # Defaults to REDIS_URL
+    RATE_LIMIT_SHM_PATH = os.environ.get('RATE_LIMIT_SHM_PATH')  # Defaults to instance/rate_limits.bin
+    RATE_LIMITS = {
+        'read': (120, 2.0),
+        'write': (60, 1.0),
+        'expensive': (10, 0.2),  # Summaries, benchmarks, dashboard metrics, batch writes
+    }
+
+    # Server-sent events (/api/events). Each open stream holds a gthread thread, so streams are
+    # capped per process (default: half of GUNICORN_THREADS) and per user, and end after
+    # EVENTS_STREAM_SECONDS (browsers reconnect). 'redis' fans events out across processes
+    EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'memory')
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL')  # Defaults to REDIS_URL
+    EVENTS_MAX_CONNECTIONS = int(os.environ.get('EVENTS_MAX_CONNECTIONS') or 0) or None
+    EVENTS_MAX_PER_USER = 3
+    EVENTS_HEARTBEAT_SECONDS = 15
+    EVENTS_STREAM_SECONDS = 300
+
+    # Largest array accepted by the /api/*/batch endpoints (larger bodies get 413)
+    API_BATCH_MAX_ITEMS = int(os.environ.get('API_BATCH_MAX_ITEMS') or 2000)
+
+    # Where `flask export-snapshot` writes Arrow/Parquet partitions (default: instance/snapshots)
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR')
+
     # --- Flask-Mail Configuration ---
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.googlemail.com'  # e.g., smtp.googlemail.com for Gmail
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -28,6 +128,11 @@ class TestingConfig(Config):
     LOGIN_DISABLED = False
     SERVER_NAME = 'localhost.test'
     MAIL_SUPPRESS_SEND = True  # Disable actual email sending during tests
+    WRITE_QUEUE_ENABLED = False  # Writes run inline in the test session
+    REPLICA_DATABASE_URI = None
+    ASSETS_MANIFEST_ENABLED = False  # Templates link the source files, whatever is built locally
+    TEMPLATE_BYTECODE_CACHE_DIR = None
+    TEMPLATE_PRECOMPILE = False
 
 class ProductionConfig(Config):
     DEBUG = False
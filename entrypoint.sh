@@ -23,6 +23,12 @@ timeout 60 flask db upgrade || {
 
 echo "Migrations complete!"
 
+# Publish the fingerprinted static build to the volume nginx serves /static/dist/ from;
+# earlier builds are kept so pages rendered before this deploy still find their assets
+if [ -d /static-dist ] && [ -d app/static/dist ]; then
+    cp -R app/static/dist/. /static-dist/
+fi
+
 # Start server with appropriate configuration based on environment
 echo "Starting Gunicorn server..."
 if [ "$FLASK_ENV" = "production" ]; then
@@ -4,6 +4,7 @@ Optimized for VPS-1 (2 vCPU, 4GB RAM)
 """
 
 import multiprocessing
+import os
 
 # Worker processes
 # Production: (CPU cores × 2) + 1, capped at 8
@@ -12,7 +13,11 @@ workers = min(cpu_count * 2 + 1, 8)
 
 # Use threaded workers for better I/O performance
 worker_class = "gthread"
-threads = 4  # 4 threads per worker (total concurrent: workers × threads)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)  # 4 threads per worker (total concurrent: workers × threads)
+
+# The app sizes each worker's DB connection pool from these (preload imports it after this file)
+os.environ.setdefault('GUNICORN_THREADS', str(threads))
+os.environ.setdefault('GUNICORN_WORKERS', str(workers))
 worker_connections = 1000
 timeout = 60  # Stricter timeout for production (60s vs 120s)
 graceful_timeout = 30
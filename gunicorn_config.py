@@ -1,6 +1,7 @@
 """Gunicorn configuration file for SDG Assessment application."""
 
 import multiprocessing
+import os
 
 # Server socket
 bind = "0.0.0.0:5000"
@@ -10,7 +11,11 @@ bind = "0.0.0.0:5000"
 # Use fewer workers for development
 workers = multiprocessing.cpu_count() * 2 + 1 if multiprocessing.cpu_count() <= 4 else 4
 worker_class = "gthread"  # Better for I/O-bound operations than sync
-threads = 4  # Number of threads per worker (total concurrent requests: workers × threads)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)  # Number of threads per worker (total concurrent requests: workers × threads)
+
+# The app sizes each worker's DB connection pool from these (preload imports it after this file)
+os.environ.setdefault('GUNICORN_THREADS', str(threads))
+os.environ.setdefault('GUNICORN_WORKERS', str(workers))
 worker_connections = 1000
 timeout = 120  # Increased from default 30 seconds
 graceful_timeout = 30
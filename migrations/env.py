@@ -51,6 +51,18 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The SQLite FTS5 table and its shadow tables are managed by raw DDL,
+    # and so is PostgreSQL's generated projects.search_vector column
+    if type_ == 'table' and name.startswith('projects_fts'):
+        return False
+    if type_ == 'column' and name == 'search_vector' and reflected and compare_to is None:
+        return False
+    if type_ == 'index' and name == 'ix_projects_search_vector':
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,6 +105,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,86 @@
+"""add dashboard_stats aggregate table
+
+Revision ID: 3ca85eea26f8
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3ca85eea26f8'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'dashboard_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sdg_id', sa.Integer(), nullable=False),
+        sa.Column('user_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('project_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('assessment_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('score_sum_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sdg_id'),
+    )
+
+    # Seed the table from existing data so the incremental updates start from the truth
+    stats = sa.table(
+        'dashboard_stats',
+        sa.column('sdg_id', sa.Integer), sa.column('user_count', sa.Integer),
+        sa.column('project_count', sa.Integer), sa.column('assessment_count', sa.Integer),
+        sa.column('completed_count', sa.Integer), sa.column('score_count', sa.Integer),
+        sa.column('score_sum', sa.Float), sa.column('score_sum_sq', sa.Float),
+    )
+    users = sa.table('user', sa.column('id'))
+    projects = sa.table('projects', sa.column('id'))
+    assessments = sa.table('assessments', sa.column('id'), sa.column('status'), sa.column('overall_score'))
+    scores = sa.table('sdg_scores', sa.column('sdg_id'), sa.column('total_score'))
+
+    bind = op.get_bind()
+    user_count = bind.execute(sa.select(sa.func.count()).select_from(users)).scalar() or 0
+    project_count = bind.execute(sa.select(sa.func.count()).select_from(projects)).scalar() or 0
+    totals = bind.execute(sa.select(
+        sa.func.count(),
+        sa.func.sum(sa.case((assessments.c.status == 'completed', 1), else_=0)),
+        sa.func.count(assessments.c.overall_score),
+        sa.func.sum(assessments.c.overall_score),
+        sa.func.sum(assessments.c.overall_score * assessments.c.overall_score),
+    ).select_from(assessments)).one()
+
+    rows = [{
+        'sdg_id': 0,
+        'user_count': user_count,
+        'project_count': project_count,
+        'assessment_count': totals[0] or 0,
+        'completed_count': totals[1] or 0,
+        'score_count': totals[2] or 0,
+        'score_sum': totals[3] or 0.0,
+        'score_sum_sq': totals[4] or 0.0,
+    }]
+    per_sdg = bind.execute(sa.select(
+        scores.c.sdg_id,
+        sa.func.count(scores.c.total_score),
+        sa.func.sum(scores.c.total_score),
+        sa.func.sum(scores.c.total_score * scores.c.total_score),
+    ).group_by(scores.c.sdg_id)).fetchall()
+    for sdg_id, count, total, total_sq in per_sdg:
+        rows.append({
+            'sdg_id': sdg_id, 'user_count': 0, 'project_count': 0,
+            'assessment_count': 0, 'completed_count': 0,
+            'score_count': count or 0, 'score_sum': total or 0.0, 'score_sum_sq': total_sq or 0.0,
+        })
+    op.bulk_insert(stats, rows)
+
+
+def downgrade():
+    op.drop_table('dashboard_stats')
@@ -0,0 +1,61 @@
+"""add analytics rollup and sdg score histogram tables
+
+Revision ID: 7d4e1b9c2a60
+Revises: 3ca85eea26f8
+Create Date: 2026-10-19 11:00:00.000000
+
+Run `flask backfill-rollups` after upgrading to populate the new tables.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4e1b9c2a60'
+down_revision = '3ca85eea26f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analytics_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('grain', sa.String(length=8), nullable=False),
+        sa.Column('bucket', sa.Date(), nullable=False),
+        sa.Column('entity', sa.String(length=16), nullable=False),
+        sa.Column('dimension', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.String(length=100), nullable=False, server_default=''),
+        sa.Column('item_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('grain', 'bucket', 'entity', 'dimension', 'value', name='uq_analytics_rollups_key'),
+    )
+    op.create_index('ix_analytics_rollups_lookup', 'analytics_rollups', ['entity', 'dimension', 'grain', 'bucket'])
+
+    op.create_table(
+        'sdg_score_histograms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sdg_id', sa.Integer(), nullable=False),
+        sa.Column('band', sa.String(length=8), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sdg_id', 'band', name='uq_sdg_score_histograms_key'),
+    )
+
+    # Backfills and refreshes select by created_at ranges
+    op.create_index('ix_assessments_created_at', 'assessments', ['created_at'])
+    op.create_index('ix_projects_created_at', 'projects', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_projects_created_at', table_name='projects')
+    op.drop_index('ix_assessments_created_at', table_name='assessments')
+
+    op.drop_table('sdg_score_histograms')
+    op.drop_index('ix_analytics_rollups_lookup', table_name='analytics_rollups')
+    op.drop_table('analytics_rollups')
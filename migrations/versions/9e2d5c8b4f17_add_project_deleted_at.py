@@ -0,0 +1,32 @@
+"""mark projects being purged with deleted_at instead of status
+
+Revision ID: 9e2d5c8b4f17
+Revises: d4f81b6e2a97
+Create Date: 2026-10-20 10:00:00.000000
+
+Projects a purge left with status 'deleting' get deleted_at set and so stay
+hidden; finish them with `flask purge-project <id>`, then run `flask
+reconcile-counters`, `flask rebuild-dashboard-stats` and `flask
+backfill-rollups` to drop them from the aggregates.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2d5c8b4f17'
+down_revision = 'd4f81b6e2a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE projects SET deleted_at = CURRENT_TIMESTAMP WHERE status = 'deleting'")
+
+
+def downgrade():
+    op.execute("UPDATE projects SET status = 'deleting' WHERE deleted_at IS NOT NULL")
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
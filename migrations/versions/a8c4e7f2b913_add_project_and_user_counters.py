@@ -0,0 +1,58 @@
+"""add denormalized counter columns to projects and users
+
+Revision ID: a8c4e7f2b913
+Revises: f3b9d2a7c514
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c4e7f2b913'
+down_revision = 'f3b9d2a7c514'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('assessment_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('projects', sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('projects', sa.Column('latest_overall_score', sa.Float(), nullable=True))
+    op.add_column('projects', sa.Column('last_assessed_at', sa.DateTime(), nullable=True))
+    op.add_column('user', sa.Column('project_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('user', sa.Column('assessment_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the base tables; `flask reconcile-counters` does the same later
+    op.execute('''
+        UPDATE projects SET
+            assessment_count = (SELECT COUNT(*) FROM assessments a WHERE a.project_id = projects.id),
+            completed_count = (SELECT COUNT(*) FROM assessments a
+                               WHERE a.project_id = projects.id AND a.status = 'completed'),
+            latest_overall_score = (SELECT a.overall_score FROM assessments a
+                                    WHERE a.project_id = projects.id AND a.status = 'completed'
+                                    ORDER BY COALESCE(a.completed_at, a.created_at) DESC, a.id DESC
+                                    LIMIT 1),
+            last_assessed_at = (SELECT MAX(COALESCE(a.completed_at, a.created_at)) FROM assessments a
+                                WHERE a.project_id = projects.id AND a.status = 'completed')
+    ''')
+    op.execute('''
+        UPDATE "user" SET
+            project_count = (SELECT COUNT(*) FROM projects p WHERE p.user_id = "user".id),
+            assessment_count = (SELECT COUNT(*) FROM assessments a
+                                JOIN projects p ON p.id = a.project_id
+                                WHERE p.user_id = "user".id)
+    ''')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('assessment_count')
+        batch_op.drop_column('project_count')
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('last_assessed_at')
+        batch_op.drop_column('latest_overall_score')
+        batch_op.drop_column('completed_count')
+        batch_op.drop_column('assessment_count')
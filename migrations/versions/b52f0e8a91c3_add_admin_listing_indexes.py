@@ -0,0 +1,42 @@
+"""add keyset and filter indexes for the admin listings
+
+Revision ID: b52f0e8a91c3
+Revises: 7d4e1b9c2a60
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52f0e8a91c3'
+down_revision = '7d4e1b9c2a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination orders by (created_at, id); the composite indexes
+    # also serve the created_at range scans the rollup backfill relies on
+    op.drop_index('ix_assessments_created_at', table_name='assessments')
+    op.drop_index('ix_projects_created_at', table_name='projects')
+    op.create_index('ix_assessments_created_at_id', 'assessments', ['created_at', 'id'])
+    op.create_index('ix_projects_created_at_id', 'projects', ['created_at', 'id'])
+
+    # Name sorts and the admin filters
+    op.create_index('ix_projects_name_id', 'projects', ['name', 'id'])
+    op.create_index('ix_projects_project_type', 'projects', ['project_type'])
+    op.create_index('ix_projects_status', 'projects', ['status'])
+    op.create_index('ix_user_name_id', 'user', ['name', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_user_name_id', table_name='user')
+    op.drop_index('ix_projects_status', table_name='projects')
+    op.drop_index('ix_projects_project_type', table_name='projects')
+    op.drop_index('ix_projects_name_id', table_name='projects')
+
+    op.drop_index('ix_projects_created_at_id', table_name='projects')
+    op.drop_index('ix_assessments_created_at_id', table_name='assessments')
+    op.create_index('ix_projects_created_at', 'projects', ['created_at'])
+    op.create_index('ix_assessments_created_at', 'assessments', ['created_at'])
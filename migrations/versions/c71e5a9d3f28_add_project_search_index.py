@@ -0,0 +1,67 @@
+"""add full-text search over projects
+
+Revision ID: c71e5a9d3f28
+Revises: a8c4e7f2b913
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71e5a9d3f28'
+down_revision = 'a8c4e7f2b913'
+branch_labels = None
+depends_on = None
+
+# Kept in step with app/services/search_service.py
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, description, location, sector,
+        content='projects', content_rowid='id', tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, description, location, sector)
+        VALUES (new.id, new.name, new.description, new.location, new.sector);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, location, sector)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.sector);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF name, description, location, sector
+    ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description, location, sector)
+        VALUES ('delete', old.id, old.name, old.description, old.location, old.sector);
+        INSERT INTO projects_fts(rowid, name, description, location, sector)
+        VALUES (new.id, new.name, new.description, new.location, new.sector);
+    END""",
+    "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')",
+]
+
+# Name first, then location and sector, then description
+POSTGRESQL_UPGRADE = [
+    """ALTER TABLE projects ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(sector, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX ix_projects_search_vector ON projects USING GIN (search_vector)",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    statements = {'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRESQL_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('projects_fts_ai', 'projects_fts_ad', 'projects_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS projects_fts')
+    elif dialect == 'postgresql':
+        op.drop_index('ix_projects_search_vector', table_name='projects')
+        op.drop_column('projects', 'search_vector')
@@ -0,0 +1,35 @@
+"""add precomputed assessment summaries
+
+Revision ID: d4f81b6e2a97
+Revises: c71e5a9d3f28
+Create Date: 2026-10-19 21:00:00.000000
+
+Run `flask rebuild-summaries` after upgrading to populate the new table;
+summaries missing until then are computed on first read.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f81b6e2a97'
+down_revision = 'c71e5a9d3f28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'assessment_summaries',
+        sa.Column('assessment_id', sa.Integer(), nullable=False),
+        sa.Column('overall_score', sa.Float(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('assessment_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('assessment_summaries')
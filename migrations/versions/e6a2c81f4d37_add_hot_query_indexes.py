@@ -0,0 +1,41 @@
+"""add indexes recommended by the hot query plan checks
+
+Revision ID: e6a2c81f4d37
+Revises: b52f0e8a91c3
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a2c81f4d37'
+down_revision = 'b52f0e8a91c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A user's projects ordered by updated_at (API) or created_at (projects
+    # page) sorted in a temp B-tree; the composites also cover plain user_id
+    # lookups, so the single-column index goes
+    op.drop_index('ix_projects_user_id', table_name='projects')
+    op.create_index('ix_projects_user_id_updated_at', 'projects', ['user_id', 'updated_at'])
+    op.create_index('ix_projects_user_id_created_at', 'projects', ['user_id', 'created_at'])
+
+    # assessment_type filters walked the whole (created_at, id) index
+    op.create_index('ix_assessments_assessment_type_created_at_id', 'assessments',
+                    ['assessment_type', 'created_at', 'id'])
+
+    # Relationships by source SDG, strongest first
+    op.create_index('ix_sdg_relationships_source_sdg_id_strength', 'sdg_relationships',
+                    ['source_sdg_id', 'strength'])
+
+
+def downgrade():
+    op.drop_index('ix_sdg_relationships_source_sdg_id_strength', table_name='sdg_relationships')
+    op.drop_index('ix_assessments_assessment_type_created_at_id', table_name='assessments')
+
+    op.drop_index('ix_projects_user_id_created_at', table_name='projects')
+    op.drop_index('ix_projects_user_id_updated_at', table_name='projects')
+    op.create_index('ix_projects_user_id', 'projects', ['user_id'])
@@ -0,0 +1,50 @@
+"""declare ON DELETE CASCADE on assessment, score and response foreign keys
+
+Revision ID: f3b9d2a7c514
+Revises: e6a2c81f4d37
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d2a7c514'
+down_revision = 'e6a2c81f4d37'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table)
+CASCADES = [
+    ('assessments', 'project_id', 'projects'),
+    ('sdg_scores', 'assessment_id', 'assessments'),
+    ('question_responses', 'assessment_id', 'assessments'),
+]
+
+# Names SQLite's unnamed constraints get when batch mode reflects them
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _existing_name(table, column):
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['constrained_columns'] == [column]:
+            return fk['name']
+    return None
+
+
+def _recreate(ondelete):
+    for table, column, referred in CASCADES:
+        name = f'fk_{table}_{column}_{referred}'
+        existing = _existing_name(table, column) or name
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(existing, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _recreate('CASCADE')
+
+
+def downgrade():
+    _recreate(None)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark serializing a list of projects to a JSON response body.
+
+Compares four profiles on the same loaded Project instances:
+  reflect+stdlib   - {c.name: getattr(...)} per row, Flask's stdlib provider (RFC 822 dates)
+  compiled+stdlib  - model_serializer(), FastJSONProvider with JSON_BACKEND=stdlib
+  reflect+orjson   - per-row reflection, FastJSONProvider with orjson
+  compiled+orjson  - model_serializer(), FastJSONProvider with orjson
+
+Usage: python scripts/benchmark_json.py [--projects 1000] [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+from config import TestingConfig
+from app import create_app, db
+from app.models.user import User
+from app.models.project import Project
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import serialize_all
+
+
+def reflect(projects):
+    return [{c.name: getattr(project, c.name) for c in project.__table__.columns} for project in projects]
+
+
+PROFILES = {
+    'reflect+stdlib': (reflect, lambda app: DefaultJSONProvider(app)),
+    'compiled+stdlib': (serialize_all, 'stdlib'),
+    'reflect+orjson': (reflect, 'orjson'),
+    'compiled+orjson': (serialize_all, 'orjson'),
+}
+
+
+def make_app(path):
+    attrs = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': False}
+    return create_app(type('BenchmarkConfig', (TestingConfig,), attrs))
+
+
+def seed(count):
+    user = User(email='bench@example.com', name='Bench')
+    db.session.add(user)
+    db.session.flush()
+    started = datetime(2024, 1, 1)
+    db.session.add_all([
+        Project(name=f'Project {i}', user_id=user.id, description='Mixed-use retrofit ' * 5,
+                location='Lisboa', sector='Residential', size_sqm=1200.0 + i, budget=250000.0,
+                start_date=started, end_date=started + timedelta(days=365), status='in_progress')
+        for i in range(count)
+    ])
+    db.session.commit()
+    return db.session.query(Project).all()
+
+
+def run_profile(app, name, projects, repeat):
+    to_dicts, provider = PROFILES[name]
+    if isinstance(provider, str):
+        app.config['JSON_BACKEND'] = provider
+        provider = FastJSONProvider(app)
+    else:
+        provider = provider(app)
+
+    with app.test_request_context():
+        body = provider.response(to_dicts(projects)).get_data()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            provider.response(to_dicts(projects))
+        elapsed = (time.perf_counter() - started) / repeat
+    return {'profile': name, 'ms': round(elapsed * 1000, 2), 'bytes': len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--profile', choices=list(PROFILES), action='append')
+    args = parser.parse_args()
+
+    names = args.profile or list(PROFILES)
+    if orjson is None:
+        names = [name for name in names if not name.endswith('orjson')]
+        print('orjson is not installed; skipping the orjson profiles')
+
+    os.environ.pop('DATABASE_URL', None)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            projects = seed(args.projects)
+            results = [run_profile(app, name, projects, args.repeat) for name in names]
+            db.engine.dispose()
+
+    baseline = results[0]['ms']
+    print(f"{'profile':<16} {'ms/list':>8} {'speedup':>8} {'bytes':>8}")
+    for result in results:
+        print(f"{result['profile']:<16} {result['ms']:>8} {baseline / result['ms']:>7.1f}x {result['bytes']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent small writes (draft autosaves) against a SQLite file.
+
+Compares three profiles:
+  default   - rollback journal, no pragmas, one commit per write
+  wal       - SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout), one commit per write
+  wal+queue - SQLITE_PRAGMAS plus the writer queue's group commits
+
+Usage: python scripts/benchmark_sqlite_writes.py [--threads 8] [--writes 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig
+from app import create_app, db
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.services.assessment_service import save_draft_data
+from app.utils.write_queue import run_write
+
+PROFILES = {
+    'default': {'SQLITE_PRAGMAS': {}, 'WRITE_QUEUE_ENABLED': False},
+    'wal': {'WRITE_QUEUE_ENABLED': False},
+    'wal+queue': {'WRITE_QUEUE_ENABLED': True},
+}
+
+
+def make_app(path, overrides):
+    attrs = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': False}
+    attrs.update(overrides)
+    return create_app(type('BenchmarkConfig', (TestingConfig,), attrs))
+
+
+def seed(app, count):
+    with app.app_context():
+        db.create_all()
+        user = User(email='bench@example.com', name='Bench')
+        db.session.add(user)
+        db.session.flush()
+        project = Project(name='Benchmark', user_id=user.id)
+        db.session.add(project)
+        db.session.flush()
+        assessments = [Assessment(project_id=project.id, user_id=user.id) for _ in range(count)]
+        db.session.add_all(assessments)
+        db.session.commit()
+        return [assessment.id for assessment in assessments]
+
+
+def run_profile(name, threads, writes):
+    os.environ.pop('DATABASE_URL', None)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'), PROFILES[name])
+        assessment_ids = seed(app, threads)
+        errors = []
+
+        def worker(assessment_id):
+            with app.app_context():
+                for i in range(writes):
+                    try:
+                        run_write(save_draft_data, assessment_id, json.dumps({'step': i}))
+                    except Exception as e:
+                        db.session.rollback()
+                        errors.append(e)
+                    finally:
+                        db.session.remove()
+
+        pool = [threading.Thread(target=worker, args=(assessment_id,)) for assessment_id in assessment_ids]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            db.engine.dispose()
+
+    total = threads * writes
+    return {
+        'profile': name,
+        'writes': total,
+        'errors': len(errors),
+        'seconds': round(elapsed, 2),
+        'writes_per_second': round((total - len(errors)) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Writes per thread')
+    parser.add_argument('--profile', choices=list(PROFILES), action='append')
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'writes':>7} {'errors':>7} {'seconds':>8} {'writes/s':>9}")
+    for name in args.profile or PROFILES:
+        result = run_profile(name, args.threads, args.writes)
+        print(f"{result['profile']:<10} {result['writes']:>7} {result['errors']:>7} "
+              f"{result['seconds']:>8} {result['writes_per_second']:>9}")
+
+
+if __name__ == '__main__':
+    main()
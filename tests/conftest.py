@@ -173,6 +173,33 @@ def auth(client):  # Depends on the function-scoped client
     """Fixture to perform login/logout actions."""
     return AuthActions(client)
 
+@pytest.fixture(scope='function')
+def test_user_api(session):
+    """Creates a test user for API testing within the function transaction."""
+    user = User(
+        email=f"api_test_{uuid.uuid4().hex[:8]}@example.com",
+        password_hash=generate_password_hash('password123'),
+        name='API Test User'
+    )
+    session.add(user)
+    session.flush()
+    # Plain password kept on the object for api_auth_token to log in with
+    user.plain_password = 'password123'
+    return user
+
+@pytest.fixture(scope='function')
+def api_auth_token(client, test_user_api):
+    """Logs test_user_api in through the API and returns its bearer token."""
+    response = client.post('/api/auth/login', json={
+        'email': test_user_api.email,
+        'password': test_user_api.plain_password
+    })
+    if response.status_code != 200:
+        pytest.fail(f"API Login failed: {response.status_code} - {response.text}")
+    data = response.get_json()
+    assert 'token' in data
+    return data['token']
+
 @pytest.fixture(scope='function')
 def admin_user(session):
     """Creates an admin user within the function transaction."""
@@ -286,3 +313,30 @@ def completed_assessment(session, test_project):
     session.flush()
     print(f"   <- Completed assessment created (ID: {assessment.id}, {len(sdg_goals)} SDG scores)")
     return assessment
+
+@pytest.fixture(scope='function')
+def first_goal(session):
+    """The SDG goal with the lowest number (SDG 1)."""
+    return session.query(SdgGoal).order_by(SdgGoal.number).first()
+
+@pytest.fixture(scope='function')
+def make_scored_assessment(session, test_user, first_goal):
+    """
+    Factory for committed assessments, each on its own project, scoring `score`
+    overall and on first_goal. Used by the analytics tests (cube, benchmarks, export).
+    """
+    from app.models.assessment import SdgScore
+
+    def make(score, sector='scored', project_type='residential', status='completed', user=None):
+        user = user or test_user
+        project = Project(name=f'Scored {sector} {score}', user_id=user.id, sector=sector,
+                          project_type=project_type)
+        session.add(project)
+        session.flush()
+        assessment = Assessment(project_id=project.id, user_id=user.id, status=status, overall_score=score)
+        assessment.sdg_scores.append(SdgScore(sdg_id=first_goal.id, total_score=score))
+        session.add(assessment)
+        session.commit()
+        return assessment
+
+    return make
@@ -0,0 +1,93 @@
+# tests/test_analytics_rollups.py
+from datetime import datetime
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.models.analytics_rollup import AnalyticsRollup, SdgScoreHistogram
+from app.services.analytics_rollup_service import (
+    backfill_rollups, get_breakdown, get_time_series, score_band
+)
+from app.utils.db_events import increment_row
+
+
+def _snapshot(session):
+    """Return every non-empty rollup and histogram row as comparable tuples."""
+    session.expire_all()
+    rollups = {
+        (row.grain, row.bucket, row.entity, row.dimension, row.value):
+            (row.item_count, row.score_count, round(row.score_sum, 6))
+        for row in AnalyticsRollup.query.all()
+        if row.item_count or row.score_count
+    }
+    histograms = {(row.sdg_id, row.band): row.count for row in SdgScoreHistogram.query.all() if row.count}
+    return rollups, histograms
+
+
+def test_increment_row_upserts(session):
+    table = SdgScoreHistogram.__table__
+    conn = session.connection()
+    increment_row(conn, table, {'sdg_id': 999, 'band': '0-2'}, {'count': 2}, datetime.utcnow())
+    increment_row(conn, table, {'sdg_id': 999, 'band': '0-2'}, {'count': 3}, datetime.utcnow())
+    rows = SdgScoreHistogram.query.filter_by(sdg_id=999).all()
+    assert [(row.band, row.count) for row in rows] == [('0-2', 5)]
+
+
+def test_score_band_edges():
+    assert score_band(None) is None
+    assert score_band(0) == '0-2'
+    assert score_band(1.99) == '0-2'
+    assert score_band(2) == '2-4'
+    assert score_band(7.5) == '6-8'
+    assert score_band(10) == '8-10'
+
+
+def test_writes_match_backfill(session, test_user):
+    backfill_rollups()
+    goal = session.query(SdgGoal).order_by(SdgGoal.number).first()
+
+    project = Project(name='Rollup Project', user_id=test_user.id,
+                      project_type='residential', sector='housing')
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user.id, status='draft',
+                            created_at=datetime(2024, 3, 15, 12, 0))
+    assessment.sdg_scores.append(SdgScore(sdg_id=goal.id, total_score=5.0))
+    session.add(assessment)
+    session.commit()
+
+    march = [point for point in get_time_series('assessment', grain='month')
+             if point['bucket'].strftime('%Y-%m') == '2024-03']
+    assert march and march[0]['count'] >= 1
+
+    # Update scores, status and the project's type; the assessment must move with it
+    assessment.status = 'completed'
+    assessment.overall_score = 7.0
+    assessment.sdg_scores[0].total_score = 9.0
+    session.commit()
+    project.project_type = 'commercial'
+    session.commit()
+
+    by_type = dict(get_breakdown('assessment', 'project_type'))
+    assert by_type.get('commercial', 0) >= 1
+
+    incremental = _snapshot(session)
+    backfill_rollups()
+    assert _snapshot(session) == incremental
+
+
+def test_deletes_are_subtracted(session, test_user):
+    project = Project(name='Short-lived Project', user_id=test_user.id, project_type='industrial')
+    session.add(project)
+    session.flush()
+    session.add(Assessment(project_id=project.id, user_id=test_user.id, status='completed', overall_score=3.0))
+    session.commit()
+    backfill_rollups()
+    before = dict(get_breakdown('project', 'project_type')).get('industrial', 0)
+
+    session.delete(project)
+    session.commit()
+
+    assert dict(get_breakdown('project', 'project_type')).get('industrial', 0) == before - 1
+    incremental = _snapshot(session)
+    backfill_rollups()
+    assert _snapshot(session) == incremental
@@ -6,39 +6,6 @@ import json
 from werkzeug.security import generate_password_hash
 import uuid  # Add uuid import
 
-@pytest.fixture
-def test_user_api(session):
-    """Create a test user for API testing."""
-    from app.models import User
-    from werkzeug.security import generate_password_hash
-
-    # Generate a unique email for each test run for this fixture
-    unique_email = f"api_test_{uuid.uuid4().hex[:8]}@example.com"
-    user = User(
-        email=unique_email,
-        password_hash=generate_password_hash('password123'),
-        name='API Test User'
-    )
-    session.add(user)
-    session.flush()  # Get ID, will be rolled back by function-scoped session fixture
-    # Store the plain password with the user object for the api_auth_token fixture to use
-    user.plain_password = 'password123'
-    return user
-
-@pytest.fixture
-def api_auth_token(client, test_user_api):
-    """Get an authentication token for API testing."""
-    login_payload = {
-        'email': test_user_api.email,  # Use the unique email
-        'password': test_user_api.plain_password  # Use the stored plain password
-    }
-    response = client.post('/api/auth/login', json=login_payload)  # This route uses ORM now
-    if response.status_code != 200:
-        pytest.fail(f"API Login failed: {response.status_code} - {response.text}")
-    data = response.get_json()
-    assert 'token' in data
-    return data['token']
-
 @pytest.fixture
 def test_project_api(session, test_user_api):
     """Create a test project for API testing."""
@@ -330,4 +297,19 @@ def test_invalid_token(client, test_project_api):
     response = client.get('/api/projects', headers=headers)
     assert response.status_code == 401
 
-# Add tests for POST, PUT, DELETE API endpoints, invalid tokens, etc.
\ No newline at end of file
+# Add tests for POST, PUT, DELETE API endpoints, invalid tokens, etc.
+def test_assessment_benchmark(client, api_auth_token, test_user_api, test_project_api, session):
+    headers = {'Authorization': f'Bearer {api_auth_token}'}
+    assessment = Assessment(project_id=test_project_api.id, user_id=test_user_api.id,
+                            status='completed', overall_score=5.0)
+    session.add(assessment)
+    session.flush()
+
+    response = client.get(f'/api/assessments/{assessment.id}/benchmark', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['segments'] == {'sector': 'Technology', 'project_type': 'commercial'}
+    assert set(data['overall']) >= {'score', 'all', 'sector', 'project_type'}
+
+    response = client.get('/api/assessments/999999/benchmark', headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,91 @@
+# tests/test_api_listing.py
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.models import Project, Assessment, SdgScore
+from app.models.sdg import SdgGoal
+
+
+def _get(client, token, url):
+    return client.get(url, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_project_list_pages_with_cursor(client, api_auth_token, test_user_api, session):
+    base = datetime(2024, 1, 1)
+    projects = [Project(name=f'Paged {i}', user_id=test_user_api.id) for i in range(5)]
+    session.add_all(projects)
+    session.flush()
+    # Two projects share an updated_at so the id tiebreaker is exercised
+    for i, project in enumerate(projects):
+        project.updated_at = base + timedelta(days=min(i, 3))
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/projects?limit=2&fields=name' + (f'&cursor={cursor}' if cursor else '')
+        response = _get(client, api_auth_token, url)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert all(set(item) == {'id', 'name'} for item in page)
+        seen.extend(item['id'] for item in page)
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == [p.id for p in sorted(projects, key=lambda p: (p.updated_at, p.id), reverse=True)]
+
+    assert _get(client, api_auth_token, '/api/projects?fields=password').status_code == 400
+    assert _get(client, api_auth_token, '/api/projects?cursor=garbage').status_code == 400
+
+
+def test_project_list_pages_past_undated_projects(client, api_auth_token, test_user_api, session):
+    projects = [Project(name=f'Undated {i}', user_id=test_user_api.id) for i in range(5)]
+    session.add_all(projects)
+    session.commit()
+    # Rows written by the legacy SQL can lack updated_at; they come after the dated ones
+    undated = [projects[1].id, projects[3].id, projects[4].id]
+    session.execute(update(Project).where(Project.id.in_(undated)).values(updated_at=None))
+    for i, project_id in enumerate([projects[0].id, projects[2].id]):
+        session.execute(update(Project).where(Project.id == project_id)
+                        .values(updated_at=datetime(2024, 1, 1) + timedelta(days=i)))
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/projects?limit=2&fields=name' + (f'&cursor={cursor}' if cursor else '')
+        response = _get(client, api_auth_token, url)
+        assert response.status_code == 200
+        seen.extend(item['id'] for item in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == [projects[2].id, projects[0].id] + sorted(undated, reverse=True)
+
+
+def test_project_detail_fieldsets(client, api_auth_token, test_user_api, session):
+    project = Project(name='Sparse', user_id=test_user_api.id, description='Long text')
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user_api.id,
+                            draft_data='{"big": true}', raw_expert_data={'big': True})
+    session.add(assessment)
+    session.flush()
+    goal = session.query(SdgGoal).first()
+    session.add(SdgScore(assessment_id=assessment.id, sdg_id=goal.id, total_score=7.0))
+    session.commit()
+
+    data = _get(client, api_auth_token, f'/api/projects/{project.id}').get_json()
+    assert data['description'] == 'Long text'
+    embedded = data['assessments'][0]
+    assert embedded['id'] == assessment.id
+    assert 'draft_data' not in embedded and 'raw_expert_data' not in embedded and 'scores' not in embedded
+
+    data = _get(client, api_auth_token,
+                f'/api/projects/{project.id}?fields=name,assessments,assessments.draft_data&include=scores').get_json()
+    assert set(data) == {'id', 'name', 'assessments'}
+    assert data['assessments'] == [{'id': assessment.id, 'draft_data': '{"big": true}',
+                                    'scores': [{'id': session.query(SdgScore.id).filter_by(
+                                        assessment_id=assessment.id).scalar(),
+                                        'sdg_id': goal.id, 'total_score': 7.0}]}]
+
+    assert set(_get(client, api_auth_token, f'/api/projects/{project.id}?fields=name').get_json()) == {'id', 'name'}
+    assert _get(client, api_auth_token, f'/api/projects/{project.id}?include=everything').status_code == 400
+    assert _get(client, api_auth_token, f'/api/projects/{project.id + 1000}').status_code == 404
@@ -0,0 +1,76 @@
+# tests/test_assessment_summaries.py
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.assessment_summary import AssessmentSummary
+from app.models.sdg import SdgGoal
+from app.services.summary_service import build_summary
+
+TOTALS = {1: 8.0, 2: 6.0, 6: 9.0, 7: 2.0, 16: 4.0}
+
+
+def _scored_assessment(session, user_id):
+    goals = {goal.number: goal for goal in session.query(SdgGoal).filter(SdgGoal.number.in_(TOTALS))}
+    for number in set(TOTALS) - set(goals):
+        goals[number] = SdgGoal(number=number, name=f'Goal {number}', color_code='#000000')
+        session.add(goals[number])
+    session.flush()
+    project = Project(name='Summarized Project', user_id=user_id)
+    assessment = Assessment(user_id=user_id, status='completed', overall_score=5.8)
+    for number, total in TOTALS.items():
+        assessment.sdg_scores.append(SdgScore(sdg_id=goals[number].id, direct_score=total,
+                                              bonus_score=0.0, total_score=total))
+    project.assessments.append(assessment)
+    session.add(project)
+    session.commit()
+    return assessment
+
+
+def test_build_summary_groups_and_ranks():
+    scores = [{'number': n, 'name': f'SDG {n}', 'color_code': '#000', 'direct_score': t,
+               'bonus_score': 0.0, 'total_score': t} for n, t in sorted(TOTALS.items())]
+    summary = build_summary(scores)
+    assert summary['category_scores'] == {'People': 7.0, 'Planet': 9.0, 'Prosperity': 2.0,
+                                          'Peace & Partnership': 4.0}
+    assert summary['categories']['People'] == [1, 2]
+    assert [entry['sdg'] for entry in summary['top_sdgs']] == [6, 1, 2]
+    assert [entry['sdg'] for entry in summary['bottom_sdgs']] == [2, 16, 7]
+    assert [entry['sdg'] for entry in summary['chart_data']] == [1, 2, 6, 7, 16]
+
+
+def test_summary_follows_score_writes(session, test_user):
+    assessment = _scored_assessment(session, test_user.id)
+    session.expire_all()
+    record = session.get(AssessmentSummary, assessment.id)
+    assert record.overall_score == 5.8
+    assert record.payload['category_scores']['People'] == 7.0
+
+    score = next(s for s in assessment.sdg_scores if s.total_score == 2.0)
+    score.total_score = 10.0
+    assessment.overall_score = 7.4
+    session.commit()
+    session.expire_all()
+    record = session.get(AssessmentSummary, assessment.id)
+    assert record.overall_score == 7.4
+    assert record.payload['top_sdgs'][0]['total'] == 10.0
+
+    assessment_id = assessment.id
+    session.delete(assessment)
+    session.commit()
+    assert session.get(AssessmentSummary, assessment_id) is None
+
+
+def test_summary_endpoint_reads_stored_record(client, session, test_user_api, api_auth_token):
+    assessment = _scored_assessment(session, test_user_api.id)
+    headers = {'Authorization': f'Bearer {api_auth_token}'}
+
+    data = client.get(f'/api/assessments/{assessment.id}/summary', headers=headers).get_json()
+    assert data['assessment']['project_name'] == 'Summarized Project'
+    assert data['overall_score'] == 5.8
+    assert [entry['sdg'] for entry in data['top_sdgs']] == [6, 1, 2]
+
+    # A record missing (e.g. scored before the table existed) is computed on read
+    session.query(AssessmentSummary).filter_by(assessment_id=assessment.id).delete()
+    session.commit()
+    again = client.get(f'/api/assessments/{assessment.id}/summary', headers=headers).get_json()
+    assert again['category_scores'] == data['category_scores']
+    assert session.get(AssessmentSummary, assessment.id) is not None
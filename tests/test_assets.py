@@ -0,0 +1,90 @@
+# tests/test_assets.py
+import os
+
+from flask import Flask, render_template_string
+
+from app.utils.assets import BUNDLES, build_assets, init_assets, minify_css
+from app.utils.compression import CompressionMiddleware, precompress_static
+
+
+def _static(tmp_path):
+    static = tmp_path / 'static'
+    for member in {member for members in BUNDLES.values() for member in members}:
+        (static / member).parent.mkdir(parents=True, exist_ok=True)
+        (static / member).write_text(f'// {member}\nvar {os.path.basename(member)[:-3]} = 1;\n')
+    (static / 'css').mkdir()
+    (static / 'css' / 'main.css').write_text('/* theme */\n.hero {\n  background: url("../img/banner.jpg");\n}\n')
+    (static / 'js' / 'main.js').write_text('var big = 1;\n' * 200)
+    return static
+
+
+def _app(static_folder, manifest=True):
+    app = Flask(__name__, static_folder=str(static_folder))
+    app.config['ASSETS_MANIFEST_ENABLED'] = manifest
+    init_assets(app)
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, static_folder=app.static_folder,
+                                         static_url_path=app.static_url_path)
+    return app
+
+
+def test_minify_css_keeps_strings_and_spacing_that_matters():
+    css = '''@media screen and (max-width: 600px) {
+        /* dropped */ a :hover , b > c { content: "x  /* kept */"; width: calc(1px + 2px) ; }
+        /*! license */ .logo { background: url(img/logo.svg), url(data:image/png;base64,AA==) }
+    }'''
+    assert minify_css(css, lambda ref: '../' + ref) == (
+        '@media screen and (max-width:600px){a :hover,b>c{content:"x  /* kept */";width:calc(1px + 2px)}'
+        '/*! license */ .logo{background:url(../img/logo.svg),url(data:image/png;base64,AA==)}}')
+
+
+def test_build_fingerprints_and_bundles(tmp_path):
+    static = _static(tmp_path)
+    manifest = build_assets(str(static))
+
+    built = manifest['css/main.css']
+    assert built.startswith('dist/css/main.') and built.endswith('.css')
+    # Relative references still point at the source tree from dist/
+    assert 'url("../../img/banner.jpg")' in (static / built).read_text()
+
+    bundle = (static / manifest['js/expert_results.bundle.js']).read_text()
+    positions = [bundle.index(f'// {member}') for member in BUNDLES['js/expert_results.bundle.js']]
+    assert positions == sorted(positions)
+
+    # Only the edited file gets a new name; the old build is replaced
+    (static / 'css' / 'main.css').write_text('.hero { color: red; }')
+    rebuilt = build_assets(str(static))
+    assert rebuilt['css/main.css'] != built and not (static / built).exists()
+    assert rebuilt['js/main.js'] == manifest['js/main.js']
+
+
+def test_static_url_resolves_through_manifest(tmp_path):
+    static = _static(tmp_path)
+    template = "{{ static_url('js/main.js') }} {{ static_urls('js/expert_results.bundle.js')|join(' ') }}"
+
+    with _app(static).test_request_context():
+        sources = render_template_string(template).split()
+    assert sources[0] == '/static/js/main.js'
+    assert sources[1:] == [f'/static/{member}' for member in BUNDLES['js/expert_results.bundle.js']]
+
+    manifest = build_assets(str(static))
+    with _app(static).test_request_context():
+        built = render_template_string(template).split()
+    assert built == [f"/static/{manifest['js/main.js']}", f"/static/{manifest['js/expert_results.bundle.js']}"]
+    with _app(static, manifest=False).test_request_context():
+        assert render_template_string(template).split() == sources
+
+
+def test_fingerprinted_files_cached_forever(tmp_path):
+    static = _static(tmp_path)
+    manifest = build_assets(str(static))
+    precompress_static(str(static))
+    client = _app(static).test_client()
+
+    response = client.get(f"/static/{manifest['js/main.js']}", headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.cache_control.immutable and response.cache_control.max_age == 365 * 24 * 3600
+    response.close()
+
+    source = client.get('/static/js/main.js')
+    assert not source.cache_control.immutable
+    source.close()
@@ -0,0 +1,118 @@
+# tests/test_batch_api.py
+from app.models import Project, Assessment, QuestionResponse
+from app.models.sdg import SdgQuestion
+
+
+def _post(client, token, url, payload):
+    return client.post(url, json=payload, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_batch_projects_create_and_update(client, api_auth_token, test_user_api, session):
+    existing = Project(name='Before', user_id=test_user_api.id, status='planning')
+    session.add(existing)
+    session.commit()
+
+    response = _post(client, api_auth_token, '/api/projects/batch', {'projects': [
+        {'name': 'Portfolio A', 'size_sqm': '120.5', 'start_date': '2024-01-01', 'end_date': '2024-06-01'},
+        {'id': existing.id, 'name': 'After', 'status': 'in_progress'},
+        {'name': 'Portfolio B', 'sector': 'Education'},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [(r['index'], r['status']) for r in results] == [(0, 'created'), (1, 'updated'), (2, 'created')]
+    assert results[1]['id'] == existing.id
+
+    session.expire_all()
+    created = session.get(Project, results[0]['id'])
+    assert (created.user_id, created.size_sqm) == (test_user_api.id, 120.5)
+    assert (existing.name, existing.status) == ('After', 'in_progress')
+
+
+def test_invalid_batch_writes_nothing(client, api_auth_token, test_user_api, session):
+    other = Project(name='Not Mine', user_id=test_user_api.id + 1000)
+    session.add(other)
+    session.commit()
+    before = session.query(Project).filter_by(user_id=test_user_api.id).count()
+
+    response = _post(client, api_auth_token, '/api/projects/batch', {'projects': [
+        {'name': 'Fine'},
+        {'description': 'no name'},
+        {'id': other.id, 'name': 'Hijacked'},
+        {'name': 'Bad dates', 'start_date': '2024-06-01', 'end_date': '2024-01-01'},
+        {'name': 'Bad size', 'size_sqm': 'large'},
+    ]})
+    assert response.status_code == 400
+    assert [e['index'] for e in response.get_json()['errors']] == [1, 2, 3, 4]
+    session.expire_all()
+    assert session.query(Project).filter_by(user_id=test_user_api.id).count() == before
+    assert session.get(Project, other.id).name == 'Not Mine'
+
+    assert _post(client, api_auth_token, '/api/projects/batch', {'projects': []}).status_code == 400
+    client.application.config['API_BATCH_MAX_ITEMS'] = 2
+    try:
+        oversized = _post(client, api_auth_token, '/api/projects/batch', {'projects': [{'name': 'x'}] * 3})
+    finally:
+        client.application.config['API_BATCH_MAX_ITEMS'] = 2000
+    assert oversized.status_code == 413
+
+
+def test_batch_assessments_and_responses(client, api_auth_token, test_user_api, session):
+    projects = [Project(name=f'Batch {i}', user_id=test_user_api.id) for i in range(2)]
+    session.add_all(projects)
+    session.commit()
+    questions = [q.id for q in session.query(SdgQuestion).order_by(SdgQuestion.id).limit(2)]
+
+    response = _post(client, api_auth_token, '/api/assessments/batch', {'assessments': [
+        {'project_id': projects[0].id}, {'project_id': projects[1].id, 'assessment_type': 'expert'},
+    ]})
+    assert response.status_code == 200
+    assessment_ids = [r['id'] for r in response.get_json()['results']]
+    session.expire_all()
+    assert session.get(Project, projects[0].id).assessment_count == 1
+    assert session.get(Assessment, assessment_ids[1]).assessment_type == 'expert'
+
+    payload = {'assessments': [
+        {'assessment_id': assessment_ids[0], 'responses': [
+            {'question_id': questions[0], 'score': 3, 'response_text': 'a'},
+            {'question_id': questions[1], 'score': 1},
+        ]},
+        {'assessment_id': assessment_ids[1], 'responses': [{'question_id': questions[0], 'score': 5}]},
+    ]}
+    assert _post(client, api_auth_token, '/api/responses/batch', payload).status_code == 200
+    # Saving again updates in place
+    payload['assessments'][0]['responses'][0]['score'] = 4
+    response = _post(client, api_auth_token, '/api/responses/batch', payload)
+    assert [r['responses'] for r in response.get_json()['results']] == [2, 1]
+
+    session.expire_all()
+    rows = session.query(QuestionResponse).filter(QuestionResponse.assessment_id.in_(assessment_ids)).all()
+    assert sorted((r.assessment_id, r.question_id, r.response_score) for r in rows) == sorted([
+        (assessment_ids[0], questions[0], 4.0), (assessment_ids[0], questions[1], 1.0),
+        (assessment_ids[1], questions[0], 5.0),
+    ])
+
+    rejected = _post(client, api_auth_token, '/api/responses/batch', {'assessments': [
+        {'assessment_id': assessment_ids[0], 'responses': [{'question_id': -1, 'score': 1}]},
+    ]})
+    assert rejected.status_code == 400
+
+
+def test_malformed_assessment_items_are_reported(client, api_auth_token, test_user_api, session):
+    project = Project(name='Batch Target', user_id=test_user_api.id)
+    session.add(project)
+    session.commit()
+
+    response = _post(client, api_auth_token, '/api/assessments/batch', {'assessments': [
+        {'project_id': project.id},
+        {'project_id': [project.id]},
+        {'project_id': project.id, 'assessment_type': {'kind': 'expert'}},
+        'not an object',
+        # JSON true equals 1 in Python and must not pass as project 1
+        {'project_id': True},
+    ]})
+    assert response.status_code == 400
+    errors = response.get_json()['errors']
+    assert [e['index'] for e in errors] == [1, 2, 3, 4]
+    assert errors[3]['error'] == 'project_id must be an integer'
+    session.expire_all()
+    assert session.get(Project, project.id).assessment_count == 0
@@ -0,0 +1,32 @@
+# tests/test_benchmark.py
+from app.services.score_cube_service import ScoreCube
+from app.services.benchmark_service import BenchmarkIndex, OVERALL
+
+
+def test_percentiles_follow_incremental_refresh(session, make_scored_assessment, first_goal):
+    peers = [make_scored_assessment(score, sector='bench-sector', project_type='bench-type')
+             for score in (1.0, 3.0, 5.0, 7.0, 9.0)]
+
+    cube = ScoreCube()
+    cube.load(session)
+    index = BenchmarkIndex()
+    index.sync(cube.snapshot)
+
+    key = ('sector', 'bench-sector')
+    assert index.percentile(key, first_goal.number - 1, 5.0) == {'percentile': 50.0, 'peers': 5}
+    assert index.percentile(key, OVERALL, 9.5)['percentile'] == 100.0
+    assert index.percentile(('sector', 'nobody'), OVERALL, 5.0) == {'percentile': None, 'peers': 0}
+
+    # An incremental cube refresh is applied to the sorted lists as a delta
+    peers[0].sdg_scores[0].total_score = 10.0
+    session.commit()
+    make_scored_assessment(2.0, sector='bench-sector', project_type='bench-type')
+    cube.refresh(session)
+    assert cube.snapshot.base_version is not None
+    index.sync(cube.snapshot)
+
+    rebuilt = BenchmarkIndex()
+    rebuilt.sync(cube.snapshot)
+    rebuilt._rebuild(cube.snapshot)
+    assert index._lists == rebuilt._lists
+    assert index.percentile(key, first_goal.number - 1, 10.0)['peers'] == 6
@@ -0,0 +1,155 @@
+# tests/test_cascades.py
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from app import db
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.response import QuestionResponse
+from app.models.sdg import SdgGoal, SdgQuestion
+from app.models.dashboard_stat import DashboardStat
+from app.models.analytics_rollup import AnalyticsRollup, SdgScoreHistogram
+from app.services.dashboard_stats_service import rebuild_dashboard_stats
+from app.services.analytics_rollup_service import backfill_rollups
+from app.services import deletion_service
+from app.services.deletion_service import delete_project, purge_project
+from app.services.counter_service import reconcile_counters
+from app.services.api_listing_service import project_page
+
+
+def _project_with_assessments(session, user_id, count):
+    goal = session.query(SdgGoal).order_by(SdgGoal.number).first()
+    question = session.query(SdgQuestion).first()
+    project = Project(name='Large Project', user_id=user_id, project_type='industrial')
+    session.add(project)
+    session.flush()
+    for i in range(count):
+        assessment = Assessment(project_id=project.id, user_id=user_id,
+                                status='completed' if i % 2 else 'draft', overall_score=float(i % 10))
+        assessment.sdg_scores.append(SdgScore(sdg_id=goal.id, total_score=float(i % 10)))
+        session.add(assessment)
+        session.flush()
+        session.add(QuestionResponse(assessment_id=assessment.id, question_id=question.id, response_score=1.0))
+    session.commit()
+    project_id = project.id
+    # Nothing below the project stays loaded, as in a fresh request
+    session.expunge_all()
+    return project_id
+
+
+def _derived_tables(session):
+    session.expire_all()
+    stats = {row.sdg_id: (row.project_count, row.assessment_count, row.completed_count, row.score_count,
+                          round(row.score_sum, 6), round(row.score_sum_sq, 6))
+             for row in DashboardStat.query.all() if row.project_count or row.assessment_count
+             or row.score_count}
+    rollups = {(row.grain, row.bucket, row.entity, row.dimension, row.value):
+               (row.item_count, row.score_count, round(row.score_sum, 6))
+               for row in AnalyticsRollup.query.all() if row.item_count or row.score_count}
+    histograms = {(row.sdg_id, row.band): row.count for row in SdgScoreHistogram.query.all() if row.count}
+    return stats, rollups, histograms
+
+
+def _rebuilt(session):
+    rebuild_dashboard_stats()
+    backfill_rollups()
+    return _derived_tables(session)
+
+
+def test_project_delete_is_set_based(app, session, test_user):
+    project_id = _project_with_assessments(session, test_user.id, 12)
+    rebuild_dashboard_stats()
+    backfill_rollups()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        with app.test_request_context():
+            assert delete_project(session.get(Project, project_id))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    deletes = [s for s in statements if s.lstrip().upper().startswith('DELETE')]
+    assert len(deletes) == 5  # projects, assessments, sdg_scores, question_responses, assessment_summaries
+    assert session.query(Assessment).filter_by(project_id=project_id).count() == 0
+    assert session.query(SdgScore).join(Assessment, SdgScore.assessment_id == Assessment.id) \
+        .filter(Assessment.project_id == project_id).count() == 0
+    assert session.query(QuestionResponse).filter(
+        ~QuestionResponse.assessment_id.in_(session.query(Assessment.id))).count() == 0
+
+    # Cascaded children were subtracted from the derived tables without being loaded
+    incremental = _derived_tables(session)
+    assert _rebuilt(session) == incremental
+
+
+def test_purge_project_in_batches(app, session, test_user):
+    project_id = _project_with_assessments(session, test_user.id, 7)
+    rebuild_dashboard_stats()
+    backfill_rollups()
+
+    assert purge_project(project_id, batch_size=3) == 7
+    assert session.get(Project, project_id) is None
+    assert session.query(Assessment).filter_by(project_id=project_id).count() == 0
+
+    incremental = _derived_tables(session)
+    assert _rebuilt(session) == incremental
+
+
+def test_unfinished_purge_is_restarted(app, session, test_user, monkeypatch):
+    project_id = _project_with_assessments(session, test_user.id, 3)
+    project = session.get(Project, project_id)
+    project.deleted_at = datetime.utcnow()
+    session.commit()
+
+    started, release = [], threading.Event()
+
+    def purge(project_id):
+        started.append(project_id)
+        release.wait(5)
+
+    monkeypatch.setattr(deletion_service, 'purge_project', purge)
+    with app.test_request_context():
+        # A project a purge left behind gets its purge started again, but only once per process
+        assert not delete_project(project)
+        assert not delete_project(project)
+    release.set()
+    deadline = time.monotonic() + 5
+    while deletion_service._purging and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert started == [project_id]
+    assert not deletion_service._purging
+
+
+def test_project_being_purged_is_hidden(app, session, test_user, monkeypatch):
+    user_id = test_user.id
+    project_id = _project_with_assessments(session, user_id, 4)
+    rebuild_dashboard_stats()
+    backfill_rollups()
+    month = ('month', session.get(Project, project_id).created_at.date().replace(day=1), 'project', 'all', '')
+    projects_before = _derived_tables(session)[1][month][0]
+    monkeypatch.setattr(deletion_service, 'purge_project', lambda project_id: None)
+    monkeypatch.setitem(app.config, 'PROJECT_PURGE_THRESHOLD', 2)
+
+    with app.test_request_context():
+        assert not delete_project(session.get(Project, project_id))
+    project = session.get(Project, project_id)
+    # The status users set is left alone; the project drops out of listings and project counts
+    assert project.status == 'planning' and project.deleted_at is not None
+    assert project_id not in [item['id'] for item in project_page(session, user_id)['items']]
+    assert session.get(User, user_id).project_count == 0
+    assert reconcile_counters() == {'projects': 0, 'users': 0}
+    incremental = _derived_tables(session)
+    assert incremental[1].get(month, (0,))[0] == projects_before - 1
+    assert _rebuilt(session) == incremental
+
+    # Finishing the purge does not subtract the project a second time
+    purge_project(project_id, batch_size=3)
+    incremental = _derived_tables(session)
+    assert _rebuilt(session) == incremental
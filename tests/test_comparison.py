@@ -0,0 +1,89 @@
+# tests/test_comparison.py
+from datetime import datetime
+
+import numpy as np
+
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.services.comparison_service import _trend_slopes, compare_assessments
+
+# Three successive assessments: SDG 1 improves, SDG 2 declines, SDG 6 is scored once
+SERIES = [
+    (datetime(2024, 1, 1), 4.0, {1: 3.0, 2: 8.0}),
+    (datetime(2024, 6, 1), 5.0, {1: 5.0, 2: 7.0, 6: 4.0}),
+    (datetime(2025, 1, 1), 6.5, {1: 9.0, 2: 6.0}),
+]
+
+
+def _project_with_series(session, user_id):
+    goals = {goal.number: goal for goal in session.query(SdgGoal).filter(SdgGoal.number.in_((1, 2, 6)))}
+    for number in {1, 2, 6} - set(goals):
+        goals[number] = SdgGoal(number=number, name=f'Goal {number}', color_code='#000000')
+        session.add(goals[number])
+    project = Project(name='Compared Project', user_id=user_id)
+    for completed_at, overall, totals in SERIES:
+        assessment = Assessment(user_id=user_id, status='completed', overall_score=overall,
+                                completed_at=completed_at)
+        for number, total in totals.items():
+            assessment.sdg_scores.append(SdgScore(sdg_goal=goals[number], total_score=total))
+        project.assessments.append(assessment)
+    session.add(project)
+    session.commit()
+    return project
+
+
+def test_trend_slopes_ignore_missing_scores():
+    matrix = np.array([[1.0, np.nan, 5.0], [2.0, 4.0, np.nan], [3.0, np.nan, 5.0]])
+    slopes = _trend_slopes(matrix)
+    assert np.allclose(slopes[[0, 2]], [1.0, 0.0])
+    assert np.isnan(slopes[1])
+
+
+def test_compare_pivots_in_chronological_order(session, test_user):
+    project = _project_with_series(session, test_user.id)
+    ids = [a.id for a in sorted(project.assessments, key=lambda a: a.completed_at)]
+
+    result = compare_assessments(session, project, list(reversed(ids)))
+    assert [a['id'] for a in result['assessments']] == ids
+    assert [row[0] for row in result['scores']] == [3.0, 5.0, 9.0]
+    assert result['scores'][0][5] is None
+    assert result['deltas'][1] == {'from': ids[1], 'to': ids[2], 'overall': 1.5,
+                                   'sdgs': result['deltas'][1]['sdgs']}
+    assert result['deltas'][1]['sdgs'][:2] == [4.0, -1.0]
+    assert result['change']['overall'] == 2.5
+    assert result['change']['sdgs'][5] is None
+    assert [m['sdg'] for m in result['movers']] == [1, 2]
+    assert result['trends'][0]['direction'] == 'improving'
+    assert result['trends'][1]['direction'] == 'declining'
+    assert result['trends'][5]['direction'] is None
+
+    # Assessments of another project are not found
+    other = Project(name='Other', user_id=test_user.id)
+    other.assessments.append(Assessment(user_id=test_user.id))
+    session.add(other)
+    session.commit()
+    assert compare_assessments(session, project, [ids[0], other.assessments[0].id]) is None
+
+
+def test_compare_endpoint(client, session, test_user_api, api_auth_token):
+    project = _project_with_series(session, test_user_api.id)
+    headers = {'Authorization': f'Bearer {api_auth_token}'}
+
+    response = client.get(f'/api/projects/{project.id}/compare', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['assessments']) == 3
+
+    assert client.get(f'/api/projects/{project.id}/compare?assessments=1,x',
+                      headers=headers).status_code == 400
+    single = project.assessments[0].id
+    assert client.get(f'/api/projects/{project.id}/compare?assessments={single}',
+                      headers=headers).status_code == 400
+
+
+def test_compare_view(client, auth, session, test_user):
+    project = _project_with_series(session, test_user.id)
+    auth.login(email=test_user.email)
+    response = client.get(f'/projects/{project.id}/compare')
+    assert response.status_code == 200
+    assert b'Largest Movers' in response.data
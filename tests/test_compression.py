@@ -0,0 +1,101 @@
+# tests/test_compression.py
+import gzip
+import os
+import zlib
+
+from flask import Flask, Response, stream_with_context
+
+from app.utils.compression import CompressionMiddleware, negotiate, precompress_static
+
+BIG = 'x' * 5000
+
+
+def _app(static_folder=None):
+    app = Flask(__name__, static_folder=static_folder or 'static')
+
+    @app.route('/page')
+    def page():
+        return f'<html>{BIG}</html>'
+
+    @app.route('/small')
+    def small():
+        return 'tiny'
+
+    @app.route('/image')
+    def image():
+        return Response(BIG, mimetype='image/png')
+
+    @app.route('/stream')
+    def stream():
+        return Response(stream_with_context(f'row {i}\n' for i in range(500)), mimetype='text/csv')
+
+    @app.route('/events')
+    def events():
+        return Response('data: 1\n\n' * 500, mimetype='text/event-stream')
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=1024, static_folder=app.static_folder,
+                                         static_url_path=app.static_url_path)
+    return app
+
+
+def test_negotiation():
+    assert negotiate('gzip, deflate, br', ('br', 'gzip')) == 'br'
+    assert negotiate('br;q=0.5, gzip', ('br', 'gzip')) == 'gzip'
+    assert negotiate('br;q=0, *;q=0.1', ('br', 'gzip')) == 'gzip'
+    assert negotiate('identity', ('br', 'gzip')) is None
+
+
+def test_compresses_large_text_only():
+    client = _app().test_client()
+    headers = {'Accept-Encoding': 'gzip'}
+
+    response = client.get('/page', headers=headers)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) == len(response.data) < 200
+    assert gzip.decompress(response.data).decode() == f'<html>{BIG}</html>'
+
+    assert 'Content-Encoding' not in client.get('/small', headers=headers).headers
+    assert 'Content-Encoding' not in client.get('/image', headers=headers).headers
+    assert 'Content-Encoding' not in client.get('/events', headers=headers).headers
+    assert 'Content-Encoding' not in client.get('/page').headers
+
+
+def test_streamed_responses_stay_streamed():
+    response = _app().test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert zlib.decompress(response.data, 31).decode() == ''.join(f'row {i}\n' for i in range(500))
+
+
+def test_precompressed_static_siblings(tmp_path):
+    static = tmp_path / 'static'
+    (static / 'js').mkdir(parents=True)
+    (static / 'js' / 'charts.js').write_text('var chart = 1;\n' * 500)
+    (static / 'js' / 'tiny.js').write_text('var x;')
+
+    written = precompress_static(str(static))
+    assert str(static / 'js' / 'charts.js.gz') in written
+    assert not os.path.exists(static / 'js' / 'tiny.js.gz')
+    assert precompress_static(str(static)) == []
+
+    client = _app(str(static)).test_client()
+    response = client.get('/static/js/charts.js', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/javascript'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data).decode() == 'var chart = 1;\n' * 500
+    response.close()
+
+    plain = client.get('/static/js/charts.js')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data.decode() == 'var chart = 1;\n' * 500
+    plain.close()
+
+    # An edited source no longer uses its stale sibling
+    source = static / 'js' / 'charts.js'
+    os.utime(source, (os.stat(source).st_atime, os.stat(source).st_mtime + 10))
+    stale = client.get('/static/js/charts.js', headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(stale.data).decode() == 'var chart = 1;\n' * 500
+    assert stale.headers.get('ETag', '').startswith('W/')
+    stale.close()
@@ -0,0 +1,66 @@
+# tests/test_counters.py
+from datetime import datetime
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.services.counter_service import reconcile_counters
+
+
+def _counters(session, project_id, user_id):
+    session.expire_all()
+    project = session.get(Project, project_id)
+    user = session.get(User, user_id)
+    return (project.assessment_count, project.completed_count, project.latest_overall_score,
+            user.project_count, user.assessment_count)
+
+
+def test_counters_follow_writes(session, test_user):
+    reconcile_counters()
+    user_id = test_user.id
+    base_projects, base_assessments = test_user.project_count, test_user.assessment_count
+
+    # Project and assessments inserted in one flush, linked through relationships
+    project = Project(name='Counted Project', user_id=user_id)
+    project.assessments.append(Assessment(user_id=user_id, status='draft'))
+    project.assessments.append(Assessment(user_id=user_id, status='completed', overall_score=5.0,
+                                          completed_at=datetime(2024, 1, 1)))
+    session.add(project)
+    session.commit()
+    project_id = project.id
+    assert _counters(session, project_id, user_id) == (2, 1, 5.0, base_projects + 1, base_assessments + 2)
+
+    # Completing a newer assessment moves the latest score
+    draft = session.query(Assessment).filter_by(project_id=project_id, status='draft').one()
+    draft.status = 'completed'
+    draft.overall_score = 7.5
+    draft.completed_at = datetime(2024, 6, 1)
+    session.commit()
+    assert _counters(session, project_id, user_id) == (2, 2, 7.5, base_projects + 1, base_assessments + 2)
+
+    # Deleting it falls back to the previous completed assessment
+    session.delete(session.get(Assessment, draft.id))
+    session.commit()
+    assert _counters(session, project_id, user_id) == (1, 1, 5.0, base_projects + 1, base_assessments + 1)
+    assert reconcile_counters() == {'projects': 0, 'users': 0}
+
+    session.delete(session.get(Project, project_id))
+    session.commit()
+    session.expire_all()
+    user = session.get(User, user_id)
+    assert (user.project_count, user.assessment_count) == (base_projects, base_assessments)
+    assert reconcile_counters() == {'projects': 0, 'users': 0}
+
+
+def test_reconcile_repairs_drift(session, test_user):
+    project = Project(name='Drifted Project', user_id=test_user.id)
+    session.add(project)
+    session.flush()
+    session.add(Assessment(project_id=project.id, user_id=test_user.id, status='draft'))
+    session.commit()
+    project_id = project.id
+
+    session.query(Project).filter_by(id=project_id).update({'assessment_count': 42})
+    session.commit()
+    assert reconcile_counters()['projects'] == 1
+    session.expire_all()
+    assert session.get(Project, project_id).assessment_count == 1
@@ -0,0 +1,79 @@
+# tests/test_dashboard_stats.py
+from app.models.project import Project
+from app.models.assessment import Assessment, SdgScore
+from app.models.sdg import SdgGoal
+from app.models.dashboard_stat import DashboardStat, GLOBAL_STATS_KEY
+from app.services.dashboard_stats_service import rebuild_dashboard_stats
+
+
+def _snapshot(session):
+    """Return {sdg_id: (counts..., sums...)} for every stats row."""
+    session.expire_all()
+    return {
+        row.sdg_id: (row.user_count, row.project_count, row.assessment_count, row.completed_count,
+                     row.score_count, round(row.score_sum, 6), round(row.score_sum_sq, 6))
+        for row in DashboardStat.query.all()
+    }
+
+
+def _global(session):
+    session.expire_all()
+    return DashboardStat.query.filter_by(sdg_id=GLOBAL_STATS_KEY).one()
+
+
+def test_writes_update_stats_incrementally(session, test_user):
+    rebuild_dashboard_stats()
+    before = _global(session)
+    projects_before, assessments_before = before.project_count, before.assessment_count
+    completed_before, scored_before = before.completed_count, before.score_count
+
+    goal = session.query(SdgGoal).order_by(SdgGoal.number).first()
+    project = Project(name='Stats Project', user_id=test_user.id)
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user.id, status='draft')
+    assessment.sdg_scores.append(SdgScore(sdg_id=goal.id, total_score=6.0))
+    session.add(assessment)
+    session.commit()
+
+    after = _global(session)
+    assert after.project_count == projects_before + 1
+    assert after.assessment_count == assessments_before + 1
+    assert after.completed_count == completed_before
+
+    # Assign to an expired attribute: the old value must come from the database row
+    assessment.status = 'completed'
+    assessment.overall_score = 6.0
+    session.commit()
+
+    after = _global(session)
+    assert after.completed_count == completed_before + 1
+    assert after.score_count == scored_before + 1
+
+    # Incremental state must match a full rebuild
+    incremental = _snapshot(session)
+    rebuild_dashboard_stats()
+    assert _snapshot(session) == incremental
+
+
+def test_deletes_are_subtracted(session, test_user):
+    goal = session.query(SdgGoal).order_by(SdgGoal.number).first()
+    project = Project(name='Doomed Project', user_id=test_user.id)
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user.id, status='completed', overall_score=4.0)
+    assessment.sdg_scores.append(SdgScore(sdg_id=goal.id, total_score=4.0))
+    session.add(assessment)
+    session.commit()
+    rebuild_dashboard_stats()
+    before = _snapshot(session)
+
+    session.delete(project)
+    session.commit()
+
+    after = _snapshot(session)
+    assert after[GLOBAL_STATS_KEY][1] == before[GLOBAL_STATS_KEY][1] - 1
+    assert after[GLOBAL_STATS_KEY][3] == before[GLOBAL_STATS_KEY][3] - 1
+    assert after[goal.id][4] == before[goal.id][4] - 1
+    rebuild_dashboard_stats()
+    assert _snapshot(session) == after
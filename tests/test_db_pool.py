@@ -0,0 +1,88 @@
+# tests/test_db_pool.py
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.utils.db_pool import CircuitBreaker, MeteredQueuePool, engine_options
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_backs_off():
+    clock = FakeClock()
+    probes = []
+
+    def probe():
+        probes.append(clock.now)
+        if len(probes) < 2:
+            raise ConnectionError('still down')
+
+    breaker = CircuitBreaker(probe, threshold=2, base_delay=1.0, max_delay=8.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow() and probes == []  # Fails fast without probing
+
+    clock.now = 1.0
+    assert not breaker.allow()  # First probe fails: delay doubles
+    assert breaker.status()['retry_in'] == 2.0
+
+    clock.now = 2.5
+    assert not breaker.allow() and len(probes) == 1
+    clock.now = 3.0
+    assert breaker.allow()  # Second probe succeeds
+    assert breaker.state == breaker.CLOSED and breaker.delay == 1.0
+
+
+def test_engine_options():
+    assert engine_options({}, 'sqlite:///:memory:') == {'pool_pre_ping': True}
+    options = engine_options({'DB_POOL_SIZE': 6, 'DB_POOL_MAX_OVERFLOW': 1}, 'postgresql://db/sdg')
+    assert options['poolclass'] is MeteredQueuePool
+    assert (options['pool_size'], options['max_overflow']) == (6, 1)
+
+
+def test_ping_does_not_touch_database(client, app):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/ping')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    assert statements == []
+
+
+def test_open_breaker_returns_503(client, app):
+    breaker = app.extensions['db_breaker']
+    breaker.state, breaker.retry_at = breaker.OPEN, breaker.clock() + 30
+    try:
+        response = client.get('/api/projects')
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert client.get('/ping').status_code == 200
+    finally:
+        breaker.state, breaker.failures = breaker.CLOSED, 0
+
+
+def test_only_disconnects_map_to_503(app):
+    with app.test_request_context('/api/projects'):
+        handler = app._find_error_handler(OperationalError('SELECT 1', {}, Exception('x')))
+        lost = OperationalError('SELECT 1', {}, Exception('server closed the connection'),
+                                connection_invalidated=True)
+        assert handler(lost).status_code == 503
+
+        missing = OperationalError('SELECT 1', {}, Exception('no such table: widgets'))
+        with pytest.raises(OperationalError):
+            handler(missing)
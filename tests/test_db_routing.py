@@ -0,0 +1,60 @@
+# tests/test_db_routing.py
+import datetime
+import jwt as pyjwt
+import pytest
+from app import create_app, db, cache
+from app.models.user import User
+from app.models.project import Project
+from app.utils.db_routing import replica_reads, replica_engine
+from config import TestingConfig
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """App with a primary and a 'replica' SQLite file holding different rows."""
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        REPLICA_DATABASE_URI = f"sqlite:///{tmp_path / 'replica.db'}"
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(bind=replica_engine())
+        for engine, name in ((db.engine, 'primary'), (replica_engine(), 'replica')):
+            with engine.begin() as connection:
+                connection.execute(User.__table__.insert(), {'id': 1, 'email': 'replica@example.com'})
+                connection.execute(Project.__table__.insert(), {'name': f'On {name}', 'user_id': 1})
+        yield app
+        cache.clear()
+        db.session.remove()
+        db.engine.dispose()
+        replica_engine().dispose()
+
+
+def _names(response):
+    return sorted(project['name'] for project in response.get_json())
+
+
+def test_api_reads_replica_until_user_writes(replica_app):
+    client = replica_app.test_client()
+    token = pyjwt.encode({'user_id': 1, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                         replica_app.config['SECRET_KEY'], algorithm='HS256')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert _names(client.get('/api/projects', headers=headers)) == ['On replica']
+
+    response = client.post('/api/projects', json={'name': 'Written'}, headers=headers)
+    assert response.status_code == 201
+
+    # Read-your-writes: the writer now reads from the primary
+    assert _names(client.get('/api/projects', headers=headers)) == ['On primary', 'Written']
+
+
+def test_replica_reads_context_keeps_writes_on_primary(replica_app):
+    with replica_reads():
+        assert [p.name for p in Project.query.all()] == ['On replica']
+        db.session.add(Project(name='Flushed', user_id=1))
+        db.session.commit()
+    assert sorted(p.name for p in Project.query.all()) == ['Flushed', 'On primary']
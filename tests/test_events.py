@@ -0,0 +1,161 @@
+# tests/test_events.py
+import threading
+
+import pytest
+
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.services.assessment_service import save_draft_data
+from app.utils.events import EventBroker, RedisFanout, TooManyStreams, event_stream, publish_after_commit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def broker(app):
+    """A fresh broker installed as the app's, restored afterwards."""
+    previous = app.extensions.get('events')
+    app.extensions['events'] = EventBroker(max_connections=4, max_per_user=2, queue_size=2)
+    yield app.extensions['events']
+    app.extensions['events'] = previous
+
+
+def test_broker_delivers_per_user_and_caps_streams(broker):
+    first, second = broker.subscribe(1), broker.subscribe(1)
+    with pytest.raises(TooManyStreams):
+        broker.subscribe(1)
+    other = broker.subscribe(2)
+
+    for n in range(3):
+        broker.publish(1, 'scoring.completed', {'n': n})
+    with pytest.raises(ValueError):
+        broker.publish(1, 'no.such.event')
+
+    # A full queue keeps the newest messages; other users get nothing
+    assert [first.get(0)[2]['n'], first.get(0)[2]['n']] == [1, 2]
+    assert second.get(0)[2] == {'n': 1} and second.dropped == 1
+    assert other.get(0) is None
+
+    broker.unsubscribe(first)
+    broker.unsubscribe(second)
+    assert broker.status()['streams'] == 1 and broker.status()['rejected'] == 1
+
+
+def test_reconnect_replays_missed_events(broker):
+    seen = broker.publish(7, 'draft.saved', {'n': 1})
+    broker.publish(7, 'draft.saved', {'n': 2})
+    broker.publish(8, 'draft.saved', {'n': 3})
+
+    stream = broker.subscribe(7, last_event_id=seen)
+    assert stream.get(0)[2] == {'n': 2}
+    assert stream.get(0) is None
+
+
+def test_stream_heartbeats_and_ends(broker):
+    clock = _Clock()
+    frames = event_stream(broker, broker.subscribe(1), heartbeat=0.01, max_seconds=10, clock=clock)
+    assert next(frames).startswith('retry: ')
+
+    event_id = broker.publish(1, 'export.ready', {'url': '/x'})
+    assert next(frames) == f'id: {event_id}\nevent: export.ready\ndata: {{"url": "/x"}}\n\n'
+    assert next(frames) == ': ping\n\n'
+
+    clock.now = 11
+    assert list(frames) == []
+    assert broker.status()['streams'] == 0
+
+
+def test_fanout_listener_starts_per_process(app):
+    fanout = RedisFanout('redis://localhost:6379/0')
+    release = threading.Event()
+    fanout._listen = release.wait
+    fanout.start(lambda user_id, message: None, app.logger)
+    assert fanout._thread is None
+
+    try:
+        fanout.ensure_started()
+        first = fanout._thread
+        fanout.ensure_started()
+        assert fanout._thread is first and first.is_alive()
+
+        # As seen from a forked worker: the inherited thread object is not running there
+        fanout._pid = -1
+        fanout.ensure_started()
+        assert fanout._thread is not first
+    finally:
+        release.set()
+
+
+def test_events_published_only_on_commit(session, test_user, broker):
+    subscription = broker.subscribe(test_user.id)
+    publish_after_commit(session, test_user.id, 'export.ready', {'n': 1})
+    session.rollback()
+    session.commit()
+    assert subscription.get(0) is None
+
+    project = Project(name='Draft Project', user_id=test_user.id)
+    assessment = Assessment(user_id=test_user.id, status='draft')
+    project.assessments.append(assessment)
+    session.add(project)
+    session.commit()
+
+    save_draft_data(session, assessment.id, '{"q1": "yes"}', client_id='tab-1')
+    assert subscription.get(0) is None
+    session.commit()
+    _, name, data = subscription.get(0)
+    assert name == 'draft.saved'
+    assert data['assessment_id'] == assessment.id and data['client_id'] == 'tab-1'
+
+
+def test_events_of_a_rolled_back_savepoint_are_dropped(session, test_user, broker):
+    subscription = broker.subscribe(test_user.id)
+    session.commit()
+
+    # As the write queue does: one savepoint per write, one commit per batch
+    failed = session.begin_nested()
+    publish_after_commit(session, test_user.id, 'export.ready', {'n': 1})
+    inner = session.begin_nested()
+    publish_after_commit(session, test_user.id, 'export.ready', {'n': 2})
+    inner.commit()
+    failed.rollback()
+    saved = session.begin_nested()
+    publish_after_commit(session, test_user.id, 'export.ready', {'n': 3})
+    saved.commit()
+    # Releasing a savepoint publishes nothing yet
+    assert subscription.get(0) is None
+    session.commit()
+
+    _, _, data = subscription.get(0)
+    assert data == {'n': 3}
+    assert subscription.get(0) is None
+
+
+def test_events_endpoint(client, broker, app, test_user_api, api_auth_token):
+    assert client.get('/api/events').status_code == 401
+
+    headers = {'Authorization': f'Bearer {api_auth_token}'}
+    seen = broker.publish(test_user_api.id, 'scoring.completed', {'n': 1})
+    broker.publish(test_user_api.id, 'scoring.completed', {'n': 2})
+
+    app.config['EVENTS_STREAM_SECONDS'] = 0.05
+    try:
+        response = client.get('/api/events', headers={**headers, 'Last-Event-ID': seen})
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        body = response.get_data(as_text=True)
+    finally:
+        app.config['EVENTS_STREAM_SECONDS'] = 300
+    assert body.startswith('retry: ')
+    assert 'data: {"n": 2}' in body and 'data: {"n": 1}' not in body
+
+    # Past the per-user cap the client is told to come back later
+    broker.subscribe(test_user_api.id)
+    broker.subscribe(test_user_api.id)
+    response = client.get('/api/events', headers=headers)
+    assert response.status_code == 503 and response.headers['Retry-After'] == '30'
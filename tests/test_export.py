@@ -0,0 +1,28 @@
+# tests/test_export.py
+import csv
+import json
+from datetime import datetime, timedelta
+from io import StringIO
+from app.services.export_service import stream_export
+
+
+def test_assessment_csv_pivots_sdg_scores(session, make_scored_assessment, first_goal):
+    assessment = make_scored_assessment(7.5, sector='export')
+
+    # A batch size of 1 forces one chunk per row through the generator
+    chunks = list(stream_export('assessments', 'csv', batch_size=1))
+    rows = list(csv.DictReader(StringIO(''.join(chunks))))
+    row = next(row for row in rows if row['id'] == str(assessment.id))
+    assert len(chunks) >= len(rows)
+    assert float(row[f'sdg_{first_goal.number}']) == 7.5
+    assert 'draft_data' not in row
+
+
+def test_ndjson_since_filter(session, make_scored_assessment):
+    assessment = make_scored_assessment(3.0, sector='export')
+
+    lines = ''.join(stream_export('projects', 'ndjson')).splitlines()
+    assert any(json.loads(line)['id'] == assessment.project_id for line in lines)
+
+    future = datetime.utcnow() + timedelta(days=1)
+    assert ''.join(stream_export('assessments', 'ndjson', since=future)) == ''
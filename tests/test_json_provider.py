@@ -0,0 +1,54 @@
+# tests/test_json_provider.py
+import dataclasses
+import decimal
+from datetime import datetime, date
+
+import pytest
+
+from app.models import Project
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import model_serializer, serialize_all
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+    label: str
+
+
+PAYLOAD = {'at': datetime(2024, 5, 1, 12, 30, 15, 250000), 'on': date(2024, 5, 1),
+           'price': decimal.Decimal('10.50'), 'point': _Point(1, 'a'), 'big': 2 ** 70}
+EXPECTED = {'at': '2024-05-01T12:30:15.250000', 'on': '2024-05-01', 'price': '10.50',
+            'point': {'x': 1, 'label': 'a'}, 'big': 2 ** 70}
+
+
+@pytest.mark.parametrize('backend', ['stdlib', pytest.param('orjson', marks=pytest.mark.skipif(
+    orjson is None, reason='orjson not installed'))])
+def test_backends_encode_alike(app, backend):
+    app.config['JSON_BACKEND'] = backend
+    try:
+        provider = FastJSONProvider(app)
+    finally:
+        app.config['JSON_BACKEND'] = 'auto'
+    assert provider.use_orjson == (backend == 'orjson')
+    assert provider.loads(provider.dumps(PAYLOAD)) == EXPECTED
+    with app.test_request_context():
+        response = provider.response(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert provider.loads(response.get_data()) == EXPECTED
+
+
+def test_jsonify_uses_iso_dates(app):
+    with app.test_request_context():
+        from flask import jsonify
+        assert jsonify({'at': datetime(2024, 1, 2, 3, 4, 5)}).get_json() == {'at': '2024-01-02T03:04:05'}
+
+
+def test_compiled_serializer_matches_reflection():
+    projects = [Project(id=i, name=f'P{i}', user_id=1, size_sqm=10.0 * i + 1) for i in range(3)]
+    reflected = [{c.name: getattr(p, c.name) for c in p.__table__.columns} for p in projects]
+    assert serialize_all(projects) == reflected
+    assert model_serializer(Project) is model_serializer(Project)
+    assert serialize_all(projects, ('id', 'name')) == [{'id': i, 'name': f'P{i}'} for i in range(3)]
+    with pytest.raises(ValueError):
+        model_serializer(Project, ('id', 'name); import os'))
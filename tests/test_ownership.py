@@ -0,0 +1,53 @@
+# tests/test_ownership.py
+from sqlalchemy import event
+from app import db
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.services.ownership_service import resolve_assessment, owned_assessment
+
+
+def _count_queries(app, fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+def test_resolver_loads_once_per_request(app, session, test_user):
+    project = Project(name='Owned Project', user_id=test_user.id)
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user.id)
+    session.add(assessment)
+    session.commit()
+    assessment_id, project_id, user_id = assessment.id, project.id, test_user.id
+
+    with app.test_request_context():
+        def resolve_twice():
+            first = resolve_assessment(assessment_id)
+            second = resolve_assessment(assessment_id)
+            return first, second
+
+        (first, second), statements = _count_queries(app, resolve_twice)
+        assert len(statements) == 1
+        assert first is second
+        assert first.project.id == project_id
+        assert first.owned_by(user_id)
+        assert first.owned_by(user_id, project_id=project_id)
+        assert not first.owned_by(user_id, project_id=project_id + 1)
+        assert not first.owned_by(user_id + 1)
+        assert owned_assessment(assessment_id, user_id + 1) == (None, None)
+
+
+def test_missing_assessment(app, session):
+    with app.test_request_context():
+        access = resolve_assessment(987654)
+        assert not access.found
+        assert not access.owned_by(1)
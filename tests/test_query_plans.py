@@ -0,0 +1,45 @@
+# tests/test_query_plans.py
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import create_engine
+from app import db
+from app.utils.query_plans import check_plans, advise, suggest_index, HOT_QUERIES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def migrated_engine(tmp_path_factory):
+    """A SQLite file migrated to head with Alembic, in a subprocess to keep its logging setup out of ours."""
+    path = tmp_path_factory.mktemp('plans') / 'migrated.db'
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}', FLASK_APP='run.py')
+    result = subprocess.run([sys.executable, '-m', 'flask', 'db', 'upgrade'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    engine = create_engine(f'sqlite:///{path}')
+    yield engine
+    engine.dispose()
+
+
+def test_hot_queries_use_indexes(migrated_engine):
+    with migrated_engine.connect() as connection:
+        report = check_plans(connection)
+    flagged = {name: result for name, result in report.items() if result['issues']}
+    assert flagged == {}, f"Query plan regressions: {flagged}; suggested: {advise(report)}"
+
+
+def test_advisor_flags_unindexed_schema():
+    # The models alone do not declare the migration's composite indexes
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    with engine.connect() as connection:
+        report = check_plans(connection)
+    assert 'temp b-tree sort' in report['user_projects_by_updated']['issues']
+    assert 'CREATE INDEX ix_projects_user_id_updated_at ON projects (user_id, updated_at)' in advise(report)
+
+
+def test_suggest_index_orders_equality_before_sort():
+    query = next(q for q in HOT_QUERIES if q.name == 'assessments_by_type')
+    assert suggest_index(query.statement) == ('assessments', ['assessment_type', 'created_at', 'id'])
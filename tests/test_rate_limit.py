@@ -0,0 +1,94 @@
+# tests/test_rate_limit.py
+import pytest
+
+from app.models import Project, Assessment, User
+from app.utils.rate_limit import RateLimiter, MemoryBackend, SharedMemoryBackend
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(backend, clock, burst=2, per_second=0.5):
+    limits = {name: (burst, per_second) for name in ('read', 'write', 'expensive')}
+    return RateLimiter(backend, limits, clock=clock)
+
+
+def test_token_bucket_refills(app):
+    clock = _Clock()
+    limiter = _limiter(MemoryBackend(), clock)
+    with app.app_context():
+        assert limiter.hit(1, 'read')[0] and limiter.hit(1, 'read')[0]
+        allowed, headers = limiter.hit(1, 'read')
+        assert not allowed and headers['Retry-After'] == '2' and headers['X-RateLimit-Remaining'] == '0'
+        # Other users and other route classes have their own buckets
+        assert limiter.hit(2, 'read')[0] and limiter.hit(1, 'write')[0]
+        clock.now += 2
+        assert limiter.hit(1, 'read')[0]
+    assert limiter.status()['limited']['read'] == 1
+    assert limiter.status()['allowed'] == {'read': 4, 'write': 1, 'expensive': 0}
+
+
+def test_shared_memory_buckets_span_processes(app, tmp_path):
+    clock = _Clock()
+    path = str(tmp_path / 'buckets.bin')
+    # Two backends over one file stand in for two gunicorn workers
+    first = _limiter(SharedMemoryBackend(path, slots=64), clock)
+    second = _limiter(SharedMemoryBackend(path, slots=64), clock)
+    with app.app_context():
+        assert first.hit(7, 'expensive')[0]
+        assert second.hit(7, 'expensive')[0]
+        assert not first.hit(7, 'expensive')[0]
+        assert second.hit(8, 'expensive')[0]
+
+
+@pytest.fixture
+def strict_limits(app):
+    previous = app.extensions.get('rate_limiter')
+    app.extensions['rate_limiter'] = RateLimiter(MemoryBackend(), {
+        'read': (100, 1.0), 'write': (100, 1.0), 'expensive': (1, 0.01),
+    })
+    yield app.extensions['rate_limiter']
+    app.extensions['rate_limiter'] = previous
+
+
+def test_api_returns_429_with_retry_after(client, api_auth_token, test_user_api, session, strict_limits):
+    project = Project(name='Limited', user_id=test_user_api.id)
+    session.add(project)
+    session.flush()
+    assessment = Assessment(project_id=project.id, user_id=test_user_api.id)
+    session.add(assessment)
+    session.commit()
+    headers = {'Authorization': f'Bearer {api_auth_token}'}
+
+    first = client.get(f'/api/assessments/{assessment.id}/benchmark', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['X-RateLimit-Limit'] == '1'
+    limited = client.get(f'/api/assessments/{assessment.id}/benchmark', headers=headers)
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '100'
+    # Cheap reads draw on a different bucket
+    assert client.get('/api/projects', headers=headers).status_code == 200
+
+    assert strict_limits.status()['limited']['expensive'] == 1
+
+
+def test_health_hides_metrics_from_anonymous_callers(client, session, strict_limits):
+    # Anonymous callers only learn whether the app is up
+    assert client.get('/health').get_json() == {'status': 'healthy', 'database': 'connected'}
+    assert client.get('/health/details').status_code == 403
+
+
+def test_health_details_for_admin(client, session, strict_limits):
+    admin = User(name='Health Admin', email='health-admin@example.com', password_hash='x', is_admin=True)
+    session.add(admin)
+    session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin.id)
+    health = client.get('/health/details').get_json()
+    assert health['status'] == 'healthy'
+    assert health['rate_limits'] == strict_limits.status()
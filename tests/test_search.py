@@ -0,0 +1,56 @@
+# tests/test_search.py
+from app.models.project import Project
+from app.services.search_service import search_projects, autocomplete_projects, fts5_match, search_terms
+
+
+def _add_projects(session, user_id):
+    projects = [
+        Project(name='Harbour Library', user_id=user_id, location='Lisboa', sector='Education',
+                description='Public reading rooms'),
+        Project(name='Riverside Housing', user_id=user_id, location='Porto', sector='Residential',
+                description='Social housing next to the harbour library'),
+        Project(name='São Paulo Clinic', user_id=user_id, location='São Paulo', sector='Healthcare'),
+    ]
+    session.add_all(projects)
+    session.commit()
+    return [project.id for project in projects]
+
+
+def test_ranked_search_over_all_fields(session, test_user):
+    library, housing, clinic = _add_projects(session, test_user.id)
+
+    # A name match outranks the same words in a description
+    assert [p.id for p in search_projects('harbour library', test_user.id)] == [library, housing]
+    assert [p.id for p in search_projects('porto', test_user.id)] == [housing]
+    assert [p.id for p in search_projects('healthcare', test_user.id)] == [clinic]
+    # Diacritics are folded
+    assert [p.id for p in search_projects('sao paulo', test_user.id)] == [clinic]
+    assert search_projects('harbour', test_user.id + 1) == []
+
+
+def test_index_follows_updates_and_deletes(session, test_user):
+    library, housing, clinic = _add_projects(session, test_user.id)
+    project = session.get(Project, housing)
+    project.name = 'Quayside Apartments'
+    session.commit()
+    assert search_projects('riverside', test_user.id) == []
+    assert [p.id for p in search_projects('quayside', test_user.id)] == [housing]
+
+    session.delete(session.get(Project, clinic))
+    session.commit()
+    assert search_projects('clinic', test_user.id) == []
+
+
+def test_query_syntax_is_not_interpreted():
+    assert search_terms('"NEAR(a b)" OR -x*') == ['near', 'a', 'b', 'or', 'x']
+    assert fts5_match(['har', 'lib'], prefix=True) == '"har"* "lib"*'
+
+
+def test_autocomplete_endpoint(client, auth, session, test_user):
+    library, housing, clinic = _add_projects(session, test_user.id)
+    assert [row['id'] for row in autocomplete_projects('harb lib', test_user.id)] == [library, housing]
+
+    auth.login(email=test_user.email)
+    response = client.get('/projects/autocomplete?q=Riv')
+    assert response.status_code == 200
+    assert response.get_json() == [{'id': housing, 'name': 'Riverside Housing'}]
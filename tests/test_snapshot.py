@@ -0,0 +1,34 @@
+# tests/test_snapshot.py
+import json
+import pytest
+from app.services.snapshot_service import partitions_to_load, write_snapshot, load_score_matrix, MANIFEST
+
+
+def _manifest(tmp_path, *entries):
+    partitions = [{'version': version, 'full': full, 'format': 'arrow', 'path': f'wm={version}'}
+                  for version, full in entries]
+    (tmp_path / MANIFEST).write_text(json.dumps({'partitions': partitions}))
+    return str(tmp_path)
+
+
+def test_partitions_to_load_starts_at_latest_full(tmp_path):
+    directory = _manifest(tmp_path, ('1', True), ('2', False), ('3', True), ('4', False))
+    assert [p['version'] for p in partitions_to_load(directory)] == ['3', '4']
+    # A consumer that already has version 3 only needs the newer partition
+    assert [p['version'] for p in partitions_to_load(directory, after_version='3')] == ['4']
+    # One that is behind the latest full restarts from it
+    assert [p['version'] for p in partitions_to_load(directory, after_version='1')] == ['3', '4']
+    assert partitions_to_load(directory, after_version='4') == []
+
+
+def test_snapshot_round_trip(session, make_scored_assessment, first_goal, tmp_path):
+    pytest.importorskip('pyarrow')
+    assessment = make_scored_assessment(4.0, sector='energy')
+
+    entry = write_snapshot(str(tmp_path), 'arrow')
+    assert entry['full'] and entry['rows']['sdg_scores'] >= 1
+    assert write_snapshot(str(tmp_path), 'arrow') is None
+
+    ids, matrix = load_score_matrix(str(tmp_path))
+    row = list(ids).index(assessment.id)
+    assert matrix[row, first_goal.number - 1] == 4.0
@@ -0,0 +1,85 @@
+# tests/test_template_cache.py
+import os
+
+from flask import Flask, render_template_string
+from jinja2 import DictLoader
+
+from app.utils.template_cache import init_template_cache, precompile_templates, warm_templates
+
+TEMPLATES = {
+    'base.html': '<title>{% block title %}{% endblock %}</title>',
+    'page.html': '{% extends "base.html" %}{% block title %}{{ name }}{% endblock %}',
+    'broken.html': '{{ a ? b : c }}',
+}
+
+
+def _app(tmp_path, **config):
+    app = Flask(__name__)
+    app.config.update(TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path / 'jinja'), **config)
+    app.jinja_loader = DictLoader(TEMPLATES)
+    init_template_cache(app)
+
+    @app.route('/page')
+    def page():
+        from flask import render_template
+        return render_template('page.html', name='Hello')
+
+    return app
+
+
+def test_precompile_fills_bytecode_cache(tmp_path):
+    app = _app(tmp_path)
+    compiled, errors = precompile_templates(app)
+    assert compiled == 2
+    assert [name for name, _ in errors] == ['broken.html']
+    assert len(list((tmp_path / 'jinja').iterdir())) == 2
+
+    # A fresh process (app) loads the compiled code instead of compiling again
+    fresh = _app(tmp_path)
+    cache = fresh.jinja_env.bytecode_cache
+    loads = []
+    original = cache.load_bytecode
+    cache.load_bytecode = lambda bucket: loads.append(bucket.key) or original(bucket)
+    fresh.jinja_env.get_template('page.html')
+    assert loads and fresh.jinja_env.get_template('page.html').render(name='x') == '<title>x</title>'
+
+
+def test_shared_cache_directory_is_refused(tmp_path, caplog):
+    directory = tmp_path / 'jinja'
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+    app = _app(tmp_path)
+    assert app.jinja_env.bytecode_cache is None
+    assert app.extensions['templates'].bytecode_cache is None
+    assert 'Template bytecode cache disabled' in caplog.text
+
+    os.chmod(directory, 0o700)
+    assert _app(tmp_path).jinja_env.bytecode_cache is not None
+
+
+def test_warm_templates_at_startup(tmp_path):
+    app = _app(tmp_path, TEMPLATE_PRECOMPILE=True)
+    warm_templates(app)
+    assert app.extensions['templates'].status()['precompiled'] == 2
+    assert sorted(name for _, name in app.jinja_env.cache.keys()) == ['base.html', 'page.html']
+
+    reloading = _app(tmp_path, TEMPLATE_PRECOMPILE=True, TEMPLATES_AUTO_RELOAD=True)
+    warm_templates(reloading)
+    assert reloading.extensions['templates'].precompiled == 0
+
+
+def test_renders_are_timed(tmp_path, caplog):
+    app = _app(tmp_path, TEMPLATE_SLOW_RENDER_MS=0)
+    client = app.test_client()
+    for _ in range(2):
+        response = client.get('/page')
+        assert response.data == b'<title>Hello</title>'
+        assert response.headers['Server-Timing'].startswith('template;dur=')
+
+    [stats] = app.extensions['templates'].status()['slowest']
+    assert stats['template'] == 'page.html' and stats['count'] == 2
+    assert 'Slow template render: page.html' in caplog.text
+
+    with app.test_request_context():
+        render_template_string('{{ 1 }}')
+    assert len(app.extensions['templates'].status()['slowest']) == 2
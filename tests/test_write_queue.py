@@ -0,0 +1,104 @@
+# tests/test_write_queue.py
+import json
+import threading
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User
+from app.models.project import Project
+from app.models.assessment import Assessment
+from app.services.assessment_service import save_draft_data
+from app.utils.write_queue import run_write
+from config import TestingConfig
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """App on a SQLite file with the production pragmas and the writer queue enabled."""
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+
+    class QueueConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'queue.db'}"
+        WRITE_QUEUE_ENABLED = True
+
+    app = create_app(QueueConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(email='queue@example.com', name='Queue')
+        db.session.add(user)
+        db.session.flush()
+        project = Project(name='Queue Project', user_id=user.id)
+        db.session.add(project)
+        db.session.flush()
+        db.session.add_all([Assessment(project_id=project.id, user_id=user.id) for _ in range(4)])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_pragmas_applied(file_app):
+    with file_app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_concurrent_writes_group_commit(file_app):
+    ids = [assessment.id for assessment in Assessment.query.all()]
+    errors = []
+
+    def worker(assessment_id):
+        with file_app.app_context():
+            try:
+                for i in range(10):
+                    run_write(save_draft_data, assessment_id, json.dumps({'step': i}))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(assessment_id,)) for assessment_id in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    db.session.rollback()  # Leave the snapshot read before the writes
+    assert all(json.loads(a.draft_data) == {'step': 9} for a in Assessment.query.all())
+
+
+def test_failed_write_does_not_sink_batch(file_app):
+    assessment_id = Assessment.query.first().id
+    queue = file_app.extensions['write_queue']
+
+    def fail(session):
+        session.get(Assessment, assessment_id).draft_data = 'discarded'
+        raise ValueError('boom')
+
+    # Submitted back to back so both usually land in the same batch
+    failed = queue.submit(fail)
+    saved = queue.submit(save_draft_data, assessment_id, '{"kept": true}')
+
+    with pytest.raises(ValueError):
+        failed.result(5)
+    assert saved.result(5) is True
+    db.session.rollback()  # Leave the snapshot read before the writes
+    assert db.session.get(Assessment, assessment_id).draft_data == '{"kept": true}'
+
+
+def test_savepoints_stay_inside_the_batch_transaction(file_app):
+    assessment_id = Assessment.query.first().id
+    db.session.remove()
+    with db.engine.connect() as writer, db.engine.connect() as reader:
+        outer = writer.begin()
+        savepoint = writer.begin_nested()
+        writer.execute(text("UPDATE assessments SET draft_data = 'pending' WHERE id = :id"), {'id': assessment_id})
+        savepoint.commit()
+
+        # A released savepoint is neither visible elsewhere nor kept when the batch rolls back
+        query = text('SELECT draft_data FROM assessments WHERE id = :id')
+        assert reader.execute(query, {'id': assessment_id}).scalar() != 'pending'
+        reader.rollback()
+        outer.rollback()
+        assert reader.execute(query, {'id': assessment_id}).scalar() != 'pending'